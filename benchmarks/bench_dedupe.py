@@ -0,0 +1,100 @@
+"""
+Скорость устранения дублей: точные дубли по ссылке при добавлении и поиск почти одинаковых вакансий
+(MinHash + LSH) на синтетических данных с заранее известной долей перепубликаций.
+
+Запуск: python -m benchmarks.bench_dedupe --sizes 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+from benchmarks.synthetic import WORDS, make_api_items
+from src.data_models import Vacancy
+from src.dedupe import MinHasher, find_near_duplicates
+from src.storage import JSONLinesSaver
+
+
+def make_entries(count: int, repost_share: float = 0.1, seed: int = 0) -> List[Dict]:
+    """
+    Записи хранилища, среди которых repost_share - перепубликации уже имеющихся вакансий
+    под другой ссылкой с одним дописанным в конец описания словом
+    """
+    rng = random.Random(seed)
+    originals = Vacancy.cast_to_object_list(make_api_items(count, seed))
+    entries = [v.to_dict() for v in originals]
+    for i in rng.sample(range(count), int(count * repost_share)):
+        source = entries[rng.randrange(count)]
+        description = f"{source['description']} {rng.choice(WORDS)}"
+        entries[i] = dict(source, link=f"{source['link']}&repost={i}", description=description)
+    return entries
+
+
+def bench_exact(entries: List[Dict]) -> Dict:
+    """Добавление в JSONLinesSaver с проверкой ссылок и без нее; вход содержит каждую вакансию дважды"""
+    vacancies = [Vacancy.from_dict(entry) for entry in entries]
+    result = {}
+    for dedupe in (False, True):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            saver = JSONLinesSaver(os.path.join(tmp_dir, "vacancies.jsonl"), dedupe=dedupe)
+            start = time.perf_counter()
+            for offset in range(0, len(vacancies), 1000):
+                saver.add_vacancies(vacancies[offset:offset + 1000])
+            saver.add_vacancies(vacancies)  # повторная выгрузка тех же вакансий
+            elapsed = time.perf_counter() - start
+            with open(saver.file_path, encoding="utf-8") as file:
+                stored = sum(1 for _ in file)
+        key = "with_dedupe" if dedupe else "without_dedupe"
+        result[key] = {"records_per_second": round(2 * len(vacancies) / elapsed), "stored": stored}
+    return result
+
+
+def bench_near(entries: List[Dict], threshold: float, num_perm: int) -> Dict:
+    """Скорость MinHash и поиска групп, а также полнота нахождения известных перепубликаций"""
+    hasher = MinHasher(num_perm)
+    start = time.perf_counter()
+    hasher.signatures(f"{e['title']} {e['description']}" for e in entries)
+    signatures_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    groups = find_near_duplicates(entries, threshold, hasher=hasher)
+    search_time = time.perf_counter() - start
+
+    reposts = {i for i, entry in enumerate(entries) if "&repost=" in entry["link"]}
+    found = {i for group in groups for i in group}
+    return {
+        "signatures_per_second": round(len(entries) / signatures_time),
+        "records_per_second": round(len(entries) / search_time),
+        "groups": len(groups),
+        "reposts_found_share": round(len(reposts & found) / len(reposts), 3) if reposts else None,
+    }
+
+
+def run(sizes: List[int], threshold: float, num_perm: int) -> List[Dict]:
+    results = []
+    for size in sizes:
+        entries = make_entries(size)
+        results.append({"size": size, "exact": bench_exact(entries),
+                        "near": bench_near(entries, threshold, num_perm)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--threshold", type=float, default=0.8, help="порог сходства для почти одинаковых")
+    parser.add_argument("--num-perm", type=int, default=128, help="длина MinHash-сигнатуры")
+    parser.add_argument("--output", help="файл для результатов в JSON (по умолчанию - вывод в консоль)")
+    args = parser.parse_args()
+    report = json.dumps(run(args.sizes, args.threshold, args.num_perm), ensure_ascii=False, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
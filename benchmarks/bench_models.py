@@ -0,0 +1,99 @@
+"""
+Память на вакансию и скорость разбора ответов API для разных представлений вакансий.
+
+Запуск: python -m benchmarks.bench_models --sizes 10000 100000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from benchmarks.synthetic import make_api_items
+from src.data_models import Vacancy, VacancyBatch
+
+
+@dataclass
+class DictVacancy:
+    """Прежнее представление вакансии: dataclass с __dict__ у каждого экземпляра"""
+    title: str
+    city: str
+    link: str
+    salary: Optional[int]
+    description: str
+
+
+def cast_dict_vacancies(items: List[Dict]) -> List[DictVacancy]:
+    """Прежний cast_to_object_list: try/except и объект с __dict__ на каждую запись"""
+    vacancies = []
+    for item in items:
+        try:
+            if 'name' not in item or 'url' not in item or 'snippet' not in item:
+                continue
+            salary = item['salary']['to'] if item['salary'] else None
+            city = item['area']['name'] if 'area' in item else ''
+            vacancy = DictVacancy(item['name'], city, item['url'], salary, item['snippet'].get('requirement', ''))
+            if vacancy.salary is not None and vacancy.salary <= 0:
+                raise ValueError(f"Некорректная зарплата {vacancy.salary}")
+            vacancies.append(vacancy)
+        except Exception as e:
+            print(f"Пропущена некорректная запись: {e}")
+    return vacancies
+
+
+def measure_memory(build: Callable[[], object], count: int) -> float:
+    """Байт на вакансию, которые занимает результат build (без учета строк из входных данных)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / count
+
+
+def measure_throughput(parse: Callable[[], object], count: int, repeat: int = 3) -> float:
+    """Записей в секунду (лучший из repeat запусков)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def run(sizes: List[int]) -> List[Dict]:
+    results = []
+    for size in sizes:
+        items = make_api_items(size)
+        representations = {
+            "dataclass_dict": lambda: cast_dict_vacancies(items),
+            "dataclass_slots": lambda: Vacancy.cast_to_object_list(items),
+            "vacancy_batch": lambda: VacancyBatch.from_api_items(items),
+        }
+        for name, build in representations.items():
+            results.append({
+                "size": size,
+                "representation": name,
+                "bytes_per_record": round(measure_memory(build, size), 1),
+                "records_per_second": round(measure_throughput(build, size)),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--output", help="файл для результатов в JSON (по умолчанию - вывод в консоль)")
+    args = parser.parse_args()
+    report = json.dumps(run(args.sizes), ensure_ascii=False, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
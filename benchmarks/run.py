@@ -0,0 +1,214 @@
+"""
+Набор бенчмарков хранилищ и загрузки вакансий из API на синтетических данных.
+
+Для каждого хранилища и размера данных замеряются: начальная загрузка (add_vacancies), add_vacancy,
+get_vacancies с критериями каждого вида, delete_vacancy; отдельно - разбор ответов API
+(cast_to_object_list) и потоковая загрузка из имитации API с задержкой ответа.
+Результаты выводятся в JSON, чтобы сравнивать их между версиями.
+
+Запуск: python -m benchmarks.run --sizes 100 10000 1000000 --output data/bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+from benchmarks.synthetic import CITIES, make_api_items
+from src.api import HeadHunterAPI, RateLimiter
+from src.batch import SAVERS
+from src.data_models import Vacancy
+from src.filters import Contains
+from src.pipeline import ingest
+from src.storage import AbstractDataSaver, IndexedSaver
+
+BACKENDS: Dict[str, Callable[[str], AbstractDataSaver]] = dict(
+    {name: (lambda path, saver_class=saver_class: saver_class(path)) for name, saver_class in SAVERS.items()},
+    indexed=lambda path: IndexedSaver(),
+)
+FILENAMES = {"json": "vacancies.json", "jsonl": "vacancies.jsonl", "csv": "vacancies.csv", "xls": "vacancies.xlsx",
+             "parquet": "vacancies.parquet", "sqlite": "vacancies.db", "indexed": ""}
+
+# Больше строк хранилище не выдерживает за разумное время (XLSX к тому же ограничен 2^20 строками)
+MAX_ROWS = {"xls": 10_000}
+
+CRITERIA = {
+    "all": None,
+    "equality": {"city": CITIES[0]},
+    "range": {"salary_rub": (100_000, 200_000)},
+    "list": {"city": CITIES[:3]},
+    "null": {"salary": None},
+    "contains": {"title": Contains("python")},
+}
+
+
+def make_vacancies(count: int, seed: int = 0) -> List[Vacancy]:
+    return Vacancy.cast_to_object_list(make_api_items(count, seed))
+
+
+def measure(operation: Callable[[int], object], budget: float, max_ops: int) -> Dict:
+    """
+    Выполняет operation(номер вызова), пока не истечет budget секунд или не наберется max_ops вызовов
+    (хотя бы один вызов выполняется всегда). Возвращает число вызовов и среднее время вызова.
+    """
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_ops and (not timings or time.perf_counter() - started < budget):
+        start = time.perf_counter()
+        operation(len(timings))
+        timings.append(time.perf_counter() - start)
+    return {"ops": len(timings), "mean_seconds": sum(timings) / len(timings), "min_seconds": min(timings)}
+
+
+def bench_backend(name: str, vacancies: List[Vacancy], extra: List[Vacancy], budget: float,
+                  max_ops: int) -> Dict:
+    """Замеры одного хранилища на готовом наборе вакансий; extra - новые вакансии для add_vacancy"""
+    result: Dict = {"backend": name, "size": len(vacancies)}
+    if len(vacancies) > MAX_ROWS.get(name, len(vacancies)):
+        result["skipped"] = f"больше {MAX_ROWS[name]} строк"
+        return result
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        saver = BACKENDS[name](os.path.join(tmp_dir, FILENAMES[name]))
+        try:
+            start = time.perf_counter()
+            saver.add_vacancies(vacancies)
+            result["bulk_load_seconds"] = time.perf_counter() - start
+
+            result["add_vacancy"] = measure(lambda i: saver.add_vacancy(extra[i]), budget, len(extra))
+            result["get_vacancies"] = {}
+            for kind, criteria in CRITERIA.items():
+                stats = measure(lambda i: saver.get_vacancies(criteria), budget, max_ops)
+                stats["rows"] = len(saver.get_vacancies(criteria))
+                result["get_vacancies"][kind] = stats
+            result["delete_vacancy"] = measure(lambda i: saver.delete_vacancy(vacancies[i]), budget,
+                                               min(max_ops, len(vacancies)))
+        finally:
+            close = getattr(saver, "close", None)
+            if close is not None:
+                close()
+    return result
+
+
+def bench_parsing(size: int, budget: float, max_ops: int) -> Dict:
+    """Разбор ответов API в объекты Vacancy"""
+    items = make_api_items(size)
+    stats = measure(lambda i: Vacancy.cast_to_object_list(items), budget, max_ops)
+    stats["records_per_second"] = round(size / stats["min_seconds"])
+    return {"size": size, **stats}
+
+
+class MockHHServer:
+    """
+    Локальная имитация /vacancies hh.ru: HTTP-сервер, который отвечает страницами из items с задержкой latency.
+    Настоящий сервер, а не requests_mock, нужен потому, что requests_mock выполняет запросы по одному
+    под общей блокировкой и скрывает эффект параллельной загрузки страниц.
+    """
+
+    def __init__(self, items: List[Dict], latency: float):
+        self.items = items
+        self.latency = latency
+        self.requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def _make_handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                mock.requests += 1
+                time.sleep(mock.latency)
+                query = parse_qs(urlparse(self.path).query)
+                page, per_page = int(query["page"][0]), int(query["per_page"][0])
+                body = json.dumps({"items": mock.items[page * per_page:(page + 1) * per_page],
+                                   "found": len(mock.items), "pages": -(-len(mock.items) // per_page)}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def bench_ingestion(size: int, latency: float, workers: int) -> Dict:
+    """
+    Потоковая загрузка по одному запросу из имитации API: каждый ответ приходит через latency секунд.
+    Выдача API ограничена HeadHunterAPI.MAX_RESULTS вакансиями, поэтому больший размер урезается.
+    """
+    total = min(size, HeadHunterAPI.MAX_RESULTS)
+    with MockHHServer(make_api_items(total), latency) as server, \
+            HeadHunterAPI(max_workers=workers, rate_limiter=RateLimiter(1000)) as api:
+        api.BASE_URL = server.url
+        start = time.perf_counter()
+        stats = ingest(api, "python", IndexedSaver())
+        elapsed = time.perf_counter() - start
+    return {"size": total, "latency": latency, "workers": workers, "seconds": elapsed, "requests": server.requests,
+            "records_per_second": round(stats["written"] / elapsed), **stats}
+
+
+def run(sizes: List[int], backends: List[str], budget: float, max_ops: int, latency: float,
+        workers: List[int]) -> Dict:
+    report: Dict = {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "budget_seconds": budget,
+        },
+        "storage": [],
+        "parsing": [],
+        "ingestion": [],
+    }
+    for size in sizes:
+        vacancies = make_vacancies(size)
+        extra = make_vacancies(max_ops, seed=1)
+        for vacancy in extra:
+            vacancy.link += "&extra"  # ссылки новых вакансий не совпадают с уже сохраненными
+        for name in backends:
+            report["storage"].append(bench_backend(name, vacancies, extra, budget, max_ops))
+        report["parsing"].append(bench_parsing(size, budget, max_ops))
+        for count in workers:
+            report["ingestion"].append(bench_ingestion(size, latency, count))
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000])
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument("--budget", type=float, default=1.0, help="секунд на замер одной операции")
+    parser.add_argument("--max-ops", type=int, default=20, help="не больше вызовов операции на замер")
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка ответа имитации API в секундах")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="потоков загрузки страниц")
+    parser.add_argument("--output", help="файл для результатов в JSON (по умолчанию - вывод в консоль)")
+    args = parser.parse_args(argv)
+    report = json.dumps(run(args.sizes, args.backends, args.budget, args.max_ops, args.latency, args.workers),
+                        ensure_ascii=False, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
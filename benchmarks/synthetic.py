@@ -0,0 +1,32 @@
+import random
+from typing import Dict, List
+
+# Синтетические данные для бенчмарков: ответы API и записи хранилищ с правдоподобным распределением полей
+
+CITIES = ["Москва", "Санкт-Петербург", "Новосибирск", "Екатеринбург", "Казань", "Нижний Новгород",
+          "Челябинск", "Самара", "Омск", "Ростов-на-Дону", "Уфа", "Красноярск"]
+TITLES = ["Python-разработчик", "Java-разработчик", "Аналитик данных", "Тестировщик", "Дизайнер интерфейсов",
+          "Менеджер проекта", "DevOps-инженер", "Системный администратор", "Frontend-разработчик"]
+WORDS = ["опыт", "работы", "от", "лет", "знание", "SQL", "Python", "Docker", "Git", "английский", "язык",
+         "высшее", "образование", "умение", "команде", "Linux", "REST", "API", "тестирование"]
+
+
+def make_api_items(count: int, seed: int = 0) -> List[Dict]:
+    """Вакансии в формате ответа /vacancies; примерно треть без зарплаты"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        salary = None
+        if rng.random() > 0.3:
+            salary_to = rng.randrange(30, 500) * 1000
+            salary = {"from": salary_to // 2, "to": salary_to, "currency": "RUR", "gross": rng.random() > 0.5}
+        items.append({
+            "id": str(100000000 + i),
+            "name": f"{rng.choice(TITLES)} {i}",
+            "url": f"https://api.hh.ru/vacancies/{100000000 + i}?host=hh.ru",
+            "salary": salary,
+            "area": {"id": str(rng.randrange(1, 100)), "name": rng.choice(CITIES)},
+            "snippet": {"requirement": " ".join(rng.choices(WORDS, k=12)), "responsibility": None},
+            "published_at": f"2026-10-{rng.randrange(1, 29):02d}T{rng.randrange(0, 24):02d}:00:00+0300",
+        })
+    return items
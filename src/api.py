@@ -1,5 +1,14 @@
+import threading
+import time
 import requests
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional
+from requests.adapters import HTTPAdapter
+from src import metrics
+from src.cache import CacheMissError, ResponseCache
+
 
 class AbstractJobPlatformAPI(ABC):
     """Абстрактный класс для работы с API платформ вакансий"""
@@ -8,9 +17,89 @@ class AbstractJobPlatformAPI(ABC):
         pass
 
 
+class RateLimiter:
+    """
+    Ограничитель частоты запросов по алгоритму token bucket.
+    Один экземпляр можно разделять между потоками и между несколькими клиентами API.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        :param rate: сколько запросов в секунду разрешено в среднем
+        :param capacity: размер "ведра" - сколько запросов можно сделать подряд без ожидания
+        """
+        if rate <= 0:
+            raise ValueError(f"Некорректная частота запросов {rate}")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Блокирует вызывающий поток, пока не появится свободный токен"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
 class HeadHunterAPI(AbstractJobPlatformAPI):
     """Конкретная реализация API HeadHunter"""
     BASE_URL = "https://api.hh.ru"
+    MAX_PER_PAGE = 100   # Максимальный размер страницы, который отдает hh.ru
+    MAX_RESULTS = 2000   # hh.ru не отдает больше 2000 вакансий на один запрос
+    RETRY_STATUSES = (429, 500, 502, 503, 504)  # Ответы, после которых запрос стоит повторить
+    MAX_RETRY_DELAY = 60  # Максимальная пауза перед повтором, секунд
+
+    def __init__(self, max_workers: int = 4, timeout: float = 10, max_retries: int = 3,
+                 backoff_factor: float = 0.5, rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None, pool_size: Optional[int] = None):
+        """
+        :param max_workers: сколько страниц выгружать одновременно в режиме массовой выгрузки
+        :param timeout: таймаут одного HTTP-запроса, секунд
+        :param max_retries: сколько раз повторять запрос при 429/5xx и сетевых ошибках
+        :param backoff_factor: базовая пауза экспоненциальной задержки (factor * 2 ** попытка)
+        :param rate_limiter: общий ограничитель частоты запросов (по умолчанию 10 запросов в секунду)
+        :param cache: дисковый кэш ответов (по умолчанию ответы не кэшируются)
+        :param pool_size: сколько соединений держать открытыми (по умолчанию max_workers). Клиенту, общему
+                          для нескольких потоков с массовой выгрузкой, нужно потоки * max_workers: лишние
+                          соединения сверх пула закрываются после запроса, и TCP/TLS поднимается заново
+        """
+        if max_workers < 1:
+            raise ValueError(f"Некорректное число потоков {max_workers}")
+        if pool_size is not None and pool_size < 1:
+            raise ValueError(f"Некорректный размер пула соединений {pool_size}")
+        if max_retries < 0:
+            raise ValueError(f"Некорректное число повторов {max_retries}")
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(10)
+        self.cache = cache
+
+        # Одна сессия с пулом соединений на все запросы: TCP/TLS поднимается один раз
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size or max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        """Закрывает соединения сессии"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def get_vacancies(self, query: str):
         """
@@ -18,7 +107,137 @@ class HeadHunterAPI(AbstractJobPlatformAPI):
         :param query: строка поиска (например, профессия)
         :return: словарь с результатами
         """
-        response = requests.get(f"{self.BASE_URL}/vacancies",
-                               params={"text": query, "per_page": 10})
-        response.raise_for_status()
-        return response.json()['items']
+        return self._get_page(query, 0, 10)['items']
+
+    def get_all_vacancies(self, query: str, per_page: int = MAX_PER_PAGE) -> List[Dict]:
+        """
+        Возвращает все вакансии по запросу, обходя все страницы выдачи.
+        :param query: строка поиска (например, профессия)
+        :param per_page: размер одной страницы
+        :return: список вакансий
+        """
+        return list(self.iter_vacancies(query, per_page))
+
+    def iter_vacancies(self, query: str, per_page: int = MAX_PER_PAGE, **params) -> Iterator[Dict]:
+        """
+        Генератор вакансий по запросу с обходом всех страниц.
+        Первая страница запрашивается сразу, чтобы узнать число страниц (pages/found),
+        остальные выгружаются параллельно пулом из max_workers потоков.
+        Вакансии отдаются по мере получения страниц, поэтому порядок страниц не гарантируется.
+        :param query: строка поиска (например, профессия)
+        :param per_page: размер одной страницы
+        :param params: дополнительные параметры запроса /vacancies (area, date_from, order_by...)
+        """
+        per_page = max(1, min(per_page, self.MAX_PER_PAGE))
+        first_page = self._get_page(query, 0, per_page, **params)
+        yield from first_page['items']
+
+        pages = self._count_pages(first_page, per_page)
+        if pages <= 1:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            next_page = 1
+            in_flight = set()
+            # Держим в работе не больше max_workers страниц, чтобы не копить ответы в памяти
+            while next_page < pages or in_flight:
+                while next_page < pages and len(in_flight) < self.max_workers:
+                    in_flight.add(executor.submit(self._get_page, query, next_page, per_page, **params))
+                    next_page += 1
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()['items']
+
+    def _count_pages(self, page: Dict, per_page: int) -> int:
+        """Число страниц выдачи с учетом ограничения hh.ru на глубину выдачи"""
+        pages = page.get('pages')
+        if pages is None:
+            found = page.get('found', len(page['items']))
+            pages = -(-found // per_page)
+        return min(pages, -(-self.MAX_RESULTS // per_page))
+
+    @metrics.timed("api_page")
+    def _get_page(self, query: str, page: int, per_page: int, **params) -> Dict:
+        """Запрашивает одну страницу выдачи /vacancies"""
+        return self._get_json(f"{self.BASE_URL}/vacancies",
+                              {**params, "text": query, "page": page, "per_page": per_page})
+
+    def _get_json(self, url: str, params: Dict) -> Dict:
+        """
+        Возвращает тело ответа, по возможности из кэша.
+        Свежая запись отдается без обращения к сети, устаревшая перепроверяется условным запросом,
+        а при недоступности сети отдается как есть (если кэш это разрешает).
+        """
+        if self.cache is None:
+            return self._request(url, params).json()
+
+        key = ResponseCache.make_key(url, params)
+        entry = self.cache.get(key)
+        if entry is not None and (self.cache.offline or self.cache.is_fresh(entry)):
+            self.cache.count("hits")
+            return entry["body"]
+        if self.cache.offline:
+            self.cache.count("misses")
+            raise CacheMissError(f"Нет сохраненного ответа для {url} {params}")
+
+        try:
+            response = self._request(url, params, ResponseCache.conditional_headers(entry))
+        except requests.exceptions.RequestException:
+            if entry is not None and self.cache.serve_stale:
+                self.cache.count("stale_hits")
+                return entry["body"]
+            raise
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.count("revalidations")
+            self.cache.refresh(key, entry)
+            return entry["body"]
+
+        self.cache.count("misses")
+        body = response.json()
+        self.cache.put(key, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return body
+
+    def _request(self, url: str, params: Dict, headers: Optional[Dict] = None) -> requests.Response:
+        """
+        GET-запрос с ограничением частоты, таймаутом и повторами.
+        Повторяет запрос при 429/5xx (с учетом заголовка Retry-After) и при сетевых ошибках.
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                metrics.inc("http_retries")
+            self.rate_limiter.acquire()
+            try:
+                with metrics.timed("http_request"):
+                    response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                metrics.inc("http_errors", error=type(error).__name__)
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            metrics.inc("http_requests", status=response.status_code)
+            metrics.inc("http_bytes", len(response.content))
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(self._retry_delay(response, attempt))
+                continue
+            response.raise_for_status()
+            return response
+
+    def _backoff(self, attempt: int) -> float:
+        """Пауза экспоненциальной задержки перед повтором номер attempt"""
+        return min(self.backoff_factor * 2 ** attempt, self.MAX_RETRY_DELAY)
+
+    def _retry_delay(self, response: requests.Response, attempt: int) -> float:
+        """Пауза перед повтором: из заголовка Retry-After, если он есть, иначе экспоненциальная"""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = self._backoff(attempt)
+            return min(max(delay, 0.0), self.MAX_RETRY_DELAY)
+        return self._backoff(attempt)
@@ -0,0 +1,34 @@
+import os
+import stat
+import tempfile
+from typing import IO, Callable
+
+# Маска прав процесса: читаем один раз при импорте, потому что os.umask меняет ее для всех потоков
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write(file_path: str, write: Callable[[IO], None], binary: bool = False):
+    """
+    Записывает файл атомарно: данные пишутся во временный файл рядом с целевым,
+    который затем подменяет целевой через os.replace. Сбой посреди записи не портит старый файл.
+    Права файла сохраняются прежними, у нового файла - обычные с учетом umask (mkstemp создает 0600).
+    :param write: функция, которая пишет содержимое в открытый файл
+    :param binary: открыть файл в двоичном режиме (по умолчанию - текстовый в UTF-8)
+    """
+    directory = os.path.dirname(file_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(file_path))
+    try:
+        try:
+            mode = stat.S_IMODE(os.stat(file_path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        with (os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8')) as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
@@ -0,0 +1,214 @@
+"""
+Пакетная выгрузка вакансий по списку запросов без интерактивного меню.
+
+Файл запросов - по одному запросу в строке: "профессия" или "профессия;код региона hh.ru".
+Пустые строки и строки, начинающиеся с #, пропускаются.
+
+Пример: python -m src.batch queries.txt --saver sqlite --workers 4 --summary data/batch_summary.json
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from src import metrics
+from src.api import HeadHunterAPI
+from src.data_models import Vacancy
+from src.pipeline import fetch_batches
+from src.storage import (AbstractDataSaver, CSVSaver, JSONLinesSaver, JSONSaver, ParquetSaver, SQLiteSaver,
+                         XLSSaver)
+from src.sync import IncrementalSync
+
+SAVERS = {
+    "json": JSONSaver,
+    "jsonl": JSONLinesSaver,
+    "csv": CSVSaver,
+    "xls": XLSSaver,
+    "parquet": ParquetSaver,
+    "sqlite": SQLiteSaver,
+}
+
+Query = Tuple[str, Optional[str]]  # (текст поиска, код региона)
+
+PAGE_WORKERS = 4  # Сколько страниц одного запроса выгружается одновременно
+
+
+def read_queries(file_path: str) -> List[Query]:
+    """Читает список запросов из файла"""
+    queries = []
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            text, _, area = line.partition(";")
+            queries.append((text.strip(), area.strip() or None))
+    return queries
+
+
+def parse_items(items: List[Dict]) -> Tuple[List[Vacancy], int]:
+    """Разбирает пачку ответов API (выполняется в отдельном процессе), возвращает вакансии и число пропущенных"""
+    errors: List = []
+    vacancies = Vacancy.cast_to_object_list(items, errors)
+    return vacancies, len(errors)
+
+
+class _SynchronizedSaver(AbstractDataSaver):
+    """Сериализует обращения нескольких потоков к хранилищу, которое само не потокобезопасно"""
+
+    def __init__(self, saver: AbstractDataSaver):
+        self.saver = saver
+        self.lock = threading.RLock()
+
+    def add_vacancy(self, vacancy: Vacancy):
+        with self.lock:
+            self.saver.add_vacancy(vacancy)
+
+    def add_vacancies(self, vacancies):
+        with self.lock:
+            self.saver.add_vacancies(vacancies)
+
+    def delete_vacancy(self, vacancy: Vacancy):
+        with self.lock:
+            self.saver.delete_vacancy(vacancy)
+
+    def get_vacancies(self, criteria=None):
+        with self.lock:
+            return self.saver.get_vacancies(criteria)
+
+    def clear(self):
+        with self.lock:
+            self.saver.clear()
+
+    def replace_vacancies(self, vacancies):
+        with self.lock:
+            self.saver.replace_vacancies(vacancies)
+
+    def flush(self):
+        if hasattr(self.saver, "flush"):
+            with self.lock:
+                self.saver.flush()
+
+
+class BatchHarvester:
+    """
+    Выгружает вакансии по нескольким запросам параллельно.
+    Запросы обрабатываются пулом из workers потоков (страницы одного запроса тоже грузятся параллельно),
+    ответы разбираются в пуле процессов, а пачки пишутся в общее хранилище по мере готовности.
+    """
+
+    def __init__(self, api: HeadHunterAPI, saver: AbstractDataSaver, workers: int = 4, processes: int = 2,
+                 batch_size: int = 100, sync: Optional[IncrementalSync] = None):
+        """
+        :param api: клиент API (один на все запросы: общий пул соединений и ограничитель частоты)
+        :param saver: хранилище вакансий
+        :param workers: сколько запросов обрабатывать одновременно
+        :param processes: размер пула процессов для разбора (0 - разбирать в потоках запросов)
+        :param batch_size: размер пачки, которой вакансии разбираются и пишутся
+        :param sync: инкрементальная синхронизация (если задана, выгружаются только изменения)
+        """
+        self.api = api
+        self.saver = _SynchronizedSaver(saver)
+        self.workers = workers
+        self.processes = processes
+        self.batch_size = batch_size
+        self.sync = sync
+        if sync is not None:
+            sync.saver = self.saver  # Синхронизация пишет в хранилище через ту же блокировку
+        self._seen: Set[str] = set()  # Ссылки, уже записанные в этом запуске (запросы пересекаются)
+        self._sync_lock = threading.Lock()
+
+    def run(self, queries: List[Query]) -> Dict:
+        """Обрабатывает все запросы, печатает прогресс и возвращает сводку"""
+        started = time.perf_counter()
+        summary: Dict = {"started_at": datetime.now().isoformat(timespec="seconds"), "queries": []}
+        parse_pool: Optional[Executor] = ProcessPoolExecutor(self.processes) if self.processes > 0 else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(self._run_query, text, area, parse_pool) for text, area in queries]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    result = future.result()
+                    summary["queries"].append(result)
+                    status = f"ошибка: {result['error']}" if result["error"] else f"{result['written']} вакансий"
+                    print(f"[{done}/{len(queries)}] {result['query']}: {status} за {result['seconds']} с")
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown()
+        totals = dict.fromkeys(("fetched", "skipped", "duplicates", "written"), 0)
+        for result in summary["queries"]:
+            for key in totals:
+                totals[key] += result.get(key, 0)
+        summary["totals"] = dict(totals, failed=sum(1 for r in summary["queries"] if r["error"]))
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        return summary
+
+    def _run_query(self, text: str, area: Optional[str], parse_pool: Optional[Executor]) -> Dict:
+        started = time.perf_counter()
+        params = {"area": area} if area else {}
+        result: Dict = {"query": text, "area": area, "fetched": 0, "skipped": 0, "duplicates": 0, "written": 0,
+                        "error": None}
+        try:
+            if self.sync is not None:
+                # Состояние синхронизации общее, поэтому запросы в этом режиме синхронизируются по очереди
+                with self._sync_lock:
+                    stats = self.sync.run(text, **params)
+                result.update(fetched=stats["fetched"], skipped=stats["skipped"],
+                              written=stats["added"] + stats["updated"])
+            else:
+                self._harvest(text, params, parse_pool, result)
+        except Exception as error:
+            result["error"] = repr(error)
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        return result
+
+    def _harvest(self, text: str, params: Dict, parse_pool: Optional[Executor], result: Dict):
+        for items in fetch_batches(self.api, text, self.batch_size, **params):
+            result["fetched"] += len(items)
+            if parse_pool is not None:
+                vacancies, skipped = parse_pool.submit(parse_items, items).result()
+            else:
+                vacancies, skipped = parse_items(items)
+            result["skipped"] += skipped
+            with self.saver.lock:
+                unique = [vacancy for vacancy in vacancies if vacancy.link not in self._seen]
+                self._seen.update(vacancy.link for vacancy in unique)
+                if unique:
+                    self.saver.add_vacancies(unique)
+            result["duplicates"] += len(vacancies) - len(unique)
+            result["written"] += len(unique)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("queries", help="файл со списком запросов")
+    parser.add_argument("--saver", choices=sorted(SAVERS), default="json", help="формат хранилища")
+    parser.add_argument("--output", help="имя файла хранилища в папке data (по умолчанию - стандартное)")
+    parser.add_argument("--workers", type=int, default=4, help="сколько запросов выгружать одновременно")
+    parser.add_argument("--processes", type=int, default=2, help="процессов для разбора ответов (0 - без пула)")
+    parser.add_argument("--incremental", action="store_true", help="выгружать только новые и измененные вакансии")
+    parser.add_argument("--summary", default="data/batch_summary.json", help="куда записать сводку в JSON")
+    args = parser.parse_args(argv)
+
+    queries = read_queries(args.queries)
+    saver_class = SAVERS[args.saver]
+    saver = saver_class(args.output) if args.output else saver_class()
+    # Клиент общий для всех потоков запросов, и каждый грузит страницы своим пулом из PAGE_WORKERS потоков:
+    # пул соединений рассчитан на все одновременные запросы, иначе лишние соединения открываются заново
+    with HeadHunterAPI(max_workers=PAGE_WORKERS, pool_size=args.workers * PAGE_WORKERS) as api:
+        sync = IncrementalSync(api, saver) if args.incremental else None
+        summary = BatchHarvester(api, saver, args.workers, args.processes, sync=sync).run(queries)
+    for method in ("flush", "close"):
+        if hasattr(saver, method):
+            getattr(saver, method)()
+
+    summary["saver"] = args.saver
+    with open(args.summary, "w", encoding="utf-8") as file:
+        json.dump(summary, file, ensure_ascii=False, indent=4)
+    print(f"Готово: {summary['totals']['written']} вакансий за {summary['seconds']} с, сводка - {args.summary}")
+
+
+if __name__ == "__main__":
+    with metrics.capture():
+        main()
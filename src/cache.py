@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from src import metrics
+
+
+class CacheMissError(LookupError):
+    """Ответа нет в кэше, а сеть недоступна (офлайн-режим)"""
+
+
+class ResponseCache:
+    """
+    Дисковый кэш ответов API.
+    Каждый ответ хранится в отдельном JSON-файле, имя файла - хэш нормализованных параметров запроса.
+    Записи живут ttl секунд, после чего перепроверяются через ETag/If-Modified-Since.
+    При превышении max_entries или max_bytes вытесняются давно не использованные записи (LRU).
+    """
+    DATA_DIR = "data"  # Папка для хранения данных
+    STAT_NAMES = ("hits", "misses", "revalidations", "stale_hits", "evictions")
+
+    def __init__(self, dirname: str = "http_cache", ttl: float = 3600, max_entries: int = 1000,
+                 max_bytes: int = 50 * 1024 * 1024, offline: bool = False, serve_stale: bool = True):
+        """
+        :param dirname: папка кэша внутри DATA_DIR
+        :param ttl: время жизни записи, секунд
+        :param max_entries: максимальное число записей
+        :param max_bytes: максимальный суммарный размер записей на диске
+        :param offline: не обращаться к сети, отдавать любые сохраненные ответы
+        :param serve_stale: отдавать устаревший ответ, если сеть недоступна
+        """
+        self.dir_path = os.path.join(ResponseCache.DATA_DIR, dirname)
+        os.makedirs(self.dir_path, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.serve_stale = serve_stale
+        self.stats = dict.fromkeys(self.STAT_NAMES, 0)
+        self._lock = threading.Lock()
+        self._index = self._scan()  # ключ -> размер файла, от давно использованных к недавним
+        self._bytes = sum(self._index.values())
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """Ключ записи: хэш адреса и параметров, приведенных к единому виду"""
+        normalized = sorted(
+            (str(key), " ".join(str(value).split()).lower())
+            for key, value in (params or {}).items()
+        )
+        raw = json.dumps([url, normalized], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Возвращает запись по ключу (или None) и отмечает ее как недавно использованную"""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._forget(key)
+            return None
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass
+        return entry
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """Не истек ли срок жизни записи"""
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def put(self, key: str, body, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Сохраняет ответ в кэш и при необходимости вытесняет старые записи"""
+        entry = {"stored_at": time.time(), "etag": etag, "last_modified": last_modified, "body": body}
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            self._bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+        self._evict()
+
+    def refresh(self, key: str, entry: Dict):
+        """Продлевает срок жизни записи после успешной перепроверки (ответ 304)"""
+        self.put(key, entry["body"], entry.get("etag"), entry.get("last_modified"))
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict:
+        """Заголовки для условного запроса по сохраненной записи"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def count(self, stat: str):
+        """Увеличивает счетчик статистики кэша"""
+        with self._lock:
+            self.stats[stat] += 1
+        metrics.inc("http_cache", result=stat)
+
+    def clear(self):
+        """Удаляет все записи кэша"""
+        with self._lock:
+            keys = list(self._index)
+            self._index.clear()
+            self._bytes = 0
+        for key in keys:
+            self._remove_file(key)
+
+    def __len__(self):
+        return len(self._index)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.dir_path, f"{key}.json")
+
+    def _scan(self) -> "OrderedDict[str, int]":
+        """Строит LRU-индекс по файлам на диске: порядок - по времени последнего обращения"""
+        files = []
+        for name in os.listdir(self.dir_path):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.dir_path, name))
+                files.append((stat.st_mtime, name[:-len(".json")], stat.st_size))
+        files.sort()
+        return OrderedDict((key, size) for _, key, size in files)
+
+    def _evict(self):
+        evicted = []
+        with self._lock:
+            while self._index and (len(self._index) > self.max_entries or self._bytes > self.max_bytes):
+                key, size = self._index.popitem(last=False)
+                self._bytes -= size
+                self.stats["evictions"] += 1
+                evicted.append(key)
+        for key in evicted:
+            self._remove_file(key)
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._bytes -= self._index.pop(key, 0)
+
+    def _remove_file(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
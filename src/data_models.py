@@ -1,14 +1,91 @@
-from dataclasses import dataclass
-from typing import List, Optional
+import heapq
+import logging
+from array import array
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Iterable, Iterator, List, Optional, Tuple
+from src import metrics
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Диагностика пропущенной записи: (номер записи во входных данных, причина)
+ParseError = Tuple[int, str]
+
+BASE_CURRENCY = "RUR"  # Валюта, к которой приводятся зарплаты (код hh.ru для рубля)
+
+# Курсы валют hh.ru к рублю. Таблица статичная: сортировке нужна сопоставимость, а не точный курс
+CURRENCY_RATES = {
+    "RUR": 1.0,
+    "USD": 90.0,
+    "EUR": 100.0,
+    "KZT": 0.18,
+    "UAH": 2.2,
+    "BYR": 28.0,
+    "UZS": 0.0072,
+    "AZN": 53.0,
+    "GEL": 33.0,
+    "KGS": 1.03,
+}
+
+# Один объект строки на код валюты: разобранные вакансии ссылаются на него, а не хранят свою копию
+_CURRENCY_CODES = {code: code for code in CURRENCY_RATES}
+
+NO_SALARY_KEY = float("-inf")  # Ключ сортировки вакансий без зарплаты: они всегда в конце рейтинга
+
+_SALARY_FIELDS = frozenset(("salary", "salary_from", "currency"))  # Поля, от которых зависит sort_key
+
+
+def salary_sort_key(salary_to: Optional[float], salary_from: Optional[float] = None,
+                    currency: Optional[str] = BASE_CURRENCY) -> float:
+    """
+    Числовой ключ сортировки по зарплате: верхняя граница вилки (или нижняя, если верхней нет),
+    приведенная к рублям. Для вакансий без зарплаты и в неизвестной валюте - NO_SALARY_KEY.
+    """
+    amount = salary_to if salary_to is not None else salary_from
+    rate = CURRENCY_RATES.get(currency or BASE_CURRENCY)
+    if amount is None or rate is None:
+        return NO_SALARY_KEY
+    return amount * rate
+
+
+@dataclass(slots=True, init=False)
 class Vacancy:
-    """Модель вакансии"""
+    """Модель вакансии (без __dict__ у экземпляров, чтобы сотни тысяч вакансий занимали меньше памяти)"""
     title: str               # Название вакансии
     city: str                # Город размещения вакансии
     link: str                # Ссылка на вакансию
-    salary: Optional[int]    # Зарплата (может отсутствовать)
+    salary: Optional[int]    # Зарплата (может отсутствовать), верхняя граница вилки
     description: str         # Краткое описание или требования
+    salary_from: Optional[int] = None   # Нижняя граница вилки
+    currency: Optional[str] = None      # Валюта зарплаты (None - рубли)
+    gross: Optional[bool] = None        # Зарплата указана до вычета налогов
+    sort_key: float = field(init=False, repr=False, compare=False)  # Зарплата в рублях для сортировки
+
+    def __init__(self, title: str, city: str, link: str, salary: Optional[int], description: str,
+                 salary_from: Optional[int] = None, currency: Optional[str] = None, gross: Optional[bool] = None):
+        # Поля пишутся в слоты напрямую, в обход __setattr__: разбор создает сотни тысяч вакансий.
+        # Ключ сортировки считается один раз, сравнения и сортировка только читают готовое число из слота
+        _SET_TITLE(self, title)
+        _SET_CITY(self, city)
+        _SET_LINK(self, link)
+        _SET_SALARY(self, salary)
+        _SET_DESCRIPTION(self, description)
+        _SET_SALARY_FROM(self, salary_from)
+        _SET_CURRENCY(self, currency)
+        _SET_GROSS(self, gross)
+        _SET_SORT_KEY(self, salary_sort_key(salary, salary_from, currency))
+
+    def __setattr__(self, name, value):
+        """Изменение зарплаты или валюты пересчитывает ключ сортировки"""
+        object.__setattr__(self, name, value)
+        if name in _SALARY_FIELDS:
+            object.__setattr__(self, "sort_key", salary_sort_key(self.salary, self.salary_from, self.currency))
+
+    def __reduce__(self):
+        # Восстановление из pickle (пакетная выгрузка передает вакансии между процессами) идет через __init__:
+        # стандартное для слотов присваивание полей по одному вызвало бы __setattr__ до появления зарплаты
+        return Vacancy, (self.title, self.city, self.link, self.salary, self.description, self.salary_from,
+                         self.currency, self.gross)
 
     def _validate(self):
         """
@@ -16,51 +93,227 @@ class Vacancy:
         """
         if self.salary is not None and self.salary <= 0:
             raise ValueError(f"Некорректная зарплата {self.salary}")
+        if self.salary_from is not None and self.salary_from <= 0:
+            raise ValueError(f"Некорректная зарплата {self.salary_from}")
+
+    @property
+    def salary_rub(self) -> Optional[float]:
+        """Зарплата, приведенная к рублям"""
+        sort_key = self.sort_key
+        return sort_key if sort_key != NO_SALARY_KEY else None
 
     def __lt__(self, other):
-        """Метод для сравнения двух вакансий по зарплате (<)"""
-        if self.salary is None:
-            return False
-        if other.salary is None:
-            return True
-        return self.salary < other.salary
+        """Метод для сравнения двух вакансий по зарплате (<), вакансии без зарплаты считаются меньшими"""
+        return self.sort_key < other.sort_key
 
     def __gt__(self, other):
-        """Метод для сравнения двух вакансий по зарплате (>)"""
-        if self.salary is None:
-            return False
-        if other.salary is None:
-            return True
-        return self.salary > other.salary
+        """Метод для сравнения двух вакансий по зарплате (>), вакансии без зарплаты считаются меньшими"""
+        return self.sort_key > other.sort_key
+
+    def to_dict(self) -> dict:
+        """Представление вакансии для записи в хранилище: поля модели и зарплата в рублях (целым)"""
+        salary_rub = self.salary_rub
+        return {
+            "title": self.title,
+            "city": self.city,
+            "link": self.link,
+            "salary": self.salary,
+            "description": self.description,
+            "salary_from": self.salary_from,
+            "currency": self.currency,
+            "gross": self.gross,
+            "salary_rub": round(salary_rub) if salary_rub is not None else None,
+        }
+
+    @staticmethod
+    def from_dict(entry: dict) -> 'Vacancy':
+        """
+        Восстанавливает вакансию из записи хранилища.
+        Пропуски pandas (NaN) считаются отсутствующими значениями (в строковых полях - пустой строкой),
+        а записи, сохраненные до появления вилки и валюты, - зарплатами в рублях.
+        """
+        gross = _stored(entry.get("gross"))
+        return Vacancy(_stored_text(entry["title"]), _stored_text(entry["city"]), _stored_text(entry["link"]),
+                       _stored_int(entry.get("salary")), _stored_text(entry["description"]),
+                       _stored_int(entry.get("salary_from")), _stored(entry.get("currency")),
+                       None if gross is None else bool(gross))
+
+    @staticmethod
+    def from_api_item(item: dict) -> Optional['Vacancy']:
+        """
+        Преобразует одну вакансию из ответа API в объект Vacancy.
+        Возвращает None, если в записи нет обязательных полей, и бросает исключение при ошибочных значениях.
+        """
+        # Проверяем наличие необходимых полей
+        if 'name' not in item or 'url' not in item or 'snippet' not in item:
+            return None  # пропускаем вакансию, если обязательные поля отсутствуют
+
+        # Вилка, валюта и gross разбираются за один проход по блоку salary
+        salary_to, salary_from, currency, gross = _parse_salary(item['salary'])
+        # Позиционные аргументы: разбор идет на сотнях тысяч записей, именованные заметно медленнее
+        vacancy = Vacancy(item['name'], _parse_city(item), item['url'], salary_to, _parse_description(item),
+                          salary_from, currency, gross)
+        vacancy._validate()
+        return vacancy
 
     @staticmethod
-    def cast_to_object_list(data: List[dict]) -> List['Vacancy']:
+    def cast_to_object_list(data: List[dict], errors: Optional[List[ParseError]] = None) -> List['Vacancy']:
         """
         Преобразует список JSON-данных в список объектов Vacancy.
         Пропускает записи с ошибочными значениями.
+        :param errors: список, в который складываются причины пропуска записей (номер записи, причина)
         """
         vacancies = []
-        for item in data:
-            try:
-                # Проверяем наличие необходимых полей
-                if 'name' not in item or 'url' not in item or 'snippet' not in item:
-                    continue  # пропускаем вакансию, если обязательные поля отсутствуют
-
-                # Получаем зарплату, обрабатывая возможное отсутствие минимальной/максимальной зарплаты
-                salary = item['salary']['to'] if item['salary'] else None
-
-                # Новый пункт: получаем город вакансии
-                city = item['area']['name'] if 'area' in item else ''
-
-                vacancy = Vacancy(
-                    title=item['name'],      # название вакансии
-                    city=city,               # город вакансии
-                    link=item['url'],        # ссылка на вакансию
-                    salary=salary,           # максимальная зарплата
-                    description=item['snippet'].get('requirement', '')  # описание вакансии
-                )
-                vacancy._validate()
-                vacancies.append(vacancy)
-            except Exception as e:
-                print(f"Пропущена некорректная запись: {e}")
+        failed = 0
+        with metrics.timed("parse"):
+            for index, item in enumerate(data):
+                try:
+                    vacancy = Vacancy.from_api_item(item)
+                except Exception as e:
+                    reason = f"Некорректная запись: {e!r}"
+                else:
+                    if vacancy is not None:
+                        vacancies.append(vacancy)
+                        continue
+                    reason = "Нет обязательных полей name/url/snippet"
+                failed += 1
+                logger.debug("Пропущена запись %d: %s", index, reason)
+                if errors is not None:
+                    errors.append((index, reason))
+        metrics.inc("parse_ok", len(vacancies))
+        metrics.inc("parse_failed", failed)
         return vacancies
+
+    @staticmethod
+    def top_by_salary(vacancies: Iterable['Vacancy'], n: int) -> List['Vacancy']:
+        """n вакансий с наибольшей зарплатой в рублях: частичная сортировка кучей по готовому ключу"""
+        return heapq.nlargest(n, vacancies, key=attrgetter("sort_key"))
+
+
+# Запись в слоты Vacancy через их дескрипторы - в обход __setattr__, который пересчитывает ключ сортировки
+(_SET_TITLE, _SET_CITY, _SET_LINK, _SET_SALARY, _SET_DESCRIPTION, _SET_SALARY_FROM, _SET_CURRENCY, _SET_GROSS,
+ _SET_SORT_KEY) = (Vacancy.__dict__[name].__set__ for name in Vacancy.__slots__)
+
+
+def _parse_salary(salary: Optional[dict]) -> Tuple[Optional[int], Optional[int], Optional[str], Optional[bool]]:
+    """Блок salary: верхняя и нижняя граница вилки (целые), валюта (None - рубли) и признак gross"""
+    if not salary:
+        return None, None, None, None
+    # Получаем зарплату, обрабатывая возможное отсутствие минимальной/максимальной зарплаты
+    salary_to, salary_from, code = salary.get('to'), salary.get('from'), salary.get('currency')
+    return (int(salary_to) if salary_to is not None else None,
+            int(salary_from) if salary_from is not None else None,
+            _CURRENCY_CODES.get(code, code) if code else None,
+            salary.get('gross'))
+
+
+def _parse_city(item: dict) -> str:
+    area = item.get('area')
+    return area['name'] if area else ''
+
+
+def _parse_description(item: dict) -> str:
+    return item['snippet'].get('requirement') or ''
+
+
+class VacancyBatch:
+    """
+    Колоночное представление набора вакансий (struct-of-arrays): каждое поле хранится в своем списке,
+    а зарплаты и ключи сортировки - в плотных массивах double (NaN вместо отсутствующей зарплаты).
+    Не создает объект на каждую вакансию, поэтому занимает меньше памяти и быстрее строится
+    из ответов API, чем список Vacancy.
+    """
+    __slots__ = ("titles", "cities", "links", "salaries", "descriptions", "salaries_from", "currencies", "gross",
+                 "sort_keys", "errors")
+
+    def __init__(self):
+        self.titles: List[str] = []
+        self.cities: List[str] = []
+        self.links: List[str] = []
+        self.salaries = array("d")
+        self.descriptions: List[str] = []
+        self.salaries_from = array("d")
+        self.currencies: List[Optional[str]] = []
+        self.gross: List[Optional[bool]] = []
+        self.sort_keys = array("d")  # Зарплата в рублях, как Vacancy.sort_key
+        self.errors: List[ParseError] = []  # Причины пропуска записей при разборе
+
+    @classmethod
+    def from_api_items(cls, items: Iterable[dict]) -> 'VacancyBatch':
+        """Разбирает вакансии из ответов API пачкой, некорректные записи попадают в errors"""
+        batch = cls()
+        with metrics.timed("parse"):
+            for index, item in enumerate(items):
+                if 'name' not in item or 'url' not in item or 'snippet' not in item:
+                    batch.errors.append((index, "Нет обязательных полей name/url/snippet"))
+                    continue
+                try:
+                    salary_to, salary_from, currency, gross = _parse_salary(item['salary'])
+                    for amount in (salary_to, salary_from):
+                        if amount is not None and amount <= 0:
+                            raise ValueError(f"Некорректная зарплата {amount}")
+                    row = (item['name'], _parse_city(item), item['url'], salary_to, _parse_description(item),
+                           salary_from, currency, gross)
+                except Exception as e:
+                    batch.errors.append((index, f"Некорректная запись: {e!r}"))
+                    continue
+                batch._append_row(*row)
+        metrics.inc("parse_ok", len(batch))
+        metrics.inc("parse_failed", len(batch.errors))
+        return batch
+
+    def append(self, vacancy: Vacancy):
+        """Добавляет вакансию в конец набора"""
+        self._append_row(vacancy.title, vacancy.city, vacancy.link, vacancy.salary, vacancy.description,
+                         vacancy.salary_from, vacancy.currency, vacancy.gross)
+
+    def _append_row(self, title: str, city: str, link: str, salary: Optional[int], description: str,
+                    salary_from: Optional[int], currency: Optional[str], gross: Optional[bool]):
+        nan = float("nan")
+        self.titles.append(title)
+        self.cities.append(city)
+        self.links.append(link)
+        self.salaries.append(nan if salary is None else salary)
+        self.descriptions.append(description)
+        self.salaries_from.append(nan if salary_from is None else salary_from)
+        self.currencies.append(currency)
+        self.gross.append(gross)
+        self.sort_keys.append(salary_sort_key(salary, salary_from, currency))
+
+    def salary(self, index: int) -> Optional[int]:
+        """Зарплата вакансии с номером index"""
+        return _optional_int(self.salaries[index])
+
+    def top_by_salary(self, n: int) -> List[Vacancy]:
+        """n вакансий с наибольшей зарплатой в рублях"""
+        return [self[index] for index in heapq.nlargest(n, range(len(self)), key=self.sort_keys.__getitem__)]
+
+    def __len__(self):
+        return len(self.links)
+
+    def __getitem__(self, index: int) -> Vacancy:
+        return Vacancy(self.titles[index], self.cities[index], self.links[index], self.salary(index),
+                       self.descriptions[index], _optional_int(self.salaries_from[index]), self.currencies[index],
+                       self.gross[index])
+
+    def __iter__(self) -> Iterator[Vacancy]:
+        return (self[index] for index in range(len(self)))
+
+
+def _optional_int(value: float) -> Optional[int]:
+    return None if value != value else int(value)
+
+
+def _stored(value):
+    """Значение поля из хранилища: NaN, которым pandas отмечает пропуски, - как None"""
+    return None if value is None or (isinstance(value, float) and value != value) else value
+
+
+def _stored_text(value) -> str:
+    value = _stored(value)
+    return "" if value is None else value
+
+
+def _stored_int(value) -> Optional[int]:
+    value = _stored(value)
+    return None if value is None else int(value)
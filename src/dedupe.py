@@ -0,0 +1,200 @@
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from src.data_models import Vacancy
+from src.filters import is_null
+from src.search import SearchIndex, tokenize
+from src.storage import AbstractDataSaver
+
+# Поиск почти одинаковых вакансий (перепубликаций под другими ссылками) по названию и описанию.
+# Текст вакансии разбивается на шинглы - тройки подряд идущих термов (см. search.tokenize),
+# для каждой вакансии считается MinHash-сигнатура, а LSH-индекс по полосам сигнатуры отбирает
+# пары-кандидаты, не сравнивая все вакансии попарно. Кандидаты проверяются по оценке сходства
+# Жаккара (доле совпавших позиций сигнатуры) и объединяются в группы.
+
+_PRIME = (1 << 61) - 1  # Модуль хэш-функций вида (a * x + b) mod p
+_MAX_HASH = np.uint64(_PRIME)
+_CHUNK_SHINGLES = 50_000  # Сколько шинглов хэшировать за один шаг (ограничивает память на матрицу)
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    """Шинглы текста: последовательности из size подряд идущих термов (короткий текст - один шингл)"""
+    terms = tokenize(text)
+    if len(terms) <= size:
+        return [" ".join(terms)] if terms else []
+    return [" ".join(terms[i:i + size]) for i in range(len(terms) - size + 1)]
+
+
+class MinHasher:
+    """
+    Вычисляет MinHash-сигнатуры: для каждой из num_perm хэш-функций - минимум по шинглам документа.
+    Доля совпадающих позиций двух сигнатур - несмещенная оценка сходства Жаккара множеств шинглов.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        """
+        :param num_perm: длина сигнатуры (больше - точнее оценка, но медленнее)
+        :param shingle_size: сколько термов в шингле
+        :param seed: зерно для коэффициентов хэш-функций (сигнатуры сравнимы только при одинаковом зерне)
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Коэффициенты и хэши шинглов (crc32) меньше 2^32, поэтому a * x + b помещается в 64 бита
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Сигнатура одного текста"""
+        return self.signatures([text])[0]
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Сигнатуры многих текстов матрицей (число текстов x num_perm).
+        Хэши шинглов всех текстов пачки считаются одной матричной операцией, минимумы по документам -
+        через np.minimum.reduceat. У пустого текста сигнатура из максимальных значений.
+        """
+        hashes: List[int] = []
+        starts: List[int] = []
+        result: List[np.ndarray] = []
+        for text in texts:
+            starts.append(len(hashes))
+            hashes.extend(zlib.crc32(shingle.encode("utf-8")) for shingle in
+                          set(shingles(text, self.shingle_size)))
+            if len(hashes) >= _CHUNK_SHINGLES:
+                result.append(self._reduce(hashes, starts))
+                hashes, starts = [], []
+        if starts:
+            result.append(self._reduce(hashes, starts))
+        if not result:
+            return np.empty((0, self.num_perm), dtype=np.uint64)
+        return np.vstack(result)
+
+    def _reduce(self, hashes: List[int], starts: List[int]) -> np.ndarray:
+        signatures = np.full((len(starts), self.num_perm), _MAX_HASH, dtype=np.uint64)
+        if not hashes:
+            return signatures
+        values = np.asarray(hashes, dtype=np.uint64)[:, None]
+        permuted = (values * self._a + self._b) % _MAX_HASH
+        # reduceat не умеет пустые отрезки: считаем только по документам, у которых есть шинглы
+        bounds = np.asarray(starts + [len(hashes)])
+        non_empty = np.flatnonzero(bounds[1:] > bounds[:-1])
+        signatures[non_empty] = np.minimum.reduceat(permuted, bounds[non_empty], axis=0)
+        return signatures
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Оценка сходства Жаккара по двум сигнатурам"""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+def optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Разбиение сигнатуры на bands полос по rows позиций, при котором порог срабатывания LSH
+    (1 / bands) ** (1 / rows) ближе всего к заданному порогу сходства.
+    """
+    options = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+
+class LSHIndex:
+    """
+    LSH-индекс по MinHash-сигнатурам: сигнатура режется на полосы, документы с совпавшей
+    хотя бы одной полосой попадают в одну корзину и становятся кандидатами в дубли.
+    """
+
+    def __init__(self, num_perm: int = 128, threshold: float = 0.8):
+        self.threshold = threshold
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def add(self, key: str, signature: np.ndarray):
+        """Добавляет документ в индекс"""
+        self._signatures[key] = signature
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            bucket.setdefault(band, []).append(key)
+
+    def query(self, signature: np.ndarray) -> List[Tuple[str, float]]:
+        """Документы индекса, похожие на сигнатуру не меньше порога, с оценкой сходства"""
+        candidates = set()
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            candidates.update(bucket.get(band, ()))
+        found = [(key, similarity(signature, self._signatures[key])) for key in candidates]
+        return sorted((item for item in found if item[1] >= self.threshold), key=lambda item: -item[1])
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _bands(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+
+def find_near_duplicates(entries: Sequence[Dict], threshold: float = 0.8, num_perm: int = 128,
+                         hasher: Optional[MinHasher] = None) -> List[List[int]]:
+    """
+    Группы почти одинаковых вакансий.
+    :param entries: записи хранилища (словари с title и description)
+    :param threshold: минимальное сходство Жаккара шинглов, при котором вакансии считаются дублями
+    :param num_perm: длина MinHash-сигнатуры
+    :param hasher: готовый MinHasher (по умолчанию создается с num_perm)
+    :return: группы из двух и более номеров записей, внутри группы - по возрастанию
+    """
+    hasher = hasher or MinHasher(num_perm)
+    # Дубли ищутся по тому же тексту (название и описание), что индексирует полнотекстовый поиск
+    signatures = hasher.signatures(SearchIndex.document_text(entry) for entry in entries)
+    index = LSHIndex(hasher.num_perm, threshold)
+    parent = list(range(len(entries)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, signature in enumerate(signatures):
+        if signature[0] == _MAX_HASH and (signature == _MAX_HASH).all():
+            continue  # В тексте нет ни одного терма: сравнивать не с чем
+        for key, _ in index.query(signature):
+            root, other = find(i), find(int(key))
+            if root != other:
+                parent[max(root, other)] = min(root, other)
+        index.add(str(i), signature)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(entries)):
+        groups.setdefault(find(i), []).append(i)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def collapse_duplicates(saver: AbstractDataSaver, threshold: Optional[float] = 0.8,
+                        num_perm: int = 128) -> Dict[str, int]:
+    """
+    Схлопывает дубли в уже заполненном хранилище: из вакансий с одинаковой ссылкой и из групп
+    почти одинаковых вакансий остается первая сохраненная (у почти одинаковых - с указанной зарплатой,
+    если она есть хотя бы у одной). Хранилище перезаписывается одной атомарной заменой
+    (см. AbstractDataSaver.replace_vacancies) и только если дубли нашлись.
+    :param saver: хранилище вакансий
+    :param threshold: порог сходства для почти одинаковых вакансий (None - только дубли по ссылке)
+    :param num_perm: длина MinHash-сигнатуры
+    :return: счетчики total, exact, near, kept
+    """
+    entries = saver.get_vacancies()
+    unique: Dict[str, Dict] = {}
+    for entry in entries:
+        unique.setdefault(entry["link"], entry)
+    kept = list(unique.values())
+    stats = {"total": len(entries), "exact": len(entries) - len(kept), "near": 0}
+
+    if threshold is not None:
+        dropped = set()
+        for group in find_near_duplicates(kept, threshold, num_perm):
+            keep = next((i for i in group if not is_null(kept[i].get("salary"))), group[0])
+            dropped.update(i for i in group if i != keep)
+        kept = [entry for i, entry in enumerate(kept) if i not in dropped]
+        stats["near"] = len(dropped)
+
+    stats["kept"] = len(kept)
+    if len(kept) != len(entries):
+        saver.replace_vacancies(Vacancy.from_dict(entry) for entry in kept)
+    return stats
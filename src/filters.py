@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd  # pandas импортируется только там, где нужен: сам импорт занимает полсекунды
+
+# Критерии отбора - словарь "поле -> условие". Условие может быть:
+#   значением          - равенство (None - значение отсутствует);
+#   кортежем (low, high) - диапазон с включенными границами, None вместо границы - без ограничения;
+#   списком/множеством - значение входит в набор (isin);
+#   Contains("текст")  - подстрока без учета регистра (для title/description).
+# Поле, которого нет в записи, считается отсутствующим значением (None).
+
+
+@dataclass(frozen=True)
+class Contains:
+    """Критерий поиска подстроки без учета регистра"""
+    text: str
+
+    @property
+    def needle(self) -> str:
+        return self.text.casefold()
+
+
+def is_null(value: Any) -> bool:
+    """Отсутствует ли значение (None или NaN, который pandas ставит на месте пропусков)"""
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def matches(entry: Dict, criteria: Optional[Dict]) -> bool:
+    """Проверяет, подходит ли запись-словарь под все критерии"""
+    for key, condition in (criteria or {}).items():
+        if not _matches_value(entry.get(key), condition):
+            return False
+    return True
+
+
+def _matches_value(value: Any, condition: Any) -> bool:
+    if isinstance(condition, tuple):
+        low, high = condition
+        return not is_null(value) and (low is None or low <= value) and (high is None or value <= high)
+    if isinstance(condition, (list, set, frozenset)):
+        if is_null(value):
+            return any(is_null(item) for item in condition)
+        return value in condition
+    if isinstance(condition, Contains):
+        return not is_null(value) and condition.needle in str(value).casefold()
+    if condition is None:
+        return is_null(value)
+    return not is_null(value) and value == condition
+
+
+def build_mask(df: "pd.DataFrame", criteria: Optional[Dict]) -> "pd.Series":
+    """Векторно вычисляет булеву маску строк таблицы, подходящих под все критерии"""
+    import pandas as pd
+
+    mask = pd.Series(True, index=df.index)
+    for key, condition in (criteria or {}).items():
+        if key not in df.columns:
+            column = pd.Series(None, index=df.index, dtype=object)
+        else:
+            column = df[key]
+        mask &= _column_mask(column, condition)
+    return mask
+
+
+def _column_mask(column: "pd.Series", condition: Any) -> "pd.Series":
+    import pandas as pd
+
+    if isinstance(condition, tuple):
+        low, high = condition
+        values = pd.to_numeric(column, errors="coerce")
+        mask = values.notna()
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+        return mask.fillna(False).astype(bool)
+    if isinstance(condition, (list, set, frozenset)):
+        items = [item for item in condition if not is_null(item)]
+        mask = column.isin(items) & column.notna()
+        if len(items) != len(condition):
+            mask |= column.isna()
+        return mask
+    if isinstance(condition, Contains):
+        text = column.astype("string").str.casefold()
+        return text.str.contains(condition.needle, regex=False).fillna(False).astype(bool)
+    if condition is None:
+        return column.isna()
+    return (column == condition) & column.notna()
+
+
+def apply_criteria(df: "pd.DataFrame", criteria: Optional[Dict]) -> "pd.DataFrame":
+    """Отбирает строки таблицы по критериям"""
+    if not criteria:
+        return df
+    return df[build_mask(df, criteria)]
@@ -1,81 +1,121 @@
 from api import HeadHunterAPI
-from data_models import Vacancy
-from storage import JSONSaver, CSVSaver, XLSSaver
+from cache import ResponseCache
+from data_models import BASE_CURRENCY, Vacancy
+from search import SearchIndex
+from stats import HISTOGRAM_EDGES, SalaryStats
+from sync import IncrementalSync
+from storage import JSONSaver, CSVSaver, XLSSaver, IndexedSaver
+
+
+def format_salary(vacancy) -> str:
+    """Зарплата для вывода: вилка в валюте вакансии, для других валют - еще и в пересчете на рубли"""
+    salary = Vacancy.from_dict(vacancy)  # пропуски из CSV/XLSX (NaN) приводятся к None
+    if salary.salary is None and salary.salary_from is None:
+        return "не указана"
+    if salary.salary is None:
+        text = f"от {salary.salary_from}"
+    elif salary.salary_from is None:
+        text = f"до {salary.salary}"
+    else:
+        text = f"{salary.salary_from}–{salary.salary}"
+    if salary.currency in (None, BASE_CURRENCY):
+        return f"{text} руб."
+    if salary.salary_rub is None:
+        return f"{text} {salary.currency}"
+    return f"{text} {salary.currency} (≈{round(salary.salary_rub)} руб.)"
 
 
 class UserInteraction:
     """Обеспечивает взаимодействие с пользователем через консоль"""
 
     def run(self):
-        hh_api = HeadHunterAPI()
+        hh_api = HeadHunterAPI(cache=ResponseCache())
         profession = input("🧐 Введите желаемую профессию (например, 'Java-разработчик'): ")
-        vacancies = hh_api.get_vacancies(profession)
-        vacancies_objs = Vacancy.cast_to_object_list(vacancies)
-
-        saver = JSONSaver()  # или CSVSaver(), или XLSSaver()
-        for vacancy in vacancies_objs:
-            saver.add_vacancy(vacancy)
-
-        while True:
-            print("\n🔍 Меню:")
-            print("1️⃣ Показать вакансии")
-            print("2️⃣ Выбрать вакансию")
-            print("3️⃣ Фильтрация по зарплате")
-            print("4️⃣ Фильтрация по региону")
-            print("5️⃣ Фильтрация по опыту работы")
-            print("6️⃣ Фильтрация по городу")
-            print("7️⃣ Удалить вакансию")
-            print("8️⃣ Перезадать профессию")
-            print("9️⃣ Выход")
-            choice = input("✨ Ваш выбор: ")
-
-            if choice == '1':
-                self.show_vacancies(saver.get_vacancies())
-
-            elif choice == '2':
-                self.select_vacancy(saver.get_vacancies())
-
-            elif choice == '3':
-                min_salary = input("💰 Минимальная зарплата: ")
-                max_salary = input("💰 Максимальная зарплата: ")
-                filtered = saver.get_vacancies({"salary": (float(min_salary), float(max_salary))})
-                self.show_vacancies(filtered)
-
-            elif choice == '4':
-                region = input("🏘 Регион (Москва, Петербург и т.д.): ")
-                filtered = saver.get_vacancies({"region": region})
-                self.show_vacancies(filtered)
-
-            elif choice == '5':
-                exp_level = input("👩‍💻 Уровень опыта (Junior/Middle/Senior): ")
-                filtered = saver.get_vacancies({"experience": exp_level})
-                self.show_vacancies(filtered)
-
-            elif choice == '6':  # Фильтрация по городу
-                city = input("📍 Город (например, Москва): ")
-                filtered = saver.get_vacancies({"city": city})
-                self.show_vacancies(filtered)
-
-            elif choice == '7':
-                title = input("📌 Название вакансии для удаления: ")
-                link = input("🔗 Ссылка на вакансию: ")
-                vacancy_to_delete = Vacancy(title, '', link, None, '')
-                saver.delete_vacancy(vacancy_to_delete)
-                print("✅ Удалено!")
-
-            elif choice == '8':
-                profession = input("🧐 Введите новую профессию (например, 'Android-разработчик'): ")
-                vacancies = hh_api.get_vacancies(profession)
-                vacancies_objs = Vacancy.cast_to_object_list(vacancies)
-                saver.clear()  # очищаем старое хранилище
-                for vacancy in vacancies_objs:
-                    saver.add_vacancy(vacancy)
-
-            elif choice == '9':
-                break
-
-            else:
-                print("❗ Ошибка выбора меню. Повторите попытку.")
+
+        # Вакансии держим в памяти с индексами, файл (JSONSaver(), CSVSaver(), XLSSaver()...) обновляем при выходе
+        search_index = SearchIndex()  # поиск по словам в названиях и описаниях, обновляется вместе с хранилищем
+        salary_stats = SalaryStats()  # статистика зарплат по городам, тоже обновляется вместе с хранилищем
+        saver = IndexedSaver(JSONSaver(), listeners=[search_index, salary_stats])
+        # Загружаются только вакансии, появившиеся с прошлого запуска по той же профессии
+        sync = IncrementalSync(hh_api, saver)
+        sync.run(profession)
+
+        # Хранилище сбрасывается на диск и при выходе через меню, и при прерывании (Ctrl+C, ошибка ввода)
+        try:
+            while True:
+                print("\n🔍 Меню:")
+                print("1️⃣ Показать вакансии")
+                print("2️⃣ Выбрать вакансию")
+                print("3️⃣ Фильтрация по зарплате")
+                print("4️⃣ Фильтрация по региону")
+                print("5️⃣ Фильтрация по опыту работы")
+                print("6️⃣ Фильтрация по городу")
+                print("7️⃣ Удалить вакансию")
+                print("8️⃣ Перезадать профессию")
+                print("9️⃣ Выход")
+                print("🔟 Поиск по ключевым словам")
+                print("1️⃣1️⃣ Статистика зарплат по городам")
+                choice = input("✨ Ваш выбор: ")
+
+                if choice == '1':
+                    self.show_vacancies(saver.get_vacancies())
+
+                elif choice == '2':
+                    self.select_vacancy(saver.get_vacancies())
+
+                elif choice == '3':
+                    min_salary = input("💰 Минимальная зарплата, руб.: ")
+                    max_salary = input("💰 Максимальная зарплата, руб.: ")
+                    # Фильтр по зарплате, приведенной к рублям: вакансии в других валютах сравниваются по курсу
+                    filtered = saver.get_vacancies({"salary_rub": (float(min_salary), float(max_salary))})
+                    self.show_vacancies(filtered)
+
+                elif choice == '4':
+                    region = input("🏘 Регион (Москва, Петербург и т.д.): ")
+                    filtered = saver.get_vacancies({"region": region})
+                    self.show_vacancies(filtered)
+
+                elif choice == '5':
+                    exp_level = input("👩‍💻 Уровень опыта (Junior/Middle/Senior): ")
+                    filtered = saver.get_vacancies({"experience": exp_level})
+                    self.show_vacancies(filtered)
+
+                elif choice == '6':  # Фильтрация по городу
+                    city = input("📍 Город (например, Москва): ")
+                    filtered = saver.get_vacancies({"city": city})
+                    self.show_vacancies(filtered)
+
+                elif choice == '7':
+                    title = input("📌 Название вакансии для удаления: ")
+                    link = input("🔗 Ссылка на вакансию: ")
+                    vacancy_to_delete = Vacancy(title, '', link, None, '')
+                    saver.delete_vacancy(vacancy_to_delete)
+                    print("✅ Удалено!")
+
+                elif choice == '8':
+                    new_profession = input("🧐 Введите новую профессию (например, 'Android-разработчик'): ")
+                    if IncrementalSync.make_key(new_profession) != IncrementalSync.make_key(profession):
+                        saver.clear()  # очищаем старое хранилище
+                        sync.reset()
+                    profession = new_profession
+                    sync.run(profession)
+
+                elif choice == '9':
+                    break
+
+                elif choice == '10':
+                    query = input("🔎 Ключевые слова (например, 'Python Django'): ")
+                    links = [link for link, _ in search_index.search(query)]
+                    by_link = {vacancy['link']: vacancy for vacancy in saver.get_vacancies({"link": links})}
+                    self.show_vacancies([by_link[link] for link in links if link in by_link])
+
+                elif choice == '11':
+                    self.show_stats(salary_stats)
+
+                else:
+                    print("❗ Ошибка выбора меню. Повторите попытку.")
+        finally:
+            saver.flush()
 
     def select_vacancy(self, vacancies):
         if len(vacancies) == 0:
@@ -85,7 +125,7 @@ class UserInteraction:
         print("\nСписок вакансий:\n")
         for idx, vacancy in enumerate(vacancies):
             print(
-                f"{idx + 1}. 🎯 {vacancy['title']} ({vacancy['city']}) 👉 {vacancy['link']}\nЗаработок: {vacancy['salary']}\nОписание: {vacancy['description']}\n")
+                f"{idx + 1}. 🎯 {vacancy['title']} ({vacancy['city']}) 👉 {vacancy['link']}\nЗаработок: {format_salary(vacancy)}\nОписание: {vacancy['description']}\n")
 
         selection = input("🖊 Выберите номер вакансии для детализации (или Enter для отмены): ")
         if selection.isdigit() and 1 <= int(selection) <= len(vacancies):
@@ -95,15 +135,34 @@ class UserInteraction:
             print(f"🎯 Название: {selected_vacancy['title']}")
             print(f"📍 Город: {selected_vacancy['city']}")  # Добавлен вывод города
             print(f"🔗 Ссылка: {selected_vacancy['link']}")
-            print(f"💰 Заработок: {selected_vacancy['salary']}")
+            print(f"💰 Заработок: {format_salary(selected_vacancy)}")
             print(f"📝 Требования: {selected_vacancy['description']}")
         else:
             print("❌ Отмена выбора.")
 
+    def show_stats(self, salary_stats):
+        overall = salary_stats.overall()
+        if overall["count"] == 0:
+            print("🚫 Нет сохраненных вакансий.")
+            return
+
+        print(f"\n📊 Всего вакансий: {overall['count']}, с зарплатой: {overall['with_salary']}")
+        print(f"💰 Зарплата, руб.: мин. {overall['min']}, медиана {overall['median']}, макс. {overall['max']}")
+        print("\nПо городам:")
+        for city, city_stats in salary_stats.by_city().items():
+            print(f"📍 {city or 'Не указан'}: {city_stats['count']} вакансий, с зарплатой {city_stats['with_salary']}; "
+                  f"мин. {city_stats['min']}, медиана {city_stats['median']}, макс. {city_stats['max']}")
+        print("\nРаспределение зарплат, руб.:")
+        widest = max(overall["histogram"]) or 1
+        for index, count in enumerate(overall["histogram"]):
+            low = HISTOGRAM_EDGES[index]
+            label = f"{low}–{HISTOGRAM_EDGES[index + 1]}" if index + 1 < len(HISTOGRAM_EDGES) else f"от {low}"
+            print(f"{label:>15} | {'█' * round(30 * count / widest)} {count}")
+
     def show_vacancies(self, vacancies):
         if len(vacancies) > 0:
             for i, vacancy in enumerate(vacancies):
                 print(
-                    f"\n{i + 1}. 🎯 {vacancy['title']} ({vacancy['city']}) 👉 {vacancy['link']}\nЗаработок: {vacancy['salary']}\nОписание: {vacancy['description']}")
+                    f"\n{i + 1}. 🎯 {vacancy['title']} ({vacancy['city']}) 👉 {vacancy['link']}\nЗаработок: {format_salary(vacancy)}\nОписание: {vacancy['description']}")
         else:
             print("🚫 Нет подходящих вакансий.")
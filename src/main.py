@@ -1,5 +1,14 @@
-from interaction import UserInteraction
+import sys
+from src import metrics
 
 if __name__ == "__main__":
-    ui = UserInteraction()
-    ui.run()
+    # VACANCY_METRICS=1 - выгрузить метрики в data/metrics.json, VACANCY_PROFILE=cpu,memory - профили
+    with metrics.capture():
+        if len(sys.argv) > 1:
+            # С аргументами - пакетная выгрузка по файлу запросов, без них - интерактивное меню
+            from batch import main
+            main(sys.argv[1:])
+        else:
+            from interaction import UserInteraction
+            ui = UserInteraction()
+            ui.run()
@@ -0,0 +1,212 @@
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterator, Optional, Tuple
+from src.atomic import atomic_write
+
+# Легковесные метрики: счетчики и таймеры с метками, общие для всего процесса.
+# По умолчанию сбор выключен и каждая точка измерения стоит одной проверки флага ENABLED.
+# Включается переменной окружения VACANCY_METRICS=1 (или вызовом enable()), снимок выгружается
+# функцией export() в JSON или в текстовый формат Prometheus.
+# Профилирование включается отдельно: VACANCY_PROFILE=cpu, memory или cpu,memory (см. profile()).
+
+DATA_DIR = "data"  # Папка для снимков метрик и профилей
+PREFIX = "vacancy_"  # Префикс имен метрик в формате Prometheus
+
+ENABLED = os.environ.get("VACANCY_METRICS", "").lower() not in ("", "0", "false", "no")
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]  # (имя, отсортированные метки)
+
+_lock = threading.Lock()
+_counters: Dict[Key, float] = {}
+_timings: Dict[Key, list] = {}  # ключ -> [число замеров, сумма секунд, максимум секунд]
+
+
+def enable():
+    """Включает сбор метрик"""
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    """Выключает сбор метрик (накопленные значения сохраняются)"""
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """Обнуляет все метрики"""
+    with _lock:
+        _counters.clear()
+        _timings.clear()
+
+
+def _key(name: str, labels: Dict) -> Key:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels):
+    """Увеличивает счетчик name с метками labels на value"""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, **labels):
+    """Добавляет замер длительности в таймер name"""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        timing = _timings.get(key)
+        if timing is None:
+            _timings[key] = [1, seconds, seconds]
+        else:
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+
+class timed:
+    """
+    Замер длительности блока кода или функции в таймер name.
+    Используется как контекстный менеджер (with timed("parse"): ...) и как декоратор (@timed("parse")).
+    """
+
+    def __init__(self, name: str, **labels):
+        self.name = name
+        self.labels = labels
+        self._started: Optional[float] = None
+
+    def __enter__(self):
+        self._started = time.perf_counter() if ENABLED else None
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._started is not None:
+            observe(self.name, time.perf_counter() - self._started, **self.labels)
+
+    def __call__(self, function):
+        name, labels = self.name, self.labels
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - started, **labels)
+        return wrapper
+
+
+def snapshot() -> Dict:
+    """Текущие значения метрик в виде словаря, пригодного для JSON"""
+    def labelled(key: Key) -> Dict:
+        name, labels = key
+        return {"name": name, "labels": dict(labels)}
+
+    with _lock:
+        return {
+            "counters": [dict(labelled(key), value=value) for key, value in sorted(_counters.items())],
+            "timings": [dict(labelled(key), count=count, sum_seconds=total, max_seconds=maximum)
+                        for key, (count, total, maximum) in sorted(_timings.items())],
+        }
+
+
+def to_prometheus() -> str:
+    """Снимок метрик в текстовом формате Prometheus: счетчики - *_total, таймеры - summary в секундах"""
+    def labels_text(labels: Dict) -> str:
+        if not labels:
+            return ""
+        escaped = (key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+                   for key, value in labels.items())
+        return "{" + ",".join(escaped) + "}"
+
+    data = snapshot()
+    lines = []
+    typed = set()
+    for counter in data["counters"]:
+        metric = f"{PREFIX}{counter['name']}_total"
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} counter")
+            typed.add(metric)
+        lines.append(f"{metric}{labels_text(counter['labels'])} {counter['value']}")
+    for timing in data["timings"]:
+        metric = f"{PREFIX}{timing['name']}_seconds"
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} summary")
+            typed.add(metric)
+        labels = labels_text(timing["labels"])
+        lines.append(f"{metric}_count{labels} {timing['count']}")
+        lines.append(f"{metric}_sum{labels} {timing['sum_seconds']}")
+    return "\n".join(lines) + "\n"
+
+
+def export(file_path: Optional[str] = None):
+    """
+    Записывает снимок метрик в файл: *.prom - в формате Prometheus, иначе в JSON.
+    :param file_path: путь к файлу (по умолчанию VACANCY_METRICS_FILE или data/metrics.json)
+    """
+    file_path = file_path or os.environ.get("VACANCY_METRICS_FILE") or os.path.join(DATA_DIR, "metrics.json")
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    if file_path.endswith(".prom"):
+        text = to_prometheus()
+        atomic_write(file_path, lambda file: file.write(text))
+    else:
+        data = snapshot()
+        atomic_write(file_path, lambda file: json.dump(data, file, ensure_ascii=False, indent=4))
+
+
+@contextmanager
+def profile(modes: Optional[str] = None) -> Iterator[None]:
+    """
+    Профилирует блок кода.
+    cpu - cProfile, результат в data/profile.prof (смотреть через python -m pstats или snakeviz);
+    memory - tracemalloc, 30 мест с наибольшим объемом выделенной памяти в data/memory_profile.txt.
+    :param modes: режимы через запятую (по умолчанию из VACANCY_PROFILE, пусто - без профилирования)
+    """
+    modes = modes if modes is not None else os.environ.get("VACANCY_PROFILE", "")
+    selected = {mode.strip().lower() for mode in modes.split(",") if mode.strip()}
+    if not selected:
+        yield
+        return
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    profiler = cProfile.Profile() if "cpu" in selected else None
+    if "memory" in selected:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(DATA_DIR, "profile.prof"))
+        if "memory" in selected:
+            top = tracemalloc.take_snapshot().statistics("lineno")[:30]
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(os.path.join(DATA_DIR, "memory_profile.txt"), "w", encoding="utf-8") as file:
+                file.write(f"Пик: {peak / 1024 / 1024:.1f} МиБ\n")
+                file.writelines(f"{stat}\n" for stat in top)
+
+
+@contextmanager
+def capture() -> Iterator[None]:
+    """Профилирует блок по VACANCY_PROFILE и по его завершении выгружает метрики, если сбор включен"""
+    try:
+        with profile():
+            yield
+    finally:
+        if ENABLED:
+            export()
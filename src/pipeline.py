@@ -0,0 +1,122 @@
+import queue
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from src.api import HeadHunterAPI
+from src.data_models import Vacancy
+from src.storage import AbstractDataSaver
+
+# Потоковая загрузка вакансий: страница API -> разбор -> устранение дублей -> запись пачками.
+# Этапы - генераторы, которые передают друг другу пачки по batch_size вакансий, а между загрузкой
+# и разбором стоит очередь ограниченного размера. В памяти одновременно находится не больше
+# queue_size + 2 пачек, а каждая пачка попадает в хранилище сразу после загрузки.
+
+_DONE = object()  # Признак окончания загрузки в очереди
+
+
+def fetch_batches(api: HeadHunterAPI, query: str, batch_size: int = 100, queue_size: int = 4,
+                  **params) -> Iterator[List[Dict]]:
+    """
+    Загружает вакансии в фоновом потоке и отдает их пачками через ограниченную очередь.
+    Если потребитель отстает, загрузка приостанавливается, пока в очереди не освободится место.
+    """
+    batches: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        items = api.iter_vacancies(query, **params)
+        try:
+            batch = []
+            for item in items:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    if not put(batch):
+                        return
+                    batch = []
+            if batch:
+                put(batch)
+            put(_DONE)
+        except Exception as error:
+            put(error)
+        finally:
+            items.close()
+
+    producer = threading.Thread(target=produce, name=f"fetch-{query}", daemon=True)
+    producer.start()
+    try:
+        while True:
+            batch = batches.get()
+            if batch is _DONE:
+                return
+            if isinstance(batch, Exception):
+                raise batch
+            yield batch
+    finally:
+        stop.set()
+        producer.join()
+
+
+def parse_batches(batches: Iterable[List[Dict]], stats: Dict[str, int]) -> Iterator[List[Vacancy]]:
+    """Разбирает пачки ответов API в объекты Vacancy, некорректные записи пропускаются"""
+    for batch in batches:
+        vacancies = []
+        for item in batch:
+            stats["fetched"] += 1
+            try:
+                vacancy = Vacancy.from_api_item(item)
+            except Exception:
+                vacancy = None
+            if vacancy is None:
+                stats["skipped"] += 1
+            else:
+                vacancies.append(vacancy)
+        yield vacancies
+
+
+def dedupe_batches(batches: Iterable[List[Vacancy]], stats: Dict[str, int],
+                   seen: Optional[Set[str]] = None) -> Iterator[List[Vacancy]]:
+    """Убирает вакансии, ссылки на которые уже встречались"""
+    seen = set() if seen is None else seen
+    for batch in batches:
+        unique = []
+        for vacancy in batch:
+            if vacancy.link in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(vacancy.link)
+            unique.append(vacancy)
+        yield unique
+
+
+def write_batches(batches: Iterable[List[Vacancy]], saver: AbstractDataSaver, stats: Dict[str, int]):
+    """Записывает каждую пачку в хранилище одним вызовом add_vacancies"""
+    for batch in batches:
+        if batch:
+            saver.add_vacancies(batch)
+            stats["written"] += len(batch)
+
+
+def ingest(api: HeadHunterAPI, query: str, saver: AbstractDataSaver, batch_size: int = 100,
+           queue_size: int = 4, **params) -> Dict[str, int]:
+    """
+    Загружает все вакансии по запросу в хранилище потоково.
+    :param api: клиент API
+    :param query: строка поиска (например, профессия)
+    :param saver: хранилище вакансий
+    :param batch_size: размер пачки, которой вакансии передаются между этапами и пишутся в хранилище
+    :param queue_size: сколько пачек может ждать разбора
+    :param params: дополнительные параметры запроса к API
+    :return: счетчики fetched, skipped, duplicates, written
+    """
+    stats = dict.fromkeys(("fetched", "skipped", "duplicates", "written"), 0)
+    batches = fetch_batches(api, query, batch_size, queue_size, **params)
+    write_batches(dedupe_batches(parse_batches(batches, stats), stats), saver, stats)
+    return stats
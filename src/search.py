@@ -0,0 +1,165 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from src.atomic import atomic_write
+
+# Токенизация: нижний регистр, "ё" -> "е", слова из кириллицы, латиницы и цифр
+_WORD_RE = re.compile(r"[0-9a-zа-я]+(?:[+#]+)?")
+
+STOP_WORDS = frozenset("""
+    и в во не что он на я с со как а то все она так его но да ты к у же вы за бы по только ее мне было вот
+    от меня еще нет о из ему теперь когда даже ну ли если уже или ни быть был него до вас нибудь опять уж
+    вам ведь там потом себя ничего ей может они тут где есть надо ней для мы тебя их чем была сам чтоб без
+    будто чего раз тоже себе под будет ж тогда кто этот того потому этого какой совсем ним здесь этом один
+    почти мой тем чтобы нее были куда зачем всех никогда можно при наконец два об другой хоть после над
+    больше тот через эти нас про всего них какая много разве три эту моя впрочем хорошо свою этой перед
+    иногда лучше чуть том нельзя такой им более всегда конечно всю между
+    the a an and or of to in for on with at by from is are be as
+""".split())
+
+# Окончания для облегченного стемминга
+_RU_ENDINGS = frozenset("""
+    иями ями ами иях ях ах ом ам ям ов ев ей ий ый ой ая яя ое ее ые ие ых их ым им ому ему ого его ую юю
+    ость ости остью ение ения ению ением ении ениям ать ять ить еть ует ают ет ит ут ют ешь ишь ем
+    ться тся ся сь ла ло ли на но ны ии ия ью ья а я о е ы и у ю ь й
+""".split())
+_EN_ENDINGS = frozenset(("s",))
+_MAX_ENDING = max(map(len, _RU_ENDINGS))
+_MIN_STEM = 3  # Короче основы слово не обрезается
+
+
+@lru_cache(maxsize=100_000)
+def stem(word: str) -> str:
+    """Облегченный стемминг: отбрасывает самое длинное известное окончание, оставляя основу не короче 3 букв"""
+    endings = _EN_ENDINGS if word.isascii() else _RU_ENDINGS
+    # Проверяем окончания от длинных к коротким поиском в множестве, а не перебором списка
+    for length in range(min(len(word) - _MIN_STEM, _MAX_ENDING), 0, -1):
+        if word[-length:] in endings:
+            return word[:-length]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на термы: слова без стоп-слов, приведенные к основе"""
+    words = _WORD_RE.findall(text.lower().replace("ё", "е"))
+    return [stem(word) for word in words if word not in STOP_WORDS]
+
+
+class SearchIndex:
+    """
+    Инвертированный индекс по названиям и описаниям вакансий с ранжированием BM25.
+    Документ индекса - вакансия, ключ - ссылка на нее. Индекс обновляется по одной вакансии
+    и сохраняется в JSON-файл рядом с данными.
+    Подключается к IndexedSaver как слушатель: sync/on_add/on_delete/on_clear/flush.
+    """
+    DATA_DIR = "data"  # Папка для хранения данных
+    K1 = 1.5   # Насыщение частоты терма
+    B = 0.75   # Нормализация по длине документа
+
+    def __init__(self, filename="search_index.json"):
+        # Проверяем существование папки и создаем её, если её нет
+        os.makedirs(SearchIndex.DATA_DIR, exist_ok=True)
+        self.file_path = os.path.join(SearchIndex.DATA_DIR, filename)
+        self._documents: Dict[str, Dict[str, int]] = {}  # ссылка -> {терм: частота терма}
+        self._postings: Dict[str, Dict[str, int]] = {}   # терм -> {ссылка: частота терма}
+        self._lengths: Dict[str, int] = {}               # ссылка -> число термов в документе
+        self._total_length = 0
+        self._load()
+
+    @staticmethod
+    def document_text(entry: Dict) -> str:
+        """Текст вакансии, который попадает в индекс"""
+        return f"{entry.get('title') or ''} {entry.get('description') or ''}"
+
+    def add(self, link: str, text: str):
+        """Добавляет документ в индекс (или заменяет уже проиндексированный)"""
+        self.remove(link)
+        self._index_document(link, dict(Counter(tokenize(text))))
+
+    def _index_document(self, link: str, terms: Dict[str, int]):
+        self._documents[link] = terms
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[link] = frequency
+        length = sum(terms.values())
+        self._lengths[link] = length
+        self._total_length += length
+
+    def remove(self, link: str):
+        """Удаляет документ из индекса"""
+        terms = self._documents.pop(link, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(link)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[link]
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """Ссылки на вакансии, подходящие под запрос, с оценкой BM25 - от наиболее релевантных"""
+        count = len(self._lengths)
+        if not count:
+            return []
+        average_length = self._total_length / count or 1
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for link, frequency in postings.items():
+                norm = self.K1 * (1 - self.B + self.B * self._lengths[link] / average_length)
+                scores[link] = scores.get(link, 0.0) + idf * frequency * (self.K1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __contains__(self, link: str):
+        return link in self._lengths
+
+    # Методы слушателя IndexedSaver
+
+    def sync(self, entries: Dict[str, Dict]):
+        """
+        Приводит индекс в соответствие с хранилищем: индексирует новые вакансии, переиндексирует
+        измененные (термы документа не совпадают с текстом вакансии), забывает удаленные
+        """
+        for link in [link for link in self._lengths if link not in entries]:
+            self.remove(link)
+        for link, entry in entries.items():
+            terms = dict(Counter(tokenize(self.document_text(entry))))
+            if self._documents.get(link) != terms:
+                self.remove(link)
+                self._index_document(link, terms)
+
+    def on_add(self, entry: Dict):
+        self.add(entry["link"], self.document_text(entry))
+
+    def on_delete(self, entry: Dict):
+        self.remove(entry["link"])
+
+    def on_clear(self):
+        self._documents.clear()
+        self._postings.clear()
+        self._lengths.clear()
+        self._total_length = 0
+
+    def flush(self):
+        """Сохраняет индекс на диск (прямой индекс, обратный восстанавливается при загрузке)"""
+        data = {"documents": self._documents}
+        atomic_write(self.file_path, lambda file: json.dump(data, file, ensure_ascii=False))
+
+    def _load(self):
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for link, terms in data["documents"].items():
+            self._index_document(link, terms)
@@ -0,0 +1,160 @@
+import json
+import os
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from src.atomic import atomic_write
+from src.filters import is_null
+
+HISTOGRAM_STEP = 50_000   # Ширина корзины гистограммы зарплат, руб.
+HISTOGRAM_MAX = 500_000   # Зарплаты от этой суммы попадают в последнюю, открытую корзину
+HISTOGRAM_EDGES = list(range(0, HISTOGRAM_MAX + 1, HISTOGRAM_STEP))  # Нижние границы корзин
+
+
+class _CityStats:
+    """Агрегаты одного города: число вакансий, отсортированные зарплаты и гистограмма"""
+    __slots__ = ("count", "salaries", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.salaries: List[int] = []
+        self.histogram = [0] * len(HISTOGRAM_EDGES)
+
+    def add(self, salary: Optional[int]):
+        self.count += 1
+        if salary is not None:
+            insort(self.salaries, salary)
+            self.histogram[_bucket(salary)] += 1
+
+    def remove(self, salary: Optional[int]):
+        self.count -= 1
+        if salary is not None:
+            del self.salaries[bisect_left(self.salaries, salary)]
+            self.histogram[_bucket(salary)] -= 1
+
+    def summary(self) -> Dict:
+        salaries = self.salaries
+        middle = len(salaries) // 2
+        if not salaries:
+            median = None
+        elif len(salaries) % 2:
+            median = salaries[middle]
+        else:
+            median = (salaries[middle - 1] + salaries[middle]) / 2
+        return {
+            "count": self.count,
+            "with_salary": len(salaries),
+            "min": salaries[0] if salaries else None,
+            "median": median,
+            "max": salaries[-1] if salaries else None,
+            "histogram": self.histogram[:],
+        }
+
+
+def _normalize(city, salary) -> Tuple[str, Optional[int]]:
+    """Город и зарплата в едином виде: пропуски pandas (NaN) - как отсутствующие значения"""
+    return ("" if is_null(city) else city), (None if is_null(salary) else int(salary))
+
+
+def _bucket(salary: int) -> int:
+    """Номер корзины гистограммы для зарплаты"""
+    return min(max(salary, 0) // HISTOGRAM_STEP, len(HISTOGRAM_EDGES) - 1)
+
+
+class SalaryStats:
+    """
+    Материализованная статистика зарплат по городам: число вакансий, минимальная, медианная
+    и максимальная зарплата и гистограмма с шагом HISTOGRAM_STEP. Зарплаты берутся приведенными к рублям
+    (поле salary_rub записи хранилища), поэтому вакансии в разных валютах сопоставимы.
+    Агрегаты обновляются при каждом добавлении и удалении вакансии, поэтому чтение не требует
+    просмотра хранилища. Зарплаты городов хранятся отсортированными: медиана берется по индексу.
+    Подключается к IndexedSaver как слушатель: sync/on_add/on_delete/on_clear/flush.
+    Сохраняется в JSON-файл рядом с данными: вакансии (город и зарплата по ссылке) и готовая сводка.
+    """
+    DATA_DIR = "data"  # Папка для хранения данных
+
+    def __init__(self, filename="stats.json"):
+        # Проверяем существование папки и создаем её, если её нет
+        os.makedirs(SalaryStats.DATA_DIR, exist_ok=True)
+        self.file_path = os.path.join(SalaryStats.DATA_DIR, filename)
+        self._vacancies: Dict[str, Tuple[str, Optional[int]]] = {}  # ссылка -> (город, зарплата в рублях)
+        self._cities: Dict[str, _CityStats] = {}
+        self._total = _CityStats()
+        self._load()
+
+    def add(self, link: str, city: Optional[str], salary: Optional[int]):
+        """Учитывает вакансию (или заменяет уже учтенную с той же ссылкой), salary - в рублях"""
+        self.remove(link)
+        city, salary = _normalize(city, salary)
+        self._vacancies[link] = (city, salary)
+        self._cities.setdefault(city, _CityStats()).add(salary)
+        self._total.add(salary)
+
+    def remove(self, link: str):
+        """Исключает вакансию из статистики"""
+        known = self._vacancies.pop(link, None)
+        if known is None:
+            return
+        city, salary = known
+        city_stats = self._cities[city]
+        city_stats.remove(salary)
+        if not city_stats.count:
+            del self._cities[city]
+        self._total.remove(salary)
+
+    def by_city(self) -> Dict[str, Dict]:
+        """Сводка по каждому городу, города - от большего числа вакансий к меньшему"""
+        ordered = sorted(self._cities.items(), key=lambda item: (-item[1].count, item[0]))
+        return {city: city_stats.summary() for city, city_stats in ordered}
+
+    def overall(self) -> Dict:
+        """Сводка по всем вакансиям"""
+        return self._total.summary()
+
+    def city(self, city: str) -> Optional[Dict]:
+        """Сводка по одному городу (None, если вакансий в нем нет)"""
+        city_stats = self._cities.get(city)
+        return city_stats.summary() if city_stats is not None else None
+
+    def __len__(self):
+        return len(self._vacancies)
+
+    # Методы слушателя IndexedSaver
+
+    def sync(self, entries: Dict[str, Dict]):
+        """Приводит статистику в соответствие с хранилищем: учитывает новые и измененные, забывает удаленные"""
+        for link in [link for link in self._vacancies if link not in entries]:
+            self.remove(link)
+        for link, entry in entries.items():
+            known = _normalize(entry.get("city"), entry.get("salary_rub"))
+            if self._vacancies.get(link) != known:
+                self.add(link, *known)
+
+    def on_add(self, entry: Dict):
+        self.add(entry["link"], entry.get("city"), entry.get("salary_rub"))
+
+    def on_delete(self, entry: Dict):
+        self.remove(entry["link"])
+
+    def on_clear(self):
+        self._vacancies.clear()
+        self._cities.clear()
+        self._total = _CityStats()
+
+    def flush(self):
+        """Сохраняет статистику на диск"""
+        data = {
+            "histogram_edges": HISTOGRAM_EDGES,
+            "overall": self.overall(),
+            "cities": self.by_city(),
+            "vacancies": self._vacancies,
+        }
+        atomic_write(self.file_path, lambda file: json.dump(data, file, ensure_ascii=False))
+
+    def _load(self):
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for link, (city, salary) in data["vacancies"].items():
+            self.add(link, city, salary)
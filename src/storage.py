@@ -1,9 +1,40 @@
 import os
 import json
-import pandas as pd
+import sqlite3
+import time
+import uuid
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from bisect import bisect_left, bisect_right, insort
+from functools import wraps
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+from src import metrics
+from src.atomic import atomic_write
 from src.data_models import Vacancy
+from src.filters import Contains, apply_criteria, is_null, matches
+
+if TYPE_CHECKING:
+    import pandas as pd  # pandas и openpyxl загружаются только хранилищами, которым они нужны
+
+def _measured(operation: str):
+    """
+    Декоратор операций хранилища для метрик: время операции с меткой типа хранилища,
+    для чтения - еще и число прочитанных строк. При выключенных метриках - только проверка флага.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not metrics.ENABLED:
+                return method(self, *args, **kwargs)
+            backend = type(self).__name__
+            with metrics.timed(f"storage_{operation}", backend=backend):
+                result = method(self, *args, **kwargs)
+            if operation == "get":
+                metrics.inc("rows_read", len(result), backend=backend)
+            return result
+        return wrapper
+    return decorator
+
 
 class AbstractDataSaver(ABC):
     """Абстрактный класс для хранения вакансий"""
@@ -11,6 +42,14 @@ class AbstractDataSaver(ABC):
     def add_vacancy(self, vacancy: Vacancy):
         pass
 
+    def add_vacancies(self, vacancies: Iterable[Vacancy]):
+        """
+        Добавляет вакансии пачкой.
+        Реализация по умолчанию добавляет их по одной, хранилища переопределяют ее одной записью.
+        """
+        for vacancy in vacancies:
+            self.add_vacancy(vacancy)
+
     @abstractmethod
     def delete_vacancy(self, vacancy: Vacancy):
         pass
@@ -19,27 +58,94 @@ class AbstractDataSaver(ABC):
     def get_vacancies(self, criteria=None):
         pass
 
+    @abstractmethod
+    def clear(self):
+        """Удаляет все вакансии из хранилища"""
+        pass
+
+    def replace_vacancies(self, vacancies: Iterable[Vacancy]):
+        """
+        Заменяет все содержимое хранилища переданными вакансиями.
+        Реализация по умолчанию очищает хранилище и добавляет вакансии, файловые хранилища и SQLite
+        переопределяют ее одной атомарной записью: сбой посреди замены оставляет прежние вакансии.
+        """
+        self.clear()
+        self.add_vacancies(vacancies)
+
+
+class _LinkDedupe(ABC):
+    """
+    Отбрасывание дублей по ссылке при добавлении для файловых хранилищ.
+    Множество сохраненных ссылок читается из файла один раз (только колонку ссылок) и дальше
+    поддерживается в памяти: добавление его пополняет, удаление сбрасывает, очистка опустошает.
+    Изменения файла в обход экземпляра хранилища не отслеживаются.
+    """
+
+    def _init_dedupe(self, dedupe: bool):
+        """
+        :param dedupe: пропускать вакансии, ссылка на которые уже есть в хранилище
+        """
+        self.dedupe = dedupe
+        self._links: Optional[Set[str]] = None
 
-class JSONSaver(AbstractDataSaver):
+    def _new_only(self, vacancies: Iterable[Vacancy]) -> List[Vacancy]:
+        """Вакансии, которых еще нет в хранилище (и первые вхождения повторов внутри пачки)"""
+        if not self.dedupe:
+            return list(vacancies)
+        if self._links is None:
+            self._links = set(self._load_links())
+        unique = []
+        for vacancy in vacancies:
+            if vacancy.link not in self._links:
+                self._links.add(vacancy.link)
+                unique.append(vacancy)
+        return unique
+
+    def _unique(self, vacancies: Iterable[Vacancy]) -> List[Vacancy]:
+        """Вакансии без повторов ссылок внутри набора (для замены всего содержимого хранилища)"""
+        if not self.dedupe:
+            return list(vacancies)
+        seen: Set[str] = set()
+        unique = []
+        for vacancy in vacancies:
+            if vacancy.link not in seen:
+                seen.add(vacancy.link)
+                unique.append(vacancy)
+        return unique
+
+    @abstractmethod
+    def _load_links(self) -> Iterable[str]:
+        """Ссылки на все вакансии в файле хранилища"""
+        pass
+
+
+class JSONSaver(_LinkDedupe, AbstractDataSaver):
     """Реализует хранение вакансий в JSON-файлах"""
     DATA_DIR = "data"  # Папка для хранения данных
 
-    def __init__(self, filename="vacancies.json"):
+    def __init__(self, filename="vacancies.json", dedupe: bool = True):
         # Проверяем существование папки и создаем её, если её нет
         os.makedirs(JSONSaver.DATA_DIR, exist_ok=True)
         self.file_path = os.path.join(JSONSaver.DATA_DIR, filename)
+        self._init_dedupe(dedupe)
 
     def add_vacancy(self, vacancy: Vacancy):
+        self.add_vacancies([vacancy])
+
+    @_measured("add")
+    def add_vacancies(self, vacancies: Iterable[Vacancy]):
         existing_data = self._load_json()
-        new_entry = {
-            "title": vacancy.title,
-            "city": vacancy.city,
-            "link": vacancy.link,
-            "salary": vacancy.salary,
-            "description": vacancy.description
-        }
-        existing_data.append(new_entry)
+        if self.dedupe and self._links is None:
+            self._links = {entry["link"] for entry in existing_data}
+        new_vacancies = self._new_only(vacancies)
+        if not new_vacancies:
+            return
+        existing_data.extend(vacancy.to_dict() for vacancy in new_vacancies)
         self._save_json(existing_data)
+        metrics.inc("rows_written", len(new_vacancies), backend=type(self).__name__)
+
+    def _load_links(self) -> Iterable[str]:
+        return (entry["link"] for entry in self._load_json())
 
     def _load_json(self) -> List[Dict]:
         try:
@@ -49,9 +155,9 @@ class JSONSaver(AbstractDataSaver):
             return []
 
     def _save_json(self, data: List[Dict]):
-        with open(self.file_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=4)
+        atomic_write(self.file_path, lambda file: json.dump(data, file, ensure_ascii=False, indent=4))
 
+    @_measured("delete")
     def delete_vacancy(self, vacancy: Vacancy):
         data = self._load_json()
         updated_data = [
@@ -59,108 +165,780 @@ class JSONSaver(AbstractDataSaver):
             if entry["title"] != vacancy.title or entry["link"] != vacancy.link
         ]
         self._save_json(updated_data)
+        self._links = None
 
+    @_measured("get")
     def get_vacancies(self, criteria=None) -> List[Dict]:
         data = self._load_json()
         if criteria:
-            result = []
-            for entry in data:
-                matches_criteria = True
-                for key, value in criteria.items():
-                    if isinstance(value, tuple):  # Критерии диапазона (зарплаты)
-                        low, high = value
-                        current_salary = entry.get(key)
-                        if current_salary is None or not (low <= current_salary <= high):
-                            matches_criteria = False
-                            break
-                    elif entry.get(key) != value:
-                        matches_criteria = False
-                        break
-                if matches_criteria:
-                    result.append(entry)
-            return result
+            return [entry for entry in data if matches(entry, criteria)]
         return data
 
+    def clear(self):
+        self._save_json([])
+        self._links = set()
+
+    @_measured("replace")
+    def replace_vacancies(self, vacancies: Iterable[Vacancy]):
+        self._save_json([vacancy.to_dict() for vacancy in self._unique(vacancies)])
+        self._links = None
 
-class CSVSaver(AbstractDataSaver):
+
+class JSONLinesSaver(_LinkDedupe, AbstractDataSaver):
+    """
+    Реализует хранение вакансий в формате JSON Lines (одна вакансия - одна строка).
+    Добавление дописывает строки в конец файла без чтения и перезаписи уже сохраненных вакансий.
+    """
+    DATA_DIR = "data"  # Папка для хранения данных
+
+    def __init__(self, filename="vacancies.jsonl", dedupe: bool = True):
+        # Проверяем существование папки и создаем её, если её нет
+        os.makedirs(JSONLinesSaver.DATA_DIR, exist_ok=True)
+        self.file_path = os.path.join(JSONLinesSaver.DATA_DIR, filename)
+        self._init_dedupe(dedupe)
+
+    def add_vacancy(self, vacancy: Vacancy):
+        self.add_vacancies([vacancy])
+
+    @_measured("add")
+    def add_vacancies(self, vacancies: Iterable[Vacancy]):
+        lines = [json.dumps(vacancy.to_dict(), ensure_ascii=False) + "\n"
+                 for vacancy in self._new_only(vacancies)]
+        if not lines:
+            return
+        if self._has_torn_tail():
+            lines.insert(0, "\n")  # отделяем недописанную после сбоя строку, чтобы не склеить ее с новой
+        with open(self.file_path, 'a', encoding='utf-8') as file:
+            file.writelines(lines)
+        metrics.inc("rows_written", len(lines), backend=type(self).__name__)
+
+    def _has_torn_tail(self) -> bool:
+        try:
+            with open(self.file_path, 'rb') as file:
+                file.seek(0, os.SEEK_END)
+                if file.tell() == 0:
+                    return False
+                file.seek(-1, os.SEEK_END)
+                return file.read(1) != b"\n"
+        except FileNotFoundError:
+            return False
+
+    def _load_jsonl(self) -> List[Dict]:
+        data = []
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        data.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # недописанная строка после сбоя
+        except FileNotFoundError:
+            pass
+        return data
+
+    def _load_links(self) -> Iterable[str]:
+        return (entry["link"] for entry in self._load_jsonl())
+
+    def _save_jsonl(self, data: List[Dict]):
+        atomic_write(self.file_path, lambda file: file.writelines(
+            json.dumps(entry, ensure_ascii=False) + "\n" for entry in data
+        ))
+
+    @_measured("delete")
+    def delete_vacancy(self, vacancy: Vacancy):
+        data = self._load_jsonl()
+        updated_data = [
+            entry for entry in data
+            if entry["title"] != vacancy.title or entry["link"] != vacancy.link
+        ]
+        self._save_jsonl(updated_data)
+        self._links = None
+
+    @_measured("get")
+    def get_vacancies(self, criteria=None) -> List[Dict]:
+        data = self._load_jsonl()
+        if criteria:
+            return [entry for entry in data if matches(entry, criteria)]
+        return data
+
+    def clear(self):
+        self._save_jsonl([])
+        self._links = set()
+
+    @_measured("replace")
+    def replace_vacancies(self, vacancies: Iterable[Vacancy]):
+        self._save_jsonl([vacancy.to_dict() for vacancy in self._unique(vacancies)])
+        self._links = None
+
+
+class _BufferedPandasSaver(_LinkDedupe, AbstractDataSaver):
+    """
+    Общая логика буферизованной записи для хранилищ на pandas.
+    Добавляемые вакансии копятся в памяти и записываются в файл одним блоком, когда в буфере
+    набирается buffer_size строк, когда с момента первой строки в буфере прошло flush_interval секунд
+    (проверяется при добавлении), при выходе из контекста with или при явном вызове flush().
+    Чтение и удаление сначала сбрасывают буфер, поэтому видят все добавленные вакансии.
+    """
+    COLUMNS = ["title", "city", "link", "salary", "description", "salary_from", "currency", "gross", "salary_rub"]
+    TEXT_COLUMNS = ("title", "city", "link", "description")  # Строковые поля вакансии, пустые - как ""
+
+    def __init__(self, buffer_size: int = 0, flush_interval: Optional[float] = None, dedupe: bool = True):
+        """
+        :param buffer_size: сколько вакансий копить перед записью (0 - писать сразу)
+        :param flush_interval: через сколько секунд сбрасывать буфер независимо от его размера
+        :param dedupe: пропускать вакансии, ссылка на которые уже есть в хранилище или в буфере
+        """
+        import pandas  # Импорт здесь, а не в начале модуля: JSON-хранилищам и SQLite pandas не нужен
+
+        self._pd = pandas
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer: List[Dict] = []
+        self._buffer_started: Optional[float] = None
+        self._init_dedupe(dedupe)
+
+    def add_vacancy(self, vacancy: Vacancy):
+        self.add_vacancies([vacancy])
+
+    @_measured("add")
+    def add_vacancies(self, vacancies: Iterable[Vacancy]):
+        new_vacancies = self._new_only(vacancies)
+        if not new_vacancies:
+            return
+        self._buffer.extend(vacancy.to_dict() for vacancy in new_vacancies)
+        if self._buffer_started is None:
+            self._buffer_started = time.monotonic()
+        expired = self.flush_interval is not None and time.monotonic() - self._buffer_started >= self.flush_interval
+        if len(self._buffer) >= self.buffer_size or expired:
+            self.flush()
+
+    def flush(self):
+        """Записывает накопленные вакансии в файл"""
+        if self._buffer:
+            self._write_rows(self._buffer)
+            metrics.inc("rows_written", len(self._buffer), backend=type(self).__name__)
+        self._buffer = []
+        self._buffer_started = None
+
+    def clear(self):
+        self._buffer = []
+        self._buffer_started = None
+        self._clear_file()
+        self._links = set()
+
+    @_measured("replace")
+    def replace_vacancies(self, vacancies: Iterable[Vacancy]):
+        rows = [vacancy.to_dict() for vacancy in self._unique(vacancies)]
+        self._replace_file(self._pd.DataFrame(rows, columns=self.COLUMNS))
+        # Буфер сбрасывается только после записи: при сбое он остается, как и прежнее содержимое файла
+        self._buffer = []
+        self._buffer_started = None
+        self._links = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+    def _with_columns(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        """
+        Приводит прочитанную из файла таблицу к текущему набору колонок. В файлах, записанных до появления
+        вилки и валюты, новые колонки пустые, а зарплата в рублях берется из salary.
+        Пустые строки pandas читает как NaN: в строковых полях они возвращаются к "" (вакансия без города
+        хранится с city == "", и критерий {"city": ""} должен находить ее, как в остальных хранилищах).
+        """
+        if "salary_rub" not in df.columns and "salary" in df.columns:
+            df = df.assign(salary_rub=df["salary"])
+        return df.reindex(columns=self.COLUMNS).fillna({column: "" for column in self.TEXT_COLUMNS})
+
+    def _concat(self, df: "pd.DataFrame", new_rows: "pd.DataFrame") -> "pd.DataFrame":
+        """Склеивает таблицу из файла с новыми строками"""
+        if not len(df):
+            return new_rows
+        # Пустые колонки (например, зарплата без единого значения) не участвуют в выводе типов при concat
+        frames = [frame.dropna(axis=1, how="all") for frame in (df, new_rows)]
+        return self._pd.concat(frames, ignore_index=True).reindex(columns=self.COLUMNS)
+
+    @abstractmethod
+    def _clear_file(self):
+        """Удаляет все вакансии из файла хранилища"""
+        pass
+
+    @abstractmethod
+    def _write_rows(self, rows: List[Dict]):
+        """Дописывает строки в файл хранилища"""
+        pass
+
+    @abstractmethod
+    def _replace_file(self, df: "pd.DataFrame"):
+        """Атомарно заменяет содержимое файла хранилища таблицей df"""
+        pass
+
+
+class CSVSaver(_BufferedPandasSaver):
     """Реализует хранение вакансий в CSV-файлах"""
     DATA_DIR = "data"  # Папка для хранения данных
 
-    def __init__(self, filename="vacancies.csv"):
+    def __init__(self, filename="vacancies.csv", buffer_size: int = 0, flush_interval: Optional[float] = None,
+                 dedupe: bool = True):
+        super().__init__(buffer_size, flush_interval, dedupe)
         # Проверяем существование папки и создаем её, если её нет
         os.makedirs(CSVSaver.DATA_DIR, exist_ok=True)
         self.file_path = os.path.join(CSVSaver.DATA_DIR, filename)
 
-    def add_vacancy(self, vacancy: Vacancy):
-        df = self._load_csv()
-        new_row = pd.DataFrame({
-            "title": [vacancy.title],
-            "city": [vacancy.city],
-            "link": [vacancy.link],
-            "salary": [vacancy.salary],
-            "description": [vacancy.description]
-        })
-        df = pd.concat([df, new_row], ignore_index=True)
-        self._save_csv(df)
+    def _write_rows(self, rows: List[Dict]):
+        df = self._pd.DataFrame(rows, columns=self.COLUMNS)
+        header = self._read_header()
+        if header and header != ",".join(self.COLUMNS):
+            # Файл с прежним набором колонок: дописать строки нельзя, переписываем его с новыми колонками
+            self._save_csv(self._concat(self._load_csv(), df))
+            return
+        # CSV можно дописывать в конец без чтения файла, заголовок пишется только в новый файл
+        df.to_csv(self.file_path, mode='a', header=not header, index=False)
+
+    def _read_header(self) -> str:
+        """Строка заголовка CSV-файла (пустая, если файла нет или он пуст)"""
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                return file.readline().rstrip("\r\n")
+        except FileNotFoundError:
+            return ""
 
-    def _load_csv(self) -> pd.DataFrame:
+    def _load_csv(self) -> "pd.DataFrame":
         try:
-            return pd.read_csv(self.file_path)
+            return self._with_columns(self._pd.read_csv(self.file_path))
         except FileNotFoundError:
-            return pd.DataFrame(columns=["title", "city", "link", "salary", "description"])
+            return self._pd.DataFrame(columns=self.COLUMNS)
+
+    def _load_links(self) -> Iterable[str]:
+        try:
+            return self._pd.read_csv(self.file_path, usecols=["link"])["link"].dropna()
+        except (FileNotFoundError, self._pd.errors.EmptyDataError):
+            return []
+
+    def _save_csv(self, df: "pd.DataFrame"):
+        atomic_write(self.file_path, lambda file: df.to_csv(file, index=False, encoding="utf-8"), binary=True)
 
-    def _save_csv(self, df: pd.DataFrame):
-        df.to_csv(self.file_path, index=False)
+    def _clear_file(self):
+        self._save_csv(self._pd.DataFrame(columns=self.COLUMNS))
 
+    def _replace_file(self, df: "pd.DataFrame"):
+        self._save_csv(df)
+
+    @_measured("delete")
     def delete_vacancy(self, vacancy: Vacancy):
+        self.flush()
         df = self._load_csv()
-        df = df[(df["title"] != vacancy.title) & (df["link"] != vacancy.link)]
+        df = df[~((df["title"] == vacancy.title) & (df["link"] == vacancy.link))]
         self._save_csv(df)
+        self._links = None
 
+    @_measured("get")
     def get_vacancies(self, criteria=None) -> List[Dict]:
-        df = self._load_csv()
-        if criteria:
-            df = df.query(" & ".join([f"`{key}`=='{value}'" for key, value in criteria.items()]))
+        self.flush()
+        df = apply_criteria(self._load_csv(), criteria)
         return df.to_dict(orient="records")
 
 
-class XLSSaver(AbstractDataSaver):
+class XLSSaver(_BufferedPandasSaver):
     """Реализует хранение вакансий в XLSX-файлах"""
     DATA_DIR = "data"  # Папка для хранения данных
 
-    def __init__(self, filename="vacancies.xlsx"):
+    def __init__(self, filename="vacancies.xlsx", buffer_size: int = 0, flush_interval: Optional[float] = None,
+                 dedupe: bool = True):
+        super().__init__(buffer_size, flush_interval, dedupe)
         # Проверяем существование папки и создаем её, если её нет
         os.makedirs(XLSSaver.DATA_DIR, exist_ok=True)
         self.file_path = os.path.join(XLSSaver.DATA_DIR, filename)
 
-    def add_vacancy(self, vacancy: Vacancy):
+    def _write_rows(self, rows: List[Dict]):
+        # XLSX нельзя дописать, поэтому файл перечитывается и перезаписывается один раз на весь буфер
         df = self._load_xlsx()
-        new_row = pd.DataFrame({
-            "title": [vacancy.title],
-            "city": [vacancy.city],
-            "link": [vacancy.link],
-            "salary": [vacancy.salary],
-            "description": [vacancy.description]
-        })
-        df = pd.concat([df, new_row], ignore_index=True)
-        self._save_xlsx(df)
+        self._save_xlsx(self._concat(df, self._pd.DataFrame(rows, columns=self.COLUMNS)))
 
-    def _load_xlsx(self) -> pd.DataFrame:
+    def _load_xlsx(self) -> "pd.DataFrame":
         try:
-            return pd.read_excel(self.file_path)
+            return self._with_columns(self._pd.read_excel(self.file_path))
         except FileNotFoundError:
-            return pd.DataFrame(columns=["title", "city", "link", "salary", "description"])
+            return self._pd.DataFrame(columns=self.COLUMNS)
 
-    def _save_xlsx(self, df: pd.DataFrame):
-        df.to_excel(self.file_path, index=False)
+    def _load_links(self) -> Iterable[str]:
+        try:
+            return self._pd.read_excel(self.file_path, usecols=["link"])["link"].dropna()
+        except FileNotFoundError:
+            return []
+
+    def _save_xlsx(self, df: "pd.DataFrame"):
+        atomic_write(self.file_path, lambda file: df.to_excel(file, index=False), binary=True)
+
+    def _clear_file(self):
+        self._save_xlsx(self._pd.DataFrame(columns=self.COLUMNS))
 
+    def _replace_file(self, df: "pd.DataFrame"):
+        self._save_xlsx(df)
+
+    @_measured("delete")
     def delete_vacancy(self, vacancy: Vacancy):
+        self.flush()
         df = self._load_xlsx()
-        df = df[(df["title"] != vacancy.title) & (df["link"] != vacancy.link)]
+        df = df[~((df["title"] == vacancy.title) & (df["link"] == vacancy.link))]
         self._save_xlsx(df)
+        self._links = None
 
+    @_measured("get")
     def get_vacancies(self, criteria=None) -> List[Dict]:
-        df = self._load_xlsx()
-        if criteria:
-            df = df.query(" & ".join([f"`{key}`=='{value}'" for key, value in criteria.items()]))
+        self.flush()
+        df = apply_criteria(self._load_xlsx(), criteria)
         return df.to_dict(orient="records")
+
+
+class ParquetSaver(_BufferedPandasSaver):
+    """
+    Реализует колоночное хранение вакансий в формате Parquet (нужен пакет pyarrow).
+    Хранилище - папка с файлами-частями: каждая запись буфера добавляет новую часть без перезаписи старых,
+    а когда частей становится больше MAX_PARTS, мелкие части сливаются в одну.
+    Зарплаты хранятся как целые с пропусками, город и валюта - как словарные колонки. Внутри части строки
+    отсортированы по городу и зарплате, поэтому критерии отбора превращаются в фильтры, которые
+    по статистике групп строк пропускают неподходящие куски файла, не читая их.
+    """
+    DATA_DIR = "data"  # Папка для хранения данных
+    ROW_GROUP_SIZE = 10_000  # Строк в одной группе строк Parquet
+    MAX_PARTS = 16  # Сколько частей может накопиться, прежде чем мелкие части сливаются в одну
+
+    def __init__(self, filename="vacancies.parquet", buffer_size: int = 0, flush_interval: Optional[float] = None,
+                 dedupe: bool = True):
+        super().__init__(buffer_size, flush_interval, dedupe)
+        try:
+            import pyarrow as pa
+            import pyarrow.dataset as ds
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("Для ParquetSaver нужен пакет pyarrow: poetry install") from error
+        self._pa, self._ds, self._pq = pa, ds, pq
+        self._schema = pa.schema([
+            ("title", pa.string()),
+            ("city", pa.dictionary(pa.int32(), pa.string())),
+            ("link", pa.string()),
+            ("salary", pa.int64()),
+            ("description", pa.string()),
+            ("salary_from", pa.int64()),
+            ("currency", pa.dictionary(pa.int32(), pa.string())),
+            ("gross", pa.bool_()),
+            ("salary_rub", pa.int64()),
+        ])
+        # Проверяем существование папки и создаем её, если её нет
+        self.dir_path = os.path.join(ParquetSaver.DATA_DIR, filename)
+        os.makedirs(self.dir_path, exist_ok=True)
+
+    def _write_rows(self, rows: List[Dict]):
+        df = self._pd.DataFrame(rows, columns=self.COLUMNS)
+        self._write_part(df, self._part_name())
+        if len(self._parts()) > self.MAX_PARTS:
+            self._compact()
+
+    def _compact(self):
+        """
+        Сливает мелкие части (меньше ROW_GROUP_SIZE строк) в одну. Каждая запись буфера создает свою часть,
+        а по статистике частей из нескольких строк фильтр ничего не отсекает, и открытие набора данных
+        дорожает с числом файлов. Слитая часть получает имя самой старой из мелких, чтобы порядок строк
+        между частями не менялся; остальные мелкие части удаляются после ее записи.
+        """
+        small = [name for name in self._parts()
+                 if self._pq.read_metadata(os.path.join(self.dir_path, name)).num_rows < self.ROW_GROUP_SIZE]
+        if len(small) < 2:
+            return
+        self._write_part(self._load_parquet(names=small), small[0])
+        for name in small[1:]:
+            os.remove(os.path.join(self.dir_path, name))
+
+    @staticmethod
+    def _part_name() -> str:
+        """Имя новой части: части сортируются по времени создания"""
+        return f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+
+    def _write_part(self, df: "pd.DataFrame", name: str):
+        df = df.astype({"salary": "Int64", "salary_from": "Int64", "salary_rub": "Int64", "city": "category",
+                        "currency": "category", "gross": "boolean"})
+        df = df.sort_values(["city", "salary"], na_position="last", ignore_index=True)
+        table = self._pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        # Пишем под скрытым именем (такие файлы не читаются) и переименовываем целиком
+        tmp_path = os.path.join(self.dir_path, f".{name}.tmp")
+        self._pq.write_table(table, tmp_path, row_group_size=self.ROW_GROUP_SIZE)
+        os.replace(tmp_path, os.path.join(self.dir_path, name))
+
+    def _clear_file(self):
+        for name in self._parts():
+            os.remove(os.path.join(self.dir_path, name))
+
+    def _replace_file(self, df: "pd.DataFrame"):
+        # Хранилище переписывается в одну часть: новая часть появляется раньше, чем удаляются старые
+        old_parts = self._parts()
+        self._write_part(df, self._part_name())
+        for name in old_parts:
+            os.remove(os.path.join(self.dir_path, name))
+
+    def _parts(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.dir_path) if name.endswith(".parquet"))
+
+    def _load_parquet(self, expression=None, names: Optional[List[str]] = None) -> "pd.DataFrame":
+        """Читает все части хранилища (или только части names) с фильтром expression"""
+        parts = [os.path.join(self.dir_path, name) for name in (self._parts() if names is None else names)]
+        if not parts:
+            return self._pd.DataFrame(columns=self.COLUMNS)
+        dataset = self._ds.dataset(parts, schema=self._schema, format="parquet")
+        types_mapper = {self._pa.int64(): self._pd.Int64Dtype()}.get
+        return dataset.to_table(filter=expression).to_pandas(types_mapper=types_mapper)
+
+    def _load_links(self) -> Iterable[str]:
+        parts = [os.path.join(self.dir_path, name) for name in self._parts()]
+        if not parts:
+            return []
+        dataset = self._ds.dataset(parts, schema=self._schema, format="parquet")
+        return dataset.to_table(columns=["link"]).column("link").drop_null().to_pylist()
+
+    def _build_filter(self, criteria: Dict):
+        """
+        Переводит критерии отбора в фильтр pyarrow, который применяется при чтении.
+        Возвращает False, если под критерии гарантированно ничего не подходит.
+        Поиск подстроки (Contains) в фильтр не попадает и проверяется после чтения.
+        """
+        field = self._ds.field
+        expression = None
+        for key, value in criteria.items():
+            if key not in self.COLUMNS:
+                # Такого поля у вакансий нет, как и в JSONSaver подходит только отсутствующее значение
+                if is_null(value) or (isinstance(value, (list, set, frozenset)) and any(map(is_null, value))):
+                    continue
+                return False
+            if isinstance(value, tuple):  # Критерии диапазона (зарплаты)
+                low, high = value
+                condition = field(key).is_valid()
+                if low is not None:
+                    condition &= field(key) >= low
+                if high is not None:
+                    condition &= field(key) <= high
+            elif isinstance(value, (list, set, frozenset)):
+                items = [item for item in value if not is_null(item)]
+                # isin с пустым набором pyarrow не строит (тип значений не вывести), поэтому его обходим
+                if items:
+                    condition = field(key).isin(items)
+                    if len(items) != len(value):
+                        condition |= field(key).is_null()
+                elif value:  # В наборе только отсутствующее значение
+                    condition = field(key).is_null()
+                else:  # Пустой набор: не подходит ничего
+                    return False
+            elif isinstance(value, Contains):
+                continue
+            elif value is None:
+                condition = field(key).is_null()
+            else:
+                condition = field(key) == value
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    @_measured("delete")
+    def delete_vacancy(self, vacancy: Vacancy):
+        self.flush()
+        df = self._load_parquet()
+        self._replace_file(df[~((df["title"] == vacancy.title) & (df["link"] == vacancy.link))])
+        self._links = None
+
+    @_measured("get")
+    def get_vacancies(self, criteria=None) -> List[Dict]:
+        self.flush()
+        expression = self._build_filter(criteria or {})
+        if expression is False:
+            return []
+        df = apply_criteria(self._load_parquet(expression), criteria).astype(object)
+        return df.where(df.notna(), None).to_dict(orient="records")
+
+
+class SQLiteSaver(AbstractDataSaver):
+    """
+    Реализует хранение вакансий в базе SQLite.
+    База работает в режиме WAL (читатели не блокируют писателя), ссылка на вакансию уникальна,
+    по городу и зарплате построены индексы, а критерии отбора превращаются в параметризованный SQL.
+    """
+    DATA_DIR = "data"  # Папка для хранения данных
+    COLUMNS = ("title", "city", "link", "salary", "description", "salary_from", "currency", "gross", "salary_rub")
+    # Колонки, добавленные после первой версии схемы: в существующую базу они добавляются при открытии
+    ADDED_COLUMNS = {"salary_from": "INTEGER", "currency": "TEXT", "gross": "INTEGER", "salary_rub": "INTEGER"}
+    # Ссылка уникальна: повторно добавленная вакансия заменяет сохраненную
+    UPSERT = (
+        "INSERT INTO vacancies (title, city, link, salary, description, salary_from, currency, gross, salary_rub) "
+        "VALUES (:title, :city, :link, :salary, :description, :salary_from, :currency, :gross, :salary_rub) "
+        "ON CONFLICT (link) DO UPDATE SET title = excluded.title, city = excluded.city, salary = excluded.salary, "
+        "description = excluded.description, salary_from = excluded.salary_from, currency = excluded.currency, "
+        "gross = excluded.gross, salary_rub = excluded.salary_rub"
+    )
+
+    def __init__(self, filename="vacancies.db"):
+        # Проверяем существование папки и создаем её, если её нет
+        os.makedirs(SQLiteSaver.DATA_DIR, exist_ok=True)
+        self.file_path = os.path.join(SQLiteSaver.DATA_DIR, filename)
+        # Соединение можно передавать между потоками, если обращения к нему сериализованы (см. batch.py)
+        self._conn = sqlite3.connect(self.file_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.create_function("casefold", 1, lambda value: value.casefold() if value is not None else None,
+                                   deterministic=True)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS vacancies (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    city TEXT,
+                    link TEXT NOT NULL UNIQUE,
+                    salary INTEGER,
+                    description TEXT
+                )
+            """)
+            existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(vacancies)")}
+            for column, column_type in self.ADDED_COLUMNS.items():
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE vacancies ADD COLUMN {column} {column_type}")
+            if "salary_rub" not in existing:
+                # Вакансии, сохраненные до появления валюты, считаются зарплатами в рублях
+                self._conn.execute("UPDATE vacancies SET salary_rub = salary")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_vacancies_city ON vacancies (city)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_vacancies_salary ON vacancies (salary)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_vacancies_salary_rub ON vacancies (salary_rub)")
+
+    def add_vacancy(self, vacancy: Vacancy):
+        self.add_vacancies([vacancy])
+
+    @_measured("add")
+    def add_vacancies(self, vacancies: Iterable[Vacancy]):
+        with self._conn:
+            cursor = self._conn.executemany(self.UPSERT, (vacancy.to_dict() for vacancy in vacancies))
+        metrics.inc("rows_written", cursor.rowcount, backend=type(self).__name__)
+
+    @_measured("replace")
+    def replace_vacancies(self, vacancies: Iterable[Vacancy]):
+        # Очистка и вставка - одна транзакция: при сбое откатываются обе
+        with self._conn:
+            self._conn.execute("DELETE FROM vacancies")
+            cursor = self._conn.executemany(self.UPSERT, (vacancy.to_dict() for vacancy in vacancies))
+        metrics.inc("rows_written", cursor.rowcount, backend=type(self).__name__)
+
+    @_measured("delete")
+    def delete_vacancy(self, vacancy: Vacancy):
+        with self._conn:
+            self._conn.execute("DELETE FROM vacancies WHERE link = ? AND title = ?", (vacancy.link, vacancy.title))
+
+    def clear(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM vacancies")
+
+    @_measured("get")
+    def get_vacancies(self, criteria=None) -> List[Dict]:
+        where, params = self._build_where(criteria or {})
+        rows = self._conn.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM vacancies {where} ORDER BY id", params
+        )
+        return [self._row_to_dict(row) for row in rows]
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        entry = dict(row)
+        if entry["gross"] is not None:
+            entry["gross"] = bool(entry["gross"])  # SQLite хранит логические значения как 0 и 1
+        return entry
+
+    def close(self):
+        """Закрывает соединение с базой"""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _build_where(self, criteria: Dict) -> Tuple[str, List]:
+        """Переводит критерии отбора в условие WHERE с параметрами"""
+        clauses: List[str] = []
+        params: List = []
+        for key, value in criteria.items():
+            if key not in self.COLUMNS:
+                # Такого поля у вакансий нет: подходит только отсутствующее значение, как в JSONSaver
+                nullable = is_null(value) or (isinstance(value, (list, set, frozenset)) and any(map(is_null, value)))
+                clauses.append("1" if nullable else "0")
+            elif isinstance(value, tuple):  # Критерии диапазона (зарплаты)
+                low, high = value
+                clauses.append(f"{key} IS NOT NULL")
+                if low is not None:
+                    clauses.append(f"{key} >= ?")
+                    params.append(low)
+                if high is not None:
+                    clauses.append(f"{key} <= ?")
+                    params.append(high)
+            elif isinstance(value, (list, set, frozenset)):
+                items = [item for item in value if not is_null(item)]
+                condition = f"{key} IN ({', '.join('?' * len(items))})"
+                if len(items) != len(value):
+                    condition = f"({condition} OR {key} IS NULL)"
+                clauses.append(condition)
+                params.extend(items)
+            elif isinstance(value, Contains):
+                # Встроенный LOWER в SQLite понимает только латиницу, поэтому регистр сводит Python
+                clauses.append(f"instr(casefold({key}), ?) > 0")
+                params.append(value.needle)
+            elif value is None:
+                clauses.append(f"{key} IS NULL")
+            else:
+                clauses.append(f"{key} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+
+class IndexedSaver(AbstractDataSaver):
+    """
+    Хранит вакансии в памяти и поддерживает вторичные индексы:
+    хэш-индекс по городу, отсортированный индекс по зарплате в рублях (поиск диапазона через bisect)
+    и уникальный индекс по ссылке (удаление и устранение дублей за O(1)).
+    Изменения накапливаются и переносятся в файловое хранилище backend при вызове flush().
+
+    Производные структуры (например, поисковый индекс) подключаются как слушатели - объекты с методами
+    sync(entries) (сверка со всеми вакансиями после загрузки), on_add(entry), on_delete(entry), on_clear()
+    и flush().
+    """
+
+    def __init__(self, backend: Optional[AbstractDataSaver] = None, listeners: Iterable = ()):
+        """
+        :param backend: хранилище, из которого загружаются вакансии и в которое пишет flush()
+        :param listeners: слушатели изменений хранилища
+        """
+        self.backend = backend
+        self.listeners = list(listeners)
+        self._by_link: Dict[str, Dict] = {}
+        self._by_city: Dict[str, Dict[str, Dict]] = {}
+        self._by_salary: List[Tuple[float, str]] = []  # (зарплата в рублях, ссылка), отсортировано
+        self._pending_add: Dict[str, Dict] = {}     # ссылка -> новая запись, которой еще нет в backend
+        self._pending_delete: Dict[str, Dict] = {}  # ссылка -> запись, которую нужно удалить из backend
+        self._pending_clear = False                 # backend нужно очистить перед записью изменений
+        if backend is not None:
+            for entry in backend.get_vacancies():
+                self._insert(self._normalize(entry))
+        for listener in self.listeners:
+            listener.sync(self._by_link)
+
+    def add_vacancy(self, vacancy: Vacancy):
+        self.add_vacancies([vacancy])
+
+    @_measured("add")
+    def add_vacancies(self, vacancies: Iterable[Vacancy]):
+        for vacancy in vacancies:
+            entry = vacancy.to_dict()
+            self._remove(entry["link"])  # ссылка уникальна: новая запись заменяет старую
+            self._insert(entry)
+            self._pending_add[entry["link"]] = entry
+            for listener in self.listeners:
+                listener.on_add(entry)
+
+    @_measured("delete")
+    def delete_vacancy(self, vacancy: Vacancy):
+        entry = self._by_link.get(vacancy.link)
+        if entry is not None and entry["title"] == vacancy.title:
+            self._remove(vacancy.link)
+
+    @_measured("get")
+    def get_vacancies(self, criteria=None) -> List[Dict]:
+        if not criteria:
+            return list(self._by_link.values())
+        return [entry for entry in self._candidates(criteria) if matches(entry, criteria)]
+
+    def clear(self):
+        self._by_link.clear()
+        self._by_city.clear()
+        self._by_salary.clear()
+        self._pending_add.clear()
+        self._pending_delete.clear()
+        self._pending_clear = True
+        for listener in self.listeners:
+            listener.on_clear()
+
+    def flush(self):
+        """Переносит накопленные изменения в backend и сохраняет состояние слушателей"""
+        for listener in self.listeners:
+            listener.flush()
+        if self.backend is None:
+            return
+        if self._pending_clear:
+            # После очистки backend переписывается целиком одной атомарной заменой, а не очисткой и вставкой
+            self.backend.replace_vacancies(Vacancy.from_dict(entry) for entry in self._by_link.values())
+            self._pending_clear = False
+        else:
+            for entry in self._pending_delete.values():
+                self.backend.delete_vacancy(Vacancy.from_dict(entry))
+            if self._pending_add:
+                self.backend.add_vacancies(Vacancy.from_dict(entry) for entry in self._pending_add.values())
+        self._pending_delete.clear()
+        self._pending_add.clear()
+
+    def __len__(self):
+        return len(self._by_link)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+    def _candidates(self, criteria: Dict) -> Iterable[Dict]:
+        """Выбирает по индексу наименьший известный набор записей-кандидатов"""
+        link = criteria.get("link")
+        if isinstance(link, (list, set, frozenset)):
+            return [self._by_link[item] for item in dict.fromkeys(link) if item in self._by_link]
+        if isinstance(link, str):
+            entry = self._by_link.get(link)
+            return [entry] if entry is not None else []
+        city = criteria.get("city")
+        if isinstance(city, str):
+            return self._by_city.get(city, {}).values()
+        salary = criteria.get("salary_rub")
+        if isinstance(salary, tuple):
+            low, high = salary
+            start = bisect_left(self._by_salary, low, key=itemgetter(0)) if low is not None else 0
+            end = bisect_right(self._by_salary, high, key=itemgetter(0)) if high is not None else None
+            return [self._by_link[link] for _, link in self._by_salary[start:end]]
+        return self._by_link.values()
+
+    @staticmethod
+    def _normalize(entry: Dict) -> Dict:
+        """
+        Приводит запись из backend к общему виду: пропуски pandas (NaN) - None, у записей,
+        сохраненных до появления вилки и валюты, - недостающие поля
+        """
+        return Vacancy.from_dict(entry).to_dict()
+
+    def _insert(self, entry: Dict):
+        link = entry["link"]
+        if link in self._by_link:
+            self._remove(link, track=False)  # дубль ссылки при загрузке: остается последняя запись
+        self._by_link[link] = entry
+        self._by_city.setdefault(entry["city"], {})[link] = entry
+        if entry["salary_rub"] is not None:
+            insort(self._by_salary, (entry["salary_rub"], link))
+
+    def _remove(self, link: str, track: bool = True):
+        entry = self._by_link.pop(link, None)
+        if entry is None:
+            return
+        city_index = self._by_city[entry["city"]]
+        del city_index[link]
+        if not city_index:
+            del self._by_city[entry["city"]]
+        if entry["salary_rub"] is not None:
+            position = bisect_left(self._by_salary, (entry["salary_rub"], link))
+            del self._by_salary[position]
+        if not track:
+            return
+        if self._pending_add.pop(link, None) is None:
+            self._pending_delete.setdefault(link, entry)
+        for listener in self.listeners:
+            listener.on_delete(entry)
@@ -0,0 +1,167 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from src.api import HeadHunterAPI
+from src.atomic import atomic_write
+from src.data_models import Vacancy
+from src.pipeline import fetch_batches
+from src.storage import AbstractDataSaver
+
+PUBLISHED_FORMAT = "%Y-%m-%dT%H:%M:%S%z"  # Формат published_at и date_from в API hh.ru
+
+
+def _parse_published(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, PUBLISHED_FORMAT) if value else None
+    except ValueError:
+        return None
+
+
+class IncrementalSync:
+    """
+    Инкрементальная синхронизация хранилища с выдачей hh.ru.
+    Для каждого запроса запоминается отметка - дата публикации самой свежей полученной вакансии.
+    Следующий запуск запрашивает только вакансии, опубликованные с этой даты (параметр date_from),
+    при обрезке выдачи hh.ru (MAX_RESULTS вакансий на запрос) дозапрашивает более старые окнами по date_to,
+    обновляет уже сохраненные по ссылке и удаляет устаревшие (старше max_age_days или помеченные архивными).
+    Состояние хранится в JSON-файле рядом с данными.
+    """
+    DATA_DIR = "data"  # Папка для хранения данных
+
+    def __init__(self, api: HeadHunterAPI, saver: AbstractDataSaver, filename="sync_state.json",
+                 max_age_days: int = 30, batch_size: int = 100):
+        """
+        :param api: клиент API
+        :param saver: хранилище вакансий
+        :param filename: файл состояния внутри DATA_DIR
+        :param max_age_days: вакансии, опубликованные раньше, удаляются из хранилища (на hh.ru они уже закрыты)
+        :param batch_size: размер пачки, которой вакансии пишутся в хранилище
+        """
+        os.makedirs(IncrementalSync.DATA_DIR, exist_ok=True)
+        self.file_path = os.path.join(IncrementalSync.DATA_DIR, filename)
+        self.api = api
+        self.saver = saver
+        self.max_age_days = max_age_days
+        self.batch_size = batch_size
+        self._state = self._load()
+
+    @staticmethod
+    def make_key(query: str, **params) -> str:
+        """Ключ состояния запроса: текст поиска и дополнительные параметры в едином виде"""
+        normalized = sorted((str(key), str(value)) for key, value in params.items())
+        return json.dumps([" ".join(query.split()).lower(), normalized], ensure_ascii=False)
+
+    def high_water_mark(self, query: str, **params) -> Optional[str]:
+        """Дата публикации самой свежей вакансии, полученной по запросу"""
+        return self._state.get(self.make_key(query, **params), {}).get("high_water")
+
+    def run(self, query: str, **params) -> Dict[str, int]:
+        """
+        Синхронизирует хранилище с выдачей по запросу.
+        :param query: строка поиска (например, профессия)
+        :param params: дополнительные параметры запроса к API (area и т.п.)
+        :return: счетчики fetched, added, updated, unchanged, expired, skipped
+        """
+        stats = dict.fromkeys(("fetched", "added", "updated", "unchanged", "expired", "skipped"), 0)
+        key = self.make_key(query, **params)
+        state = self._state.setdefault(key, {"high_water": None, "vacancies": {}})
+        known: Dict[str, Dict] = state["vacancies"]  # ссылка -> {"title", "published_at"}
+        high_water = state["high_water"]
+
+        request_params = dict(params, order_by="publication_time")
+        if high_water:
+            request_params["date_from"] = high_water
+
+        newest = _parse_published(high_water)
+        # hh.ru отдает по запросу не больше MAX_RESULTS вакансий, а выдача идет от новых к старым. Если новых
+        # вакансий больше, обрезанными оказываются самые старые из них: тогда выдача запрашивается повторно
+        # окнами date_from..date_to, где верхняя граница - самая старая вакансия, полученная в прошлом окне
+        window_end: Optional[str] = None
+        while True:
+            window_params = dict(request_params, date_to=window_end) if window_end else request_params
+            received = 0
+            oldest, oldest_at = None, None
+            for items in fetch_batches(self.api, query, self.batch_size, **window_params):
+                to_write: List[Vacancy] = []
+                for item in items:
+                    stats["fetched"] += 1
+                    received += 1
+                    published_at = item.get("published_at")
+                    published = _parse_published(published_at)
+                    if published is not None and (oldest is None or published < oldest):
+                        oldest, oldest_at = published, published_at
+                    try:
+                        vacancy = Vacancy.from_api_item(item)
+                    except Exception:
+                        vacancy = None
+                    if vacancy is None:
+                        stats["skipped"] += 1
+                        continue
+
+                    if published is not None and (newest is None or published > newest):
+                        newest, high_water = published, published_at
+
+                    old = known.get(vacancy.link)
+                    if item.get("archived"):
+                        if old is not None:
+                            self._delete(known, vacancy.link)
+                            stats["expired"] += 1
+                        continue
+                    if old is not None and old["title"] == vacancy.title and old["published_at"] == published_at:
+                        stats["unchanged"] += 1
+                        continue
+                    if old is not None:
+                        # Удаляем прежнюю версию, чтобы хранилища без уникальной ссылки не получили дубль
+                        self.saver.delete_vacancy(Vacancy(old["title"], "", vacancy.link, None, ""))
+                        stats["updated"] += 1
+                    else:
+                        stats["added"] += 1
+                    known[vacancy.link] = {"title": vacancy.title, "published_at": published_at}
+                    to_write.append(vacancy)
+                if to_write:
+                    self.saver.add_vacancies(to_write)
+            # Окно не обрезано, или сдвинуть его некуда (больше MAX_RESULTS вакансий с одной датой публикации)
+            if received < self.api.MAX_RESULTS or oldest_at is None or oldest == _parse_published(window_end):
+                break
+            window_end = oldest_at
+
+        stats["expired"] += self._expire(known)
+        state["high_water"] = high_water
+        # Отметка сохраняется только после записи вакансий на диск: хранилища с буфером (IndexedSaver,
+        # CSVSaver...) иначе при сбое потеряли бы вакансии, которые следующий запуск уже не запросит
+        if hasattr(self.saver, "flush"):
+            self.saver.flush()
+        self._save()
+        return stats
+
+    def reset(self, query: Optional[str] = None, **params):
+        """Забывает состояние одного запроса (или всех), следующий запуск выгрузит выдачу целиком"""
+        if query is None:
+            self._state.clear()
+        else:
+            self._state.pop(self.make_key(query, **params), None)
+        self._save()
+
+    def _expire(self, known: Dict[str, Dict]) -> int:
+        """Удаляет из хранилища вакансии, опубликованные раньше max_age_days дней назад"""
+        border = datetime.now(timezone.utc) - timedelta(days=self.max_age_days)
+        expired = [link for link, info in known.items()
+                   if (published := _parse_published(info["published_at"])) is not None and published < border]
+        for link in expired:
+            self._delete(known, link)
+        return len(expired)
+
+    def _delete(self, known: Dict[str, Dict], link: str):
+        info = known.pop(link)
+        self.saver.delete_vacancy(Vacancy(info["title"], "", link, None, ""))
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        atomic_write(self.file_path, lambda file: json.dump(self._state, file, ensure_ascii=False))
@@ -1,13 +1,16 @@
 import sys
 sys.path.insert(0, '../src')
+import threading
+import time
 import unittest
+from unittest.mock import patch
 import requests
-from src.api import HeadHunterAPI
+from src.api import HeadHunterAPI, RateLimiter
 from requests_mock import mock
 
 class TestHeadHunterAPI(unittest.TestCase):
     def setUp(self):
-        self.api = HeadHunterAPI()
+        self.api = HeadHunterAPI(backoff_factor=0)
 
     def test_get_vacancies_success(self):
         """Тест успешного получения вакансий"""
@@ -26,3 +29,144 @@ class TestHeadHunterAPI(unittest.TestCase):
             m.get("https://api.hh.ru/vacancies", status_code=500)
             with self.assertRaises(requests.exceptions.HTTPError):
                 self.api.get_vacancies("Python")
+
+
+class TestHeadHunterAPIPagination(unittest.TestCase):
+    def setUp(self):
+        self.api = HeadHunterAPI(max_workers=3, backoff_factor=0, rate_limiter=RateLimiter(1000))
+
+    @staticmethod
+    def _pages_callback(total, per_page):
+        """Имитирует постраничную выдачу /vacancies на total вакансий"""
+        def callback(request, context):
+            page = int(request.qs['page'][0])
+            start = page * per_page
+            items = [{'name': f'Vacancy {i}', 'url': f'https://example.com/{i}'}
+                     for i in range(start, min(start + per_page, total))]
+            return {'items': items, 'found': total, 'pages': -(-total // per_page),
+                    'page': page, 'per_page': per_page}
+        return callback
+
+    def test_get_all_vacancies_walks_every_page(self):
+        """Массовая выгрузка обходит все страницы выдачи"""
+        with mock() as m:
+            m.get("https://api.hh.ru/vacancies", json=self._pages_callback(250, 100))
+            result = self.api.get_all_vacancies("Python", per_page=100)
+            self.assertEqual(m.call_count, 3)
+        self.assertEqual(len(result), 250)
+        self.assertEqual({v['url'] for v in result}, {f'https://example.com/{i}' for i in range(250)})
+
+    def test_iter_vacancies_respects_depth_limit(self):
+        """hh.ru отдает не больше 2000 вакансий, лишние страницы не запрашиваются"""
+        with mock() as m:
+            m.get("https://api.hh.ru/vacancies", json=self._pages_callback(5000, 100))
+            result = list(self.api.iter_vacancies("Python"))
+            self.assertEqual(m.call_count, 20)
+        self.assertEqual(len(result), 2000)
+
+    def test_iter_vacancies_single_page(self):
+        """Если страница одна, дополнительных запросов нет"""
+        with mock() as m:
+            m.get("https://api.hh.ru/vacancies", json={'items': [{'name': 'Dev', 'url': 'u'}]})
+            result = list(self.api.iter_vacancies("Python"))
+            self.assertEqual(m.call_count, 1)
+        self.assertEqual(len(result), 1)
+
+    def test_iter_vacancies_failure(self):
+        """Ошибка на любой странице пробрасывается наружу"""
+        with mock() as m:
+            m.get("https://api.hh.ru/vacancies", [
+                {'json': {'items': [], 'found': 300, 'pages': 3}},
+                {'status_code': 500},
+            ])
+            with self.assertRaises(requests.exceptions.HTTPError):
+                list(self.api.iter_vacancies("Python"))
+
+    def test_invalid_max_workers(self):
+        """Число потоков должно быть положительным"""
+        with self.assertRaises(ValueError):
+            HeadHunterAPI(max_workers=0)
+        with self.assertRaises(ValueError):
+            HeadHunterAPI(pool_size=0)
+
+    def test_pool_size(self):
+        """Пул соединений по умолчанию рассчитан на max_workers потоков, но его размер можно задать"""
+        with HeadHunterAPI(max_workers=3) as api:
+            self.assertEqual(api.session.get_adapter(HeadHunterAPI.BASE_URL)._pool_maxsize, 3)
+        with HeadHunterAPI(max_workers=3, pool_size=12) as api:
+            self.assertEqual(api.session.get_adapter(HeadHunterAPI.BASE_URL)._pool_maxsize, 12)
+
+
+class TestHeadHunterAPIRetries(unittest.TestCase):
+    def setUp(self):
+        self.api = HeadHunterAPI(max_retries=2, backoff_factor=0.5, rate_limiter=RateLimiter(1000))
+        sleep_patcher = patch('src.api.time.sleep')
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+        self.addCleanup(self.api.close)
+
+    def test_retry_after_header_is_honoured(self):
+        """При 429 пауза берется из заголовка Retry-After"""
+        with mock() as m:
+            m.get("https://api.hh.ru/vacancies", [
+                {'status_code': 429, 'headers': {'Retry-After': '7'}},
+                {'json': {'items': [{'name': 'Dev', 'url': 'u'}]}},
+            ])
+            result = self.api.get_vacancies("Python")
+            self.assertEqual(m.call_count, 2)
+        self.assertEqual(len(result), 1)
+        self.sleep.assert_called_once_with(7.0)
+
+    def test_exponential_backoff_on_server_errors(self):
+        """При 5xx паузы растут экспоненциально, после исчерпания повторов - HTTPError"""
+        with mock() as m:
+            m.get("https://api.hh.ru/vacancies", status_code=503)
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.api.get_vacancies("Python")
+            self.assertEqual(m.call_count, 3)
+        self.assertEqual([c.args[0] for c in self.sleep.call_args_list], [0.5, 1.0])
+
+    def test_retry_on_connection_error(self):
+        """Сетевые ошибки тоже повторяются"""
+        with mock() as m:
+            m.get("https://api.hh.ru/vacancies", [
+                {'exc': requests.exceptions.ConnectTimeout},
+                {'json': {'items': []}},
+            ])
+            self.assertEqual(self.api.get_vacancies("Python"), [])
+            self.assertEqual(m.call_count, 2)
+
+    def test_client_errors_are_not_retried(self):
+        """4xx (кроме 429) не повторяются"""
+        with mock() as m:
+            m.get("https://api.hh.ru/vacancies", status_code=404)
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.api.get_vacancies("Python")
+            self.assertEqual(m.call_count, 1)
+
+    def test_timeout_is_passed(self):
+        """Таймаут передается в каждый запрос"""
+        api = HeadHunterAPI(timeout=3, rate_limiter=RateLimiter(1000))
+        with mock() as m:
+            m.get("https://api.hh.ru/vacancies", json={'items': []})
+            api.get_vacancies("Python")
+            self.assertEqual(m.last_request.timeout, 3)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_rate_is_limited_across_threads(self):
+        """Токены общие для всех потоков"""
+        limiter = RateLimiter(rate=50, capacity=1)
+        start = time.monotonic()
+        threads = [threading.Thread(target=lambda: [limiter.acquire() for _ in range(3)]) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 6 запросов при 50 в секунду и ведре на 1 токен - не меньше 5 интервалов по 20 мс
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_invalid_rate(self):
+        """Частота должна быть положительной"""
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
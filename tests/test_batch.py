@@ -0,0 +1,85 @@
+import sys
+sys.path.insert(0, '../src')
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from requests_mock import mock
+from src.api import HeadHunterAPI, RateLimiter
+from src.batch import PAGE_WORKERS, BatchHarvester, main, read_queries
+from src.storage import JSONLinesSaver, SQLiteSaver
+
+URL = "https://api.hh.ru/vacancies"
+
+
+def make_item(i):
+    return {'name': f'Vacancy {i}', 'url': f'https://example.com/{i}', 'salary': {'to': 1000 * (i + 1)},
+            'snippet': {'requirement': 'Python'}, 'area': {'name': 'Москва'}}
+
+
+def search_callback(request, context):
+    """Выдача зависит от запроса: у python и java 50 общих вакансий, go всегда падает"""
+    text = request.qs['text'][0]
+    if text == 'go':
+        context.status_code = 500
+        return {}
+    start = 0 if text == 'python' else 100
+    items = [make_item(i) for i in range(start, start + 150)]
+    if text == 'python':
+        items[0] = {'name': 'Без ссылки'}
+    page, per_page = int(request.qs['page'][0]), int(request.qs['per_page'][0])
+    return {'items': items[page * per_page:(page + 1) * per_page], 'found': len(items),
+            'pages': -(-len(items) // per_page)}
+
+
+class TestBatchHarvester(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.api = HeadHunterAPI(max_workers=2, max_retries=0, backoff_factor=0, rate_limiter=RateLimiter(1000))
+        self.addCleanup(self.api.close)
+
+    def test_read_queries(self):
+        """Строки файла разбираются на профессию и регион, комментарии и пустые строки пропускаются"""
+        path = os.path.join(self.tmp_dir.name, "queries.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("# профессии\nPython;1\n\n Java \nGo ; 2\n")
+        self.assertEqual(read_queries(path), [("Python", "1"), ("Java", None), ("Go", "2")])
+
+    def test_queries_are_written_deduplicated(self):
+        """Вакансии всех запросов попадают в общее хранилище без дублей, ошибка запроса попадает в сводку"""
+        saver = JSONLinesSaver(os.path.join(self.tmp_dir.name, "vacancies.jsonl"))
+        harvester = BatchHarvester(self.api, saver, workers=3, processes=2, batch_size=40)
+        with mock() as m, patch("builtins.print"):
+            m.get(URL, json=search_callback)
+            summary = harvester.run([("python", None), ("java", "1"), ("go", None)])
+        self.assertEqual(summary["totals"], {"fetched": 300, "skipped": 1, "duplicates": 50, "written": 249,
+                                             "failed": 1})
+        results = {result["query"]: result for result in summary["queries"]}
+        self.assertIn("500", results["go"]["error"])
+        links = [entry["link"] for entry in saver.get_vacancies()]
+        self.assertEqual(len(links), 249)
+        self.assertEqual(len(set(links)), 249)
+        requested_areas = {request.qs.get('area', [None])[0] for request in m.request_history
+                           if request.qs['text'][0] == 'java'}
+        self.assertEqual(requested_areas, {'1'})
+
+    def test_main_writes_summary(self):
+        """CLI выгружает запросы в выбранное хранилище и записывает сводку в JSON"""
+        queries = os.path.join(self.tmp_dir.name, "queries.txt")
+        with open(queries, "w", encoding="utf-8") as file:
+            file.write("python\njava\n")
+        database = os.path.join(self.tmp_dir.name, "vacancies.db")
+        summary_path = os.path.join(self.tmp_dir.name, "summary.json")
+        with mock() as m, patch("builtins.print"), patch("src.batch.HeadHunterAPI", wraps=HeadHunterAPI) as api:
+            m.get(URL, json=search_callback)
+            main([queries, "--saver", "sqlite", "--output", database, "--processes", "0", "--workers", "3",
+                  "--summary", summary_path])
+        self.assertEqual(api.call_args.kwargs["pool_size"], 3 * PAGE_WORKERS)  # по пулу страниц на поток
+        with open(summary_path, encoding="utf-8") as file:
+            summary = json.load(file)
+        self.assertEqual(summary["saver"], "sqlite")
+        self.assertEqual(summary["totals"]["written"], 249)
+        with SQLiteSaver(database) as saver:
+            self.assertEqual(len(saver.get_vacancies()), 249)
@@ -0,0 +1,93 @@
+import sys
+sys.path.insert(0, '../src')
+import os
+import tempfile
+import time
+import unittest
+import requests
+from requests_mock import mock
+from src.api import HeadHunterAPI, RateLimiter
+from src.cache import CacheMissError, ResponseCache
+
+URL = "https://api.hh.ru/vacancies"
+PAGE = {'items': [{'name': 'Python Developer', 'url': 'https://example.com/pd'}]}
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def make_cache(self, **kwargs):
+        return ResponseCache(dirname=self.tmp_dir.name, **kwargs)
+
+    def make_api(self, cache):
+        return HeadHunterAPI(max_retries=0, rate_limiter=RateLimiter(1000), cache=cache)
+
+    def test_key_is_normalised(self):
+        """Порядок, регистр и лишние пробелы в параметрах не влияют на ключ"""
+        self.assertEqual(ResponseCache.make_key(URL, {"text": " Python  Developer", "page": 0}),
+                         ResponseCache.make_key(URL, {"page": "0", "text": "python developer"}))
+        self.assertNotEqual(ResponseCache.make_key(URL, {"text": "python", "page": 0}),
+                            ResponseCache.make_key(URL, {"text": "python", "page": 1}))
+
+    def test_repeat_query_is_served_from_disk(self):
+        """Повторный запрос не уходит в сеть, в том числе из нового процесса"""
+        with mock() as m:
+            m.get(URL, json=PAGE)
+            self.assertEqual(self.make_api(self.make_cache()).get_vacancies("Python"), PAGE['items'])
+            cache = self.make_cache()
+            self.assertEqual(self.make_api(cache).get_vacancies("python"), PAGE['items'])
+            self.assertEqual(m.call_count, 1)
+        self.assertEqual(cache.stats["hits"], 1)
+
+    def test_stale_entry_is_revalidated(self):
+        """Устаревшая запись перепроверяется по ETag, ответ 304 продлевает ее"""
+        cache = self.make_cache(ttl=0)
+        api = self.make_api(cache)
+        with mock() as m:
+            m.get(URL, [{'json': PAGE, 'headers': {'ETag': '"v1"'}}, {'status_code': 304}])
+            api.get_vacancies("Python")
+            self.assertEqual(api.get_vacancies("Python"), PAGE['items'])
+            self.assertEqual(m.last_request.headers['If-None-Match'], '"v1"')
+        self.assertEqual(cache.stats["misses"], 1)
+        self.assertEqual(cache.stats["revalidations"], 1)
+
+    def test_stale_entry_served_when_network_fails(self):
+        """Если сеть недоступна, отдается устаревший ответ"""
+        cache = self.make_cache(ttl=0)
+        api = self.make_api(cache)
+        with mock() as m:
+            m.get(URL, [{'json': PAGE}, {'exc': requests.exceptions.ConnectionError}])
+            api.get_vacancies("Python")
+            self.assertEqual(api.get_vacancies("Python"), PAGE['items'])
+        self.assertEqual(cache.stats["stale_hits"], 1)
+
+    def test_offline_mode(self):
+        """В офлайн-режиме сеть не используется, а промах приводит к CacheMissError"""
+        with mock() as m:
+            m.get(URL, json=PAGE)
+            self.make_api(self.make_cache()).get_vacancies("Python")
+            offline_api = self.make_api(self.make_cache(ttl=0, offline=True))
+            self.assertEqual(offline_api.get_vacancies("Python"), PAGE['items'])
+            with self.assertRaises(CacheMissError):
+                offline_api.get_vacancies("Java")
+            self.assertEqual(m.call_count, 1)
+
+    def test_lru_eviction(self):
+        """При превышении размера вытесняется давно не использованная запись"""
+        cache = self.make_cache(max_entries=2)
+        cache.put("a", [1])
+        time.sleep(0.01)
+        cache.put("b", [2])
+        cache.get("a")
+        cache.put("c", [3])
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats["evictions"], 1)
+        self.assertEqual(len(os.listdir(self.tmp_dir.name)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import sys
 sys.path.insert(0, '../src')
+import pickle
 import unittest
-from src.data_models import Vacancy
+from unittest.mock import patch
+from src.data_models import CURRENCY_RATES, Vacancy, VacancyBatch
 
 class TestVacancy(unittest.TestCase):
     def setUp(self):
@@ -30,3 +32,105 @@ class TestVacancy(unittest.TestCase):
         self.assertIsInstance(vacancies[0], Vacancy)
         self.assertEqual(vacancies[0].title, "Python Developer")
         self.assertEqual(vacancies[0].city, "Москва")  # Проверяем наличие города
+
+
+class TestVacancyBatch(unittest.TestCase):
+    def setUp(self):
+        self.raw_data = [
+            {"name": "Python Developer", "url": "https://example.com/pd", "salary": {"to": 80000}, "snippet": {"requirement": "Опыт от 3 лет"}, "area": {"name": "Москва"}},
+            {"name": "Incomplete Entry", "url": "https://example.com/incomplete"},
+            {"name": "Intern", "url": "https://example.com/intern", "salary": None, "snippet": {"requirement": None}},
+            {"name": "Broken", "url": "https://example.com/broken", "salary": {"to": -5}, "snippet": {}},
+        ]
+
+    def test_vacancy_has_no_dict(self):
+        """Экземпляры Vacancy не хранят __dict__"""
+        self.assertFalse(hasattr(Vacancy("Dev", "Москва", "link", None, ""), "__dict__"))
+
+    def test_cast_collects_errors(self):
+        """Причины пропуска записей собираются в список, а не печатаются"""
+        errors = []
+        with patch("builtins.print") as mocked_print:
+            vacancies = Vacancy.cast_to_object_list(self.raw_data, errors)
+        mocked_print.assert_not_called()
+        self.assertEqual([v.title for v in vacancies], ["Python Developer", "Intern"])
+        self.assertEqual(vacancies[1].description, "")
+        self.assertEqual([index for index, _ in errors], [1, 3])
+
+    def test_batch_matches_object_list(self):
+        """Колоночный набор содержит те же вакансии, что и cast_to_object_list"""
+        batch = VacancyBatch.from_api_items(self.raw_data)
+        self.assertEqual(list(batch), Vacancy.cast_to_object_list(self.raw_data))
+        self.assertEqual(len(batch), 2)
+        self.assertIsNone(batch.salary(1))
+        self.assertEqual(batch[0].salary, 80000)
+        self.assertEqual([index for index, _ in batch.errors], [1, 3])
+
+    def test_batch_append(self):
+        """Вакансию можно дописать в набор"""
+        batch = VacancyBatch()
+        vacancy = Vacancy("Dev", "Москва", "link", 1000, "")
+        batch.append(vacancy)
+        self.assertEqual(batch[0], vacancy)
+
+
+class TestSalaryModel(unittest.TestCase):
+    def setUp(self):
+        self.raw_data = [
+            {"name": "Rubles", "url": "https://example.com/rub", "salary": {"from": 100000, "to": 150000, "currency": "RUR", "gross": True}, "snippet": {}},
+            {"name": "Dollars", "url": "https://example.com/usd", "salary": {"from": 2000, "to": None, "currency": "USD", "gross": False}, "snippet": {}},
+            {"name": "No salary", "url": "https://example.com/none", "salary": None, "snippet": {}},
+            {"name": "Euros", "url": "https://example.com/eur", "salary": {"from": None, "to": 1000, "currency": "EUR"}, "snippet": {}},
+        ]
+
+    def test_full_salary_is_parsed(self):
+        """Сохраняются обе границы вилки, валюта и признак gross"""
+        rub, usd, none, eur = Vacancy.cast_to_object_list(self.raw_data)
+        self.assertEqual((rub.salary_from, rub.salary, rub.currency, rub.gross), (100000, 150000, "RUR", True))
+        self.assertEqual((usd.salary_from, usd.salary, usd.currency), (2000, None, "USD"))
+        self.assertIsNone(none.salary_rub)
+        self.assertEqual(eur.salary_rub, 1000 * CURRENCY_RATES["EUR"])
+
+    def test_sort_key_orders_across_currencies(self):
+        """Сортировка учитывает валюту, вакансии без зарплаты оказываются в конце"""
+        vacancies = Vacancy.cast_to_object_list(self.raw_data)
+        self.assertEqual([v.title for v in sorted(vacancies, reverse=True)], ["Dollars", "Rubles", "Euros", "No salary"])
+        none = vacancies[2]
+        self.assertTrue(none < vacancies[0])
+        self.assertFalse(none > vacancies[0])
+
+    def test_sort_key_is_stored_and_recomputed(self):
+        """Ключ сортировки хранится в вакансии и пересчитывается при изменении зарплаты или валюты"""
+        vacancy = Vacancy("Developer", "Москва", "https://example.com/dev", 1000, "")
+        self.assertEqual(vacancy.sort_key, 1000)
+        vacancy.currency = "USD"
+        self.assertEqual(vacancy.sort_key, 1000 * CURRENCY_RATES["USD"])
+        vacancy.salary = None
+        self.assertEqual(vacancy.sort_key, float("-inf"))
+        vacancy.salary_from = 500
+        self.assertEqual(vacancy.salary_rub, 500 * CURRENCY_RATES["USD"])
+        restored = pickle.loads(pickle.dumps(vacancy))
+        self.assertEqual((restored, restored.sort_key), (vacancy, vacancy.sort_key))
+
+    def test_top_by_salary(self):
+        """Топ по зарплате совпадает для списка объектов и колоночного набора"""
+        vacancies = Vacancy.cast_to_object_list(self.raw_data)
+        top = Vacancy.top_by_salary(vacancies, 2)
+        self.assertEqual([v.title for v in top], ["Dollars", "Rubles"])
+        self.assertEqual(VacancyBatch.from_api_items(self.raw_data).top_by_salary(2), top)
+
+    def test_dict_round_trip(self):
+        """Запись хранилища восстанавливается в ту же вакансию, пропуски pandas (NaN) - в None или """""
+        rub, usd, none, eur = Vacancy.cast_to_object_list(self.raw_data)
+        for vacancy in (rub, usd, none, eur):
+            self.assertEqual(Vacancy.from_dict(vacancy.to_dict()), vacancy)
+        self.assertEqual(usd.to_dict()["salary_rub"], 2000 * CURRENCY_RATES["USD"])
+        self.assertIsNone(none.currency)
+        legacy = {"title": "Dev", "city": float("nan"), "link": "link", "salary": float("nan"),
+                  "description": float("nan")}
+        self.assertEqual(Vacancy.from_dict(legacy), Vacancy("Dev", "", "link", None, ""))
+
+    def test_unknown_currency_sorts_last(self):
+        """Зарплата в валюте, которой нет в таблице курсов, не участвует в сравнении"""
+        vacancy = Vacancy("Dev", "", "link", 100, "", currency="XXX")
+        self.assertIsNone(vacancy.salary_rub)
@@ -0,0 +1,87 @@
+import sys
+sys.path.insert(0, '../src')
+import os
+import tempfile
+import unittest
+from src.data_models import Vacancy
+from src.dedupe import LSHIndex, MinHasher, collapse_duplicates, find_near_duplicates, optimal_bands, similarity
+from src.storage import IndexedSaver, JSONSaver
+
+DESCRIPTION = ("Разработка backend сервисов на Python и Django, проектирование REST API, работа с PostgreSQL "
+               "и Redis, написание тестов, участие в код-ревью, опыт работы с Docker и Kubernetes")
+
+
+class TestMinHash(unittest.TestCase):
+    def setUp(self):
+        self.hasher = MinHasher(num_perm=128)
+
+    def test_similarity_estimates_jaccard(self):
+        """Сигнатуры близких текстов почти совпадают, несвязанных - почти нет"""
+        original = self.hasher.signature(DESCRIPTION)
+        edited = self.hasher.signature(DESCRIPTION + ", знание английского")
+        other = self.hasher.signature("Продавец-консультант в магазин одежды, график два через два")
+        self.assertEqual(similarity(original, self.hasher.signature(DESCRIPTION)), 1.0)
+        self.assertGreater(similarity(original, edited), 0.7)
+        self.assertLess(similarity(original, other), 0.1)
+
+    def test_batch_signatures_match_single(self):
+        """Пакетный расчет дает те же сигнатуры, что и поштучный, пустой текст не ломает пакет"""
+        texts = [DESCRIPTION, "", "Тестировщик", DESCRIPTION[:40]]
+        batch = self.hasher.signatures(texts)
+        self.assertEqual(batch.shape, (4, 128))
+        for text, signature in zip(texts, batch):
+            self.assertTrue((self.hasher.signature(text) == signature).all())
+
+    def test_optimal_bands(self):
+        """Полосы делят сигнатуру без остатка, порог LSH близок к заданному"""
+        bands, rows = optimal_bands(128, 0.8)
+        self.assertEqual(bands * rows, 128)
+        self.assertAlmostEqual((1 / bands) ** (1 / rows), 0.8, delta=0.1)
+
+    def test_lsh_index_query(self):
+        """Индекс находит похожий документ и не находит непохожий"""
+        index = LSHIndex(128, threshold=0.7)
+        index.add("original", self.hasher.signature(DESCRIPTION))
+        index.add("other", self.hasher.signature("Водитель погрузчика на склад, сменный график"))
+        found = index.query(self.hasher.signature(DESCRIPTION + ", знание английского"))
+        self.assertEqual([key for key, _ in found], ["original"])
+
+
+class TestCollapseDuplicates(unittest.TestCase):
+    def setUp(self):
+        self.vacancies = [
+            Vacancy("Python-разработчик", "Москва", "https://example.com/1", None, DESCRIPTION),
+            Vacancy("Python-разработчик", "Москва", "https://example.com/2", 200000, DESCRIPTION + " и Git"),
+            Vacancy("Дизайнер", "Казань", "https://example.com/3", 90000, "Макеты в Figma, дизайн-системы"),
+            Vacancy("Тестировщик", "Омск", "https://example.com/4", None, ""),
+            Vacancy("Аналитик", "Омск", "https://example.com/5", None, ""),
+        ]
+
+    def test_find_near_duplicates(self):
+        """Перепубликация под другой ссылкой попадает в одну группу с оригиналом"""
+        entries = [{"title": v.title, "description": v.description} for v in self.vacancies]
+        self.assertEqual(find_near_duplicates(entries, threshold=0.7), [[0, 1]])
+
+    def test_collapse_duplicates(self):
+        """Из группы дублей остается вакансия с зарплатой, дубли по ссылке убираются"""
+        saver = IndexedSaver()
+        saver.add_vacancies(self.vacancies)
+        stats = collapse_duplicates(saver, threshold=0.7)
+        self.assertEqual(stats, {"total": 5, "exact": 0, "near": 1, "kept": 4})
+        links = {entry["link"] for entry in saver.get_vacancies()}
+        self.assertNotIn("https://example.com/1", links)
+        self.assertIn("https://example.com/2", links)
+
+    def test_collapse_exact_duplicates_in_file(self):
+        """Старый файл с повторами ссылок схлопывается до уникальных вакансий"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "vacancies.json")
+            JSONSaver(path, dedupe=False).add_vacancies(self.vacancies + self.vacancies[2:4])
+            saver = JSONSaver(path)
+            stats = collapse_duplicates(saver, threshold=None)
+            self.assertEqual(stats, {"total": 7, "exact": 2, "near": 0, "kept": 5})
+            self.assertEqual(len(saver.get_vacancies()), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+sys.path.insert(0, '../src')
+import os
+import tempfile
+import unittest
+import pandas as pd
+from src.data_models import Vacancy
+from src.filters import Contains, apply_criteria, matches
+from src.storage import JSONSaver, JSONLinesSaver, CSVSaver, XLSSaver, ParquetSaver, SQLiteSaver, IndexedSaver
+
+VACANCIES = [
+    Vacancy("Python Developer", "Москва", "https://example.com/py", 80000, "Знание Django"),
+    Vacancy("Дизайнер", "Санкт-Петербург", "https://example.com/design", 70000, "UI/UX, Figma"),
+    Vacancy("Менеджер 'проекта'", "Москва", "https://example.com/pm", None, "Ведение ПРОЕКТОВ"),
+    Vacancy("Тестировщик", "Казань", "https://example.com/qa", 120000, "Python, pytest"),
+    Vacancy("Аналитик", "", "https://example.com/analyst", 130000, ""),
+]
+
+CRITERIA = [
+    None,
+    {"city": "Москва"},
+    {"title": "Менеджер 'проекта'"},
+    {"salary": (75000.0, 100000.0)},
+    {"salary": (100000, None)},
+    {"salary": (None, 75000)},
+    {"salary": None},
+    {"city": ["Казань", "Санкт-Петербург"]},
+    {"salary": [70000, None]},
+    {"city": []},
+    {"city": ""},
+    {"city": ["", "Казань"]},
+    {"description": ""},
+    {"salary": [None]},
+    {"description": Contains("python")},
+    {"description": Contains("проектов"), "city": "Москва"},
+    {"title": Contains("ДИЗАЙН")},
+    {"region": "Москва"},
+    {"region": None},
+]
+
+
+class TestFilters(unittest.TestCase):
+    def setUp(self):
+        self.entries = [
+            {"title": v.title, "city": v.city, "link": v.link, "salary": v.salary, "description": v.description}
+            for v in VACANCIES
+        ]
+        self.df = pd.DataFrame(self.entries)
+
+    def test_scalar_and_vectorised_filters_agree(self):
+        """Проверка записи-словаря и векторная маска дают одинаковый результат"""
+        for criteria in CRITERIA:
+            expected = [e["link"] for e in self.entries if matches(e, criteria)]
+            self.assertEqual(list(apply_criteria(self.df, criteria)["link"]), expected, criteria)
+
+    def test_examples(self):
+        """Примеры критериев"""
+        def links(criteria):
+            return [e["link"].rsplit("/", 1)[1] for e in self.entries if matches(e, criteria)]
+        self.assertEqual(links({"salary": (75000.0, 100000.0)}), ["py"])
+        self.assertEqual(links({"salary": None}), ["pm"])
+        self.assertEqual(links({"description": Contains("PYTHON")}), ["qa"])
+        self.assertEqual(links({"city": {"Казань"}}), ["qa"])
+        self.assertEqual(links({"region": "Москва"}), [])
+
+    def test_nan_is_missing_value(self):
+        """NaN из pandas считается отсутствующим значением"""
+        self.assertTrue(matches({"salary": float("nan")}, {"salary": None}))
+        self.assertFalse(matches({"salary": float("nan")}, {"salary": (0, None)}))
+
+
+class TestBackendsAgree(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def path(self, filename):
+        return os.path.join(self.tmp_dir.name, filename)
+
+    def test_all_backends_return_same_vacancies(self):
+        """Все хранилища отбирают одни и те же вакансии по одним и тем же критериям"""
+        sqlite_saver = SQLiteSaver(self.path("vacancies.db"))
+        self.addCleanup(sqlite_saver.close)
+        savers = [JSONSaver(self.path("vacancies.json")), JSONLinesSaver(self.path("vacancies.jsonl")),
+                  CSVSaver(self.path("vacancies.csv")), XLSSaver(self.path("vacancies.xlsx")),
+                  ParquetSaver(self.path("vacancies.parquet")), sqlite_saver, IndexedSaver()]
+        for saver in savers:
+            saver.add_vacancies(VACANCIES)
+        for criteria in CRITERIA:
+            expected = sorted(v["link"] for v in savers[0].get_vacancies(criteria))
+            for saver in savers[1:]:
+                self.assertEqual(sorted(v["link"] for v in saver.get_vacancies(criteria)), expected,
+                                 f"{type(saver).__name__} {criteria}")
+
+
+if __name__ == '__main__':
+    unittest.main()
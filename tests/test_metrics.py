@@ -0,0 +1,103 @@
+import sys
+sys.path.insert(0, '../src')
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from requests_mock import mock
+from src import metrics
+from src.api import HeadHunterAPI, RateLimiter
+from src.data_models import Vacancy
+from src.storage import JSONLinesSaver
+
+
+def counter(name, **labels):
+    for item in metrics.snapshot()["counters"]:
+        if item["name"] == name and all(item["labels"].get(key) == str(value) for key, value in labels.items()):
+            return item["value"]
+    return 0
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        metrics.enable()
+        self.addCleanup(metrics.reset)
+        self.addCleanup(metrics.disable)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_counters_and_timers(self):
+        """Счетчики суммируются по меткам, timed работает как декоратор и как контекстный менеджер"""
+        metrics.inc("rows", 2, backend="a")
+        metrics.inc("rows", 3, backend="a")
+        metrics.inc("rows", backend="b")
+
+        @metrics.timed("work")
+        def work():
+            return 42
+
+        self.assertEqual(work(), 42)
+        with metrics.timed("work"):
+            pass
+        self.assertEqual(counter("rows", backend="a"), 5)
+        self.assertEqual(counter("rows", backend="b"), 1)
+        timing = metrics.snapshot()["timings"][0]
+        self.assertEqual((timing["name"], timing["count"]), ("work", 2))
+
+    def test_disabled_records_nothing(self):
+        """Выключенные метрики ничего не накапливают"""
+        metrics.disable()
+        metrics.inc("rows")
+        with metrics.timed("work"):
+            pass
+        self.assertEqual(metrics.snapshot(), {"counters": [], "timings": []})
+
+    def test_export_formats(self):
+        """Снимок выгружается в JSON и в текстовый формат Prometheus"""
+        metrics.inc("http_requests", status=200)
+        metrics.observe("parse", 0.5)
+        json_path = os.path.join(self.tmp_dir.name, "metrics.json")
+        prom_path = os.path.join(self.tmp_dir.name, "metrics.prom")
+        metrics.export(json_path)
+        metrics.export(prom_path)
+        with open(json_path, encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["counters"][0]["value"], 1)
+        with open(prom_path, encoding="utf-8") as file:
+            text = file.read()
+        self.assertIn('vacancy_http_requests_total{status="200"} 1', text)
+        self.assertIn("# TYPE vacancy_parse_seconds summary", text)
+        self.assertIn("vacancy_parse_seconds_sum 0.5", text)
+
+    def test_hot_paths_are_instrumented(self):
+        """HTTP-запросы и повторы, разбор и строки хранилища попадают в метрики"""
+        items = [{'name': 'Dev', 'url': 'https://example.com/1', 'salary': None, 'snippet': {}},
+                 {'name': 'Без ссылки'}]
+        api = HeadHunterAPI(backoff_factor=0, rate_limiter=RateLimiter(1000))
+        self.addCleanup(api.close)
+        with mock() as m:
+            m.get("https://api.hh.ru/vacancies", [{'status_code': 503}, {'json': {'items': items}}])
+            vacancies = Vacancy.cast_to_object_list(api.get_vacancies("python"))
+        saver = JSONLinesSaver(os.path.join(self.tmp_dir.name, "vacancies.jsonl"))
+        saver.add_vacancies(vacancies)
+        saver.get_vacancies()
+
+        self.assertEqual(counter("http_requests", status=503), 1)
+        self.assertEqual(counter("http_requests", status=200), 1)
+        self.assertEqual(counter("http_retries"), 1)
+        self.assertGreater(counter("http_bytes"), 0)
+        self.assertEqual((counter("parse_ok"), counter("parse_failed")), (1, 1))
+        self.assertEqual(counter("rows_written", backend="JSONLinesSaver"), 1)
+        self.assertEqual(counter("rows_read", backend="JSONLinesSaver"), 1)
+
+    def test_profile(self):
+        """Профилирование по запросу сохраняет профиль CPU и отчет о памяти"""
+        with patch.object(metrics, "DATA_DIR", self.tmp_dir.name):
+            with metrics.profile("cpu,memory"):
+                sum(range(1000))
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ["memory_profile.txt", "profile.prof"])
+
+
+if __name__ == '__main__':
+    unittest.main()
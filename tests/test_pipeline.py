@@ -0,0 +1,76 @@
+import sys
+sys.path.insert(0, '../src')
+import unittest
+import requests
+from requests_mock import mock
+from src.api import HeadHunterAPI, RateLimiter
+from src.pipeline import ingest
+from src.storage import IndexedSaver
+
+URL = "https://api.hh.ru/vacancies"
+
+
+def make_item(i):
+    return {'name': f'Vacancy {i}', 'url': f'https://example.com/{i % 240}', 'salary': {'to': 1000 * (i + 1)},
+            'snippet': {'requirement': 'Python'}, 'area': {'name': 'Москва'}}
+
+
+def pages_callback(total, per_page):
+    """Имитирует постраничную выдачу /vacancies на total вакансий"""
+    def callback(request, context):
+        page = int(request.qs['page'][0])
+        items = [make_item(i) for i in range(page * per_page, min((page + 1) * per_page, total))]
+        if page == 0:
+            items[0] = {'name': 'Без описания', 'url': 'https://example.com/broken'}
+        return {'items': items, 'found': total, 'pages': -(-total // per_page)}
+    return callback
+
+
+class RecordingSaver(IndexedSaver):
+    """Хранилище, запоминающее, сколько страниц было загружено к моменту каждой записи"""
+    def __init__(self, requests_mock):
+        super().__init__()
+        self.requests_mock = requests_mock
+        self.calls_at_write = []
+
+    def add_vacancies(self, vacancies):
+        self.calls_at_write.append(self.requests_mock.call_count)
+        super().add_vacancies(vacancies)
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self.api = HeadHunterAPI(max_workers=2, backoff_factor=0, rate_limiter=RateLimiter(1000))
+        self.addCleanup(self.api.close)
+
+    def test_ingest_parses_dedupes_and_writes(self):
+        """Все страницы загружаются, некорректные записи и дубли ссылок отбрасываются"""
+        saver = IndexedSaver()
+        with mock() as m:
+            m.get(URL, json=pages_callback(250, 100))
+            stats = ingest(self.api, "Python", saver, batch_size=50, per_page=100)
+        self.assertEqual(stats, {"fetched": 250, "skipped": 1, "duplicates": 9, "written": 240})
+        self.assertEqual(len(saver), 240)
+
+    def test_results_are_written_while_fetching(self):
+        """Первые пачки попадают в хранилище раньше, чем загружены все страницы"""
+        with mock() as m:
+            m.get(URL, json=pages_callback(240, 10))
+            saver = RecordingSaver(m)
+            ingest(self.api, "Python", saver, batch_size=10, queue_size=1, per_page=10)
+        self.assertLess(saver.calls_at_write[0], 10)
+        self.assertEqual(len(saver.calls_at_write), 24)
+
+    def test_fetch_error_is_raised(self):
+        """Ошибка загрузки прерывает конвейер, уже полученные пачки остаются в хранилище"""
+        saver = IndexedSaver()
+        with mock() as m:
+            m.get(URL, [{'json': pages_callback(300, 100)}, {'json': pages_callback(300, 100)},
+                        {'status_code': 404}])
+            with self.assertRaises(requests.exceptions.HTTPError):
+                ingest(self.api, "Python", saver, batch_size=10, per_page=100)
+        self.assertGreater(len(saver), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
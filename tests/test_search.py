@@ -0,0 +1,87 @@
+import sys
+sys.path.insert(0, '../src')
+import os
+import tempfile
+import unittest
+from src.data_models import Vacancy
+from src.search import SearchIndex, stem, tokenize
+from src.storage import IndexedSaver, JSONSaver
+
+
+class TestTokenize(unittest.TestCase):
+    def test_russian_tokens_are_normalised(self):
+        """Регистр, "ё", стоп-слова и окончания не мешают совпадению"""
+        self.assertEqual(tokenize("Разработчики и ТРЕБОВАНИЯ"), tokenize("разработчик требование"))
+        self.assertEqual(tokenize("Ёлка"), tokenize("елки"))
+        self.assertNotIn("и", tokenize("Python и Django"))
+
+    def test_short_words_are_not_stemmed(self):
+        """Основа не становится короче трех букв"""
+        self.assertEqual(stem("сеть"), "сет")
+        self.assertEqual(stem("оба"), "оба")
+        self.assertEqual(tokenize("C++ и C#"), ["c++", "c#"])
+        self.assertEqual(tokenize("Developers"), ["developer"])
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.vacancies = [
+            Vacancy("Python-разработчик", "Москва", "https://example.com/py", 200000, "Опыт разработки на Django"),
+            Vacancy("Разработчик Java", "Казань", "https://example.com/java", 150000, "Spring, опыт от 3 лет"),
+            Vacancy("Тестировщик", "Москва", "https://example.com/qa", 90000, "Автотесты на Python"),
+        ]
+
+    def make_saver(self):
+        index = SearchIndex(os.path.join(self.tmp_dir.name, "search_index.json"))
+        saver = IndexedSaver(JSONSaver(os.path.join(self.tmp_dir.name, "vacancies.json")), listeners=[index])
+        return index, saver
+
+    def test_bm25_ranking(self):
+        """Документ, где совпало больше редких слов запроса, оказывается выше"""
+        index, saver = self.make_saver()
+        saver.add_vacancies(self.vacancies)
+        links = [link for link, _ in index.search("python разработчики")]
+        self.assertEqual(links[0], "https://example.com/py")
+        self.assertCountEqual(links, ["https://example.com/py", "https://example.com/java", "https://example.com/qa"])
+        self.assertEqual(index.search("golang"), [])
+
+    def test_index_follows_add_and_delete(self):
+        """Индекс обновляется при добавлении и удалении вакансий"""
+        index, saver = self.make_saver()
+        saver.add_vacancies(self.vacancies)
+        saver.delete_vacancy(self.vacancies[0])
+        self.assertEqual([link for link, _ in index.search("django")], [])
+        saver.add_vacancy(Vacancy("Python-разработчик", "Москва", "https://example.com/py", None, "Flask"))
+        self.assertEqual([link for link, _ in index.search("flask")], ["https://example.com/py"])
+        self.assertEqual(len(index), 3)
+
+    def test_index_is_persisted(self):
+        """Индекс сохраняется рядом с данными и сверяется с хранилищем при загрузке"""
+        index, saver = self.make_saver()
+        with saver:
+            saver.add_vacancies(self.vacancies)
+        self.assertTrue(os.path.exists(index.file_path))
+        backend = JSONSaver(os.path.join(self.tmp_dir.name, "vacancies.json"))
+        backend.delete_vacancy(self.vacancies[2])  # изменение в обход индекса
+        index, saver = self.make_saver()
+        self.assertEqual(len(index), 2)
+        self.assertEqual([link for link, _ in index.search("django")], ["https://example.com/py"])
+
+    def test_changed_vacancy_is_reindexed(self):
+        """Вакансия, измененная в файле в обход индекса, переиндексируется при загрузке"""
+        index, saver = self.make_saver()
+        with saver:
+            saver.add_vacancies(self.vacancies)
+        backend = JSONSaver(os.path.join(self.tmp_dir.name, "vacancies.json"))
+        changed = Vacancy("Go Developer", "Москва", self.vacancies[0].link, None, "Микросервисы на Go")
+        backend.delete_vacancy(self.vacancies[0])
+        backend.add_vacancy(changed)
+        index, saver = self.make_saver()
+        self.assertEqual([link for link, _ in index.search("микросервисы")], [changed.link])
+        self.assertEqual(index.search("django"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
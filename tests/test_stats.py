@@ -0,0 +1,83 @@
+import sys
+sys.path.insert(0, '../src')
+import os
+import tempfile
+import unittest
+from src.data_models import Vacancy
+from src.stats import HISTOGRAM_EDGES, SalaryStats
+from src.storage import IndexedSaver, JSONSaver
+
+
+class TestSalaryStats(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.vacancies = [
+            Vacancy("Developer", "Москва", "https://example.com/dev", 80000, "Fullstack"),
+            Vacancy("Designer", "Санкт-Петербург", "https://example.com/design", 70000, "UI/UX Designer"),
+            Vacancy("Manager", "Москва", "https://example.com/manager", None, "Project Manager"),
+            Vacancy("Architect", "Москва", "https://example.com/architect", 600000, "Solutions"),
+            Vacancy("Tester", "Москва", "https://example.com/tester", 60000, "QA"),
+        ]
+
+    def path(self, filename):
+        return os.path.join(self.tmp_dir.name, filename)
+
+    def make_stats(self):
+        return SalaryStats(self.path("stats.json"))
+
+    def test_aggregates_follow_changes(self):
+        """Агрегаты пересчитываются при добавлении, замене и удалении вакансий"""
+        stats = self.make_stats()
+        saver = IndexedSaver(listeners=[stats])
+        saver.add_vacancies(self.vacancies)
+        moscow = stats.city("Москва")
+        self.assertEqual((moscow["count"], moscow["with_salary"]), (4, 3))
+        self.assertEqual((moscow["min"], moscow["median"], moscow["max"]), (60000, 80000, 600000))
+        self.assertEqual(sum(moscow["histogram"]), 3)
+        self.assertEqual(moscow["histogram"][-1], 1)  # 600000 - в открытой последней корзине
+        self.assertEqual(list(stats.by_city()), ["Москва", "Санкт-Петербург"])
+
+        saver.delete_vacancy(self.vacancies[3])
+        self.assertEqual(stats.city("Москва")["median"], 70000)  # среднее двух центральных
+        saver.add_vacancy(Vacancy("Tester", "Казань", "https://example.com/tester", 90000, "QA"))
+        self.assertEqual(stats.city("Москва")["count"], 2)
+        self.assertEqual(stats.city("Казань")["max"], 90000)
+        self.assertEqual(stats.overall()["count"], 4)
+
+        saver.delete_vacancy(self.vacancies[1])
+        self.assertIsNone(stats.city("Санкт-Петербург"))
+        saver.clear()
+        self.assertEqual(stats.overall(), {"count": 0, "with_salary": 0, "min": None, "median": None,
+                                           "max": None, "histogram": [0] * len(HISTOGRAM_EDGES)})
+
+    def test_salaries_in_roubles(self):
+        """Зарплаты в валюте учитываются в рублях: корзины гистограммы - рублевые"""
+        stats = self.make_stats()
+        saver = IndexedSaver(listeners=[stats])
+        saver.add_vacancies([Vacancy("Developer", "Алматы", "https://example.com/kz", 500000, "", currency="KZT"),
+                             Vacancy("Developer", "Берлин", "https://example.com/de", 5000, "", currency="EUR")])
+        self.assertEqual(stats.city("Алматы")["max"], 90000)
+        self.assertEqual(stats.city("Алматы")["histogram"][1], 1)
+        self.assertEqual(stats.city("Берлин")["max"], 500000)
+
+    def test_persisted_and_synced_with_storage(self):
+        """Статистика сохраняется в файл и сверяется с хранилищем при следующем запуске"""
+        backend = JSONSaver(self.path("vacancies.json"))
+        stats = self.make_stats()
+        with IndexedSaver(backend, listeners=[stats]) as saver:
+            saver.add_vacancies(self.vacancies)
+        self.assertEqual(len(self.make_stats()), 5)
+
+        # Хранилище изменили в обход статистики
+        backend.delete_vacancy(self.vacancies[0])
+        restored = self.make_stats()
+        IndexedSaver(backend, listeners=[restored])
+        self.assertEqual(restored.city("Москва")["count"], 3)
+        rebuilt = SalaryStats(self.path("rebuilt.json"))
+        IndexedSaver(backend, listeners=[rebuilt])
+        self.assertEqual(restored.by_city(), rebuilt.by_city())
+
+
+if __name__ == '__main__':
+    unittest.main()
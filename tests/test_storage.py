@@ -1,16 +1,24 @@
 import sys
 sys.path.insert(0, '../src')
 import os
+import sqlite3
+import tempfile
 import unittest
-from src.storage import JSONSaver, CSVSaver, XLSSaver
+import warnings
+from unittest.mock import patch
+from src.storage import JSONSaver, JSONLinesSaver, CSVSaver, XLSSaver, IndexedSaver, SQLiteSaver, ParquetSaver
 from src.data_models import Vacancy
+from src.search import SearchIndex
 
 class TestStorage(unittest.TestCase):
-    def tearDown(self):
-        files = ["..data/vacancies.json", "..data/vacancies.csv", "..data/vacancies.xlsx"]
-        for file in files:
-            if os.path.exists(file):
-                os.remove(file)
+    def setUp(self):
+        # Хранилища с именами файлов по умолчанию пишут во временную папку, а не в data/ репозитория
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        for saver_class in (JSONSaver, CSVSaver, XLSSaver):
+            patcher = patch.object(saver_class, "DATA_DIR", self.tmp_dir.name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
 
     def test_json_saver(self):
         """Тест JSONSaver"""
@@ -45,5 +53,446 @@ class TestStorage(unittest.TestCase):
         saved_data = saver.get_vacancies()
         self.assertNotIn("Manager", [v['title'] for v in saved_data])
 
+class TestBatchStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.vacancies = [
+            Vacancy("Developer", "Москва", "https://example.com/dev", 80000, "Fullstack"),
+            Vacancy("Designer", "Санкт-Петербург", "https://example.com/design", 70000, "UI/UX Designer"),
+            Vacancy("Manager", "Москва", "https://example.com/manager", None, "Project Manager"),
+        ]
+
+    def path(self, filename):
+        return os.path.join(self.tmp_dir.name, filename)
+
+    def test_json_add_vacancies(self):
+        """JSONSaver сохраняет пачку вакансий одной записью"""
+        saver = JSONSaver(self.path("vacancies.json"))
+        with patch.object(JSONSaver, "_save_json", wraps=saver._save_json) as save:
+            saver.add_vacancies(self.vacancies)
+            self.assertEqual(save.call_count, 1)
+        self.assertEqual(len(saver.get_vacancies()), 3)
+        self.assertEqual(len(saver.get_vacancies({"city": "Москва"})), 2)
+
+    def test_json_save_is_atomic(self):
+        """Сбой во время записи не портит уже сохраненный файл"""
+        saver = JSONSaver(self.path("vacancies.json"))
+        saver.add_vacancies(self.vacancies[:1])
+        with patch("src.storage.json.dump", side_effect=RuntimeError("сбой")):
+            with self.assertRaises(RuntimeError):
+                saver.add_vacancies(self.vacancies[1:])
+        self.assertEqual([v['title'] for v in saver.get_vacancies()], ["Developer"])
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["vacancies.json"])
+
+    def test_atomic_write_keeps_permissions(self):
+        """Атомарная запись не меняет права файла: новый файл получает права по umask, старый - сохраняет свои"""
+        saver = JSONSaver(self.path("vacancies.json"))
+        saver.add_vacancies(self.vacancies[:1])
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(saver.file_path).st_mode & 0o777, 0o666 & ~umask)
+        os.chmod(saver.file_path, 0o640)
+        saver.add_vacancies(self.vacancies[1:])
+        self.assertEqual(os.stat(saver.file_path).st_mode & 0o777, 0o640)
+
+    def test_json_lines_saver(self):
+        """JSONLinesSaver дописывает вакансии в конец файла и умеет их удалять"""
+        saver = JSONLinesSaver(self.path("vacancies.jsonl"))
+        saver.add_vacancies(self.vacancies[:2])
+        saver.add_vacancy(self.vacancies[2])
+        with open(saver.file_path, encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 3)
+        self.assertEqual(len(saver.get_vacancies({"salary": (75000, 90000)})), 1)
+        saver.delete_vacancy(self.vacancies[0])
+        self.assertNotIn("Developer", [v['title'] for v in saver.get_vacancies()])
+
+    def test_clear(self):
+        """Все хранилища умеют удалять все вакансии"""
+        sqlite_saver = SQLiteSaver(self.path("vacancies.db"))
+        self.addCleanup(sqlite_saver.close)
+        savers = [JSONSaver(self.path("vacancies.json")), JSONLinesSaver(self.path("vacancies.jsonl")),
+                  CSVSaver(self.path("vacancies.csv"), buffer_size=100), XLSSaver(self.path("vacancies.xlsx")),
+                  ParquetSaver(self.path("vacancies.parquet")), sqlite_saver, IndexedSaver()]
+        for saver in savers:
+            saver.add_vacancies(self.vacancies)
+            saver.clear()
+            self.assertEqual(saver.get_vacancies(), [], type(saver).__name__)
+            saver.add_vacancy(self.vacancies[0])
+            self.assertEqual(len(saver.get_vacancies()), 1, type(saver).__name__)
+
+    def test_replace_vacancies(self):
+        """Замена содержимого атомарна: сбой посреди замены оставляет прежние вакансии"""
+        sqlite_saver = SQLiteSaver(self.path("vacancies.db"))
+        self.addCleanup(sqlite_saver.close)
+        savers = [JSONSaver(self.path("vacancies.json")), JSONLinesSaver(self.path("vacancies.jsonl")),
+                  CSVSaver(self.path("vacancies.csv")), XLSSaver(self.path("vacancies.xlsx")),
+                  ParquetSaver(self.path("vacancies.parquet")), sqlite_saver]
+
+        def failing():
+            yield self.vacancies[0]
+            raise RuntimeError("сбой")
+
+        for saver in savers:
+            name = type(saver).__name__
+            saver.add_vacancies(self.vacancies)
+            with self.assertRaises(RuntimeError):
+                saver.replace_vacancies(failing())
+            self.assertEqual(len(saver.get_vacancies()), 3, name)
+            saver.replace_vacancies(self.vacancies[1:] + self.vacancies[1:2])
+            self.assertEqual(sorted(v["link"] for v in saver.get_vacancies()),
+                             sorted(v.link for v in self.vacancies[1:]), name)
+
+    def test_replace_after_clear_in_indexed_saver(self):
+        """IndexedSaver после очистки переписывает backend заменой, а не очисткой и вставкой"""
+        backend = JSONSaver(self.path("vacancies.json"))
+        backend.add_vacancies(self.vacancies)
+        saver = IndexedSaver(backend)
+        saver.clear()
+        saver.add_vacancy(self.vacancies[2])
+        with patch.object(backend, "clear", side_effect=AssertionError("clear")):
+            saver.flush()
+        self.assertEqual([v["link"] for v in backend.get_vacancies()], [self.vacancies[2].link])
+
+    def test_dedupe_on_insert(self):
+        """Файловые хранилища не сохраняют вакансию повторно, в том числе после переоткрытия файла"""
+        savers = {
+            JSONSaver: "vacancies.json", JSONLinesSaver: "vacancies.jsonl", CSVSaver: "vacancies.csv",
+            XLSSaver: "vacancies.xlsx", ParquetSaver: "vacancies.parquet",
+        }
+        for saver_class, filename in savers.items():
+            name = saver_class.__name__
+            saver = saver_class(self.path(filename))
+            saver.add_vacancies(self.vacancies + self.vacancies[:1])
+            saver.add_vacancy(self.vacancies[1])
+            self.assertEqual(len(saver.get_vacancies()), 3, name)
+            reopened = saver_class(self.path(filename))
+            reopened.add_vacancies(self.vacancies)
+            self.assertEqual(len(reopened.get_vacancies()), 3, name)
+            # После удаления вакансию можно добавить снова
+            reopened.delete_vacancy(self.vacancies[0])
+            reopened.add_vacancy(self.vacancies[0])
+            self.assertEqual(len(reopened.get_vacancies()), 3, name)
+            # Без dedupe вакансии дописываются как есть
+            raw = saver_class(self.path(filename), dedupe=False)
+            raw.add_vacancy(self.vacancies[0])
+            self.assertEqual(len(raw.get_vacancies()), 4, name)
+
+    def test_salary_fields_are_persisted(self):
+        """Все хранилища сохраняют вилку, валюту, gross и зарплату в рублях"""
+        vacancies = [Vacancy("Go dev", "Берлин", "https://example.com/go", 5000, "Go", 4000, "EUR", False),
+                     Vacancy("Python dev", "Москва", "https://example.com/py", 150000, "Python", 100000, "RUR", True)]
+        sqlite_saver = SQLiteSaver(self.path("vacancies.db"))
+        self.addCleanup(sqlite_saver.close)
+        savers = [JSONSaver(self.path("vacancies.json")), JSONLinesSaver(self.path("vacancies.jsonl")),
+                  CSVSaver(self.path("vacancies.csv")), XLSSaver(self.path("vacancies.xlsx")),
+                  ParquetSaver(self.path("vacancies.parquet")), sqlite_saver, IndexedSaver()]
+        for saver in savers:
+            name = type(saver).__name__
+            saver.add_vacancies(vacancies)
+            stored = saver.get_vacancies({"salary_rub": (200000, None)})
+            self.assertEqual([Vacancy.from_dict(entry) for entry in stored], vacancies[:1], name)
+            self.assertEqual(stored[0]["salary_rub"], 500000, name)
+            self.assertEqual(len(saver.get_vacancies({"salary": (100000, 200000)})), 1, name)
+
+    def test_legacy_csv_gets_new_columns(self):
+        """CSV-файл с прежними колонками переписывается с новыми, старые зарплаты считаются рублевыми"""
+        with open(self.path("vacancies.csv"), "w", encoding="utf-8") as file:
+            file.write("title,city,link,salary,description\n"
+                       "Developer,Москва,https://example.com/dev,80000,Fullstack\n")
+        saver = CSVSaver(self.path("vacancies.csv"))
+        saver.add_vacancy(Vacancy("Go dev", "Берлин", "https://example.com/go", 5000, "Go", None, "EUR"))
+        self.assertEqual([v["salary_rub"] for v in saver.get_vacancies()], [80000, 500000])
+        with open(saver.file_path, encoding="utf-8") as file:
+            self.assertEqual(file.readline().strip(), ",".join(CSVSaver.COLUMNS))
+
+    def test_json_lines_skips_torn_line(self):
+        """Недописанная после сбоя строка пропускается и не склеивается со следующей"""
+        saver = JSONLinesSaver(self.path("vacancies.jsonl"))
+        saver.add_vacancy(self.vacancies[0])
+        with open(saver.file_path, "a", encoding="utf-8") as file:
+            file.write('{"title": "Обрыв')
+        saver.add_vacancy(self.vacancies[1])
+        self.assertEqual([v['title'] for v in saver.get_vacancies()], ["Developer", "Designer"])
+
+
+class TestBufferedPandasSavers(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.vacancies = [
+            Vacancy(f"Developer {i}", "Москва", f"https://example.com/dev{i}", 80000 + i, "Fullstack")
+            for i in range(5)
+        ]
+
+    def path(self, filename):
+        return os.path.join(self.tmp_dir.name, filename)
+
+    def test_csv_append_does_not_reread(self):
+        """Без буфера CSVSaver дописывает строку в конец файла, не читая его"""
+        saver = CSVSaver(self.path("vacancies.csv"))
+        saver.add_vacancy(self.vacancies[0])
+        with patch("pandas.read_csv") as read_csv:
+            saver.add_vacancies(self.vacancies[1:])
+            read_csv.assert_not_called()
+        with open(saver.file_path, encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 6)
+        self.assertEqual([v["title"] for v in saver.get_vacancies()], [v.title for v in self.vacancies])
+
+    def test_csv_buffer_flushed_on_size(self):
+        """Буфер записывается в файл, когда набирается buffer_size вакансий"""
+        saver = CSVSaver(self.path("vacancies.csv"), buffer_size=3)
+        saver.add_vacancies(self.vacancies[:2])
+        self.assertFalse(os.path.exists(saver.file_path))
+        saver.add_vacancy(self.vacancies[2])
+        self.assertTrue(os.path.exists(saver.file_path))
+
+    def test_csv_buffer_flushed_on_interval(self):
+        """Буфер записывается, если с первой вакансии в нем прошло flush_interval секунд"""
+        saver = CSVSaver(self.path("vacancies.csv"), buffer_size=100, flush_interval=0)
+        saver.add_vacancy(self.vacancies[0])
+        self.assertTrue(os.path.exists(saver.file_path))
+
+    def test_reads_see_buffered_rows(self):
+        """Чтение и удаление видят еще не записанные вакансии"""
+        saver = CSVSaver(self.path("vacancies.csv"), buffer_size=100)
+        saver.add_vacancies(self.vacancies)
+        self.assertEqual(len(saver.get_vacancies()), 5)
+        saver.add_vacancy(Vacancy("Designer", "Казань", "https://example.com/design", None, "UI"))
+        saver.delete_vacancy(Vacancy("Designer", "", "https://example.com/design", None, ""))
+        self.assertNotIn("Designer", [v["title"] for v in saver.get_vacancies()])
+
+    def test_xls_buffer_written_once(self):
+        """XLSSaver перезаписывает файл один раз на весь буфер, остаток пишется при выходе из with"""
+        saver = XLSSaver(self.path("vacancies.xlsx"), buffer_size=100)
+        with patch.object(XLSSaver, "_save_xlsx", wraps=saver._save_xlsx) as save:
+            with saver:
+                for vacancy in self.vacancies:
+                    saver.add_vacancy(vacancy)
+                self.assertEqual(save.call_count, 0)
+            self.assertEqual(save.call_count, 1)
+        self.assertEqual(len(XLSSaver(self.path("vacancies.xlsx")).get_vacancies()), 5)
+
+    def test_xls_append_rows_without_salary(self):
+        """Дописывание строк без зарплаты к файлу не вызывает предупреждений pandas о типах колонок"""
+        saver = XLSSaver(self.path("vacancies.xlsx"))
+        saver.add_vacancies([Vacancy("Designer", "Казань", "https://example.com/design", None, ""), self.vacancies[0]])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            saver.add_vacancy(Vacancy("Manager", "Казань", "https://example.com/manager", None, ""))
+        self.assertEqual([v["title"] for v in saver.get_vacancies()], ["Designer", "Developer 0", "Manager"])
+
+
+class TestParquetSaver(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.saver = ParquetSaver(os.path.join(self.tmp_dir.name, "vacancies.parquet"))
+        self.json_saver = JSONSaver(os.path.join(self.tmp_dir.name, "vacancies.json"))
+        vacancies = [
+            Vacancy("Developer", "Москва", "https://example.com/dev", 80000, "Fullstack"),
+            Vacancy("Designer", "Санкт-Петербург", "https://example.com/design", 70000, "UI/UX Designer"),
+            Vacancy("Manager", "Москва", "https://example.com/manager", None, "Project Manager"),
+        ]
+        self.saver.add_vacancies(vacancies)
+        self.json_saver.add_vacancies(vacancies)
+
+    def test_parquet_saver(self):
+        """Тест ParquetSaver"""
+        vacancy = Vacancy("Tester", "Казань", "https://example.com/qa", 90000, "QA")
+        self.saver.add_vacancy(vacancy)
+        self.assertIn("Tester", [v['title'] for v in self.saver.get_vacancies()])
+        self.saver.delete_vacancy(vacancy)
+        self.assertNotIn("Tester", [v['title'] for v in self.saver.get_vacancies()])
+        self.assertEqual(len(self.saver._parts()), 1)
+
+    def test_small_parts_are_compacted(self):
+        """Запись по одной вакансии не копит части: мелкие сливаются, когда их больше MAX_PARTS"""
+        for i in range(50):
+            self.saver.add_vacancy(Vacancy(f"Vacancy {i}", "Москва", f"https://example.com/{i}", 1000 + i, ""))
+        self.assertLessEqual(len(self.saver._parts()), ParquetSaver.MAX_PARTS)
+        vacancies = self.saver.get_vacancies()
+        self.assertEqual(len(vacancies), 53)
+        self.assertEqual(len({v["link"] for v in vacancies}), 53)
+        self.assertEqual(len(self.saver.get_vacancies({"salary": (1010, 1019)})), 10)
+
+    def test_delete_keeps_same_title(self):
+        """Удаляется только вакансия с совпадающими названием и ссылкой, а не все с тем же названием"""
+        self.saver.add_vacancy(Vacancy("Developer", "Казань", "https://example.com/dev2", 90000, ""))
+        self.saver.delete_vacancy(Vacancy("Developer", "", "https://example.com/dev", None, ""))
+        self.assertCountEqual([v["link"] for v in self.saver.get_vacancies()],
+                              ["https://example.com/dev2", "https://example.com/design", "https://example.com/manager"])
+
+    def test_criteria_match_json_saver(self):
+        """Отбор с фильтрами при чтении совпадает с отбором JSONSaver"""
+        for criteria in [None, {"city": "Москва"}, {"salary": (75000.0, 100000.0)},
+                         {"city": "Москва", "salary": (0, 10**6)}, {"salary": None}, {"region": "Москва"}]:
+            self.assertCountEqual(self.saver.get_vacancies(criteria), self.json_saver.get_vacancies(criteria))
+
+    def test_column_types(self):
+        """Зарплата хранится как целое с пропусками, город - как словарная колонка"""
+        schema = self.saver._pq.read_schema(os.path.join(self.saver.dir_path, self.saver._parts()[0]))
+        self.assertEqual(str(schema.field("salary").type), "int64")
+        self.assertEqual(str(schema.field("city").type), "dictionary<values=string, indices=int32, ordered=0>")
+
+    def test_row_groups_are_pruned(self):
+        """Группы строк, не подходящие по статистике, отбрасываются без чтения"""
+        saver = ParquetSaver(os.path.join(self.tmp_dir.name, "big.parquet"))
+        saver.ROW_GROUP_SIZE = 100
+        saver.add_vacancies(Vacancy(f"Developer {i}", "Москва" if i < 500 else "Казань",
+                                    f"https://example.com/{i}", 1000 * i, "") for i in range(1000))
+        part = os.path.join(saver.dir_path, saver._parts()[0])
+        fragment = next(iter(saver._ds.dataset(part, schema=saver._schema, format="parquet").get_fragments()))
+        self.assertEqual(fragment.num_row_groups, 10)
+        row_groups = fragment.split_by_row_group(saver._build_filter({"salary": (600000, 650000)}))
+        self.assertEqual(len(row_groups), 1)
+        self.assertEqual(len(saver.get_vacancies({"salary": (600000, 650000)})), 51)
+
+
+class TestIndexedSaver(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.backend = JSONSaver(os.path.join(self.tmp_dir.name, "vacancies.json"))
+        self.backend.add_vacancies([
+            Vacancy("Developer", "Москва", "https://example.com/dev", 80000, "Fullstack"),
+            Vacancy("Designer", "Санкт-Петербург", "https://example.com/design", 70000, "UI/UX Designer"),
+            Vacancy("Manager", "Москва", "https://example.com/manager", None, "Project Manager"),
+        ])
+        self.saver = IndexedSaver(self.backend)
+
+    def test_nan_text_fields_from_backend(self):
+        """Пропуски pandas (NaN) в строковых полях backend загружаются как "", а не как float("nan")"""
+        entry = {"title": "Analyst", "city": float("nan"), "link": "https://example.com/analyst", "salary": None,
+                 "description": float("nan")}
+        search_index = SearchIndex(os.path.join(self.tmp_dir.name, "search_index.json"))
+        with patch.object(self.backend, "get_vacancies", return_value=[entry]):
+            saver = IndexedSaver(self.backend, listeners=[search_index])
+        vacancies = saver.get_vacancies({"city": ""})
+        self.assertEqual([(v["link"], v["city"], v["description"]) for v in vacancies], [(entry["link"], "", "")])
+        self.assertEqual(search_index.search("nan"), [])
+
+    def test_queries_match_json_saver(self):
+        """Ответы по индексам совпадают с полным перебором JSONSaver"""
+        self.saver.add_vacancy(Vacancy("Tester", "Казань", "https://example.com/qa", 90000, "QA"))
+        self.saver.flush()
+        for criteria in [None, {"city": "Москва"}, {"salary": (75000.0, 100000.0)},
+                         {"city": "Москва", "salary": (0, 10**6)}, {"link": "https://example.com/qa"},
+                         {"region": "Москва"}, {"city": "Тверь"}]:
+            self.assertCountEqual(self.saver.get_vacancies(criteria), self.backend.get_vacancies(criteria))
+
+    def test_link_is_unique(self):
+        """Повторное добавление ссылки заменяет запись, а не дублирует ее"""
+        self.saver.add_vacancy(Vacancy("Senior Developer", "Москва", "https://example.com/dev", 150000, "Fullstack"))
+        self.assertEqual(len(self.saver), 3)
+        self.assertEqual(self.saver.get_vacancies({"salary": (0, 100000)})[0]["title"], "Designer")
+        self.saver.flush()
+        self.assertEqual([v["title"] for v in self.backend.get_vacancies({"link": "https://example.com/dev"})],
+                         ["Senior Developer"])
+
+    def test_delete_is_persisted_on_flush(self):
+        """Удаление видно сразу, а в файл попадает при выходе из контекста"""
+        with self.saver:
+            self.saver.delete_vacancy(Vacancy("Developer", "", "https://example.com/dev", None, ""))
+            self.assertEqual(self.saver.get_vacancies({"salary": (0, 10**6)})[0]["title"], "Designer")
+            self.assertEqual(len(self.backend.get_vacancies()), 3)
+        self.assertNotIn("Developer", [v["title"] for v in self.backend.get_vacancies()])
+
+    def test_delete_requires_matching_title(self):
+        """Как и JSONSaver, удаляется только вакансия с совпадающими названием и ссылкой"""
+        self.saver.delete_vacancy(Vacancy("Other", "", "https://example.com/dev", None, ""))
+        self.assertEqual(len(self.saver), 3)
+
+    def test_salary_index_is_in_roubles(self):
+        """Индекс зарплат строится по зарплате в рублях, поэтому диапазон учитывает валюту"""
+        self.saver.add_vacancy(Vacancy("Go dev", "Берлин", "https://example.com/go", 2000, "Go", None, "USD"))
+        self.assertEqual([v["title"] for v in self.saver.get_vacancies({"salary_rub": (75000, 200000)})],
+                         ["Developer", "Go dev"])
+        self.assertEqual([v["title"] for v in self.saver.get_vacancies({"salary_rub": (0, 75000)})], ["Designer"])
+
+    def test_flush_to_pandas_backends_keeps_same_titles(self):
+        """Замена и удаление по ссылке не задевают в CSV и XLSX другие вакансии с тем же названием"""
+        backends = {CSVSaver: "vacancies.csv", XLSSaver: "vacancies.xlsx"}
+        for backend_class, filename in backends.items():
+            backend = backend_class(os.path.join(self.tmp_dir.name, filename))
+            backend.add_vacancies([Vacancy("Python dev", "Москва", f"https://example.com/{i}", 100000 + i, "")
+                                   for i in range(5)])
+            with IndexedSaver(backend) as saver:
+                saver.add_vacancy(Vacancy("Python dev", "Казань", "https://example.com/0", 200000, ""))
+                saver.delete_vacancy(Vacancy("Python dev", "", "https://example.com/1", None, ""))
+            stored = {v["link"]: v["city"] for v in backend.get_vacancies()}
+            self.assertEqual(len(stored), 4, backend_class.__name__)
+            self.assertEqual(stored["https://example.com/0"], "Казань", backend_class.__name__)
+
+
+class TestSQLiteSaver(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.saver = SQLiteSaver(os.path.join(self.tmp_dir.name, "vacancies.db"))
+        self.addCleanup(self.saver.close)
+        self.json_saver = JSONSaver(os.path.join(self.tmp_dir.name, "vacancies.json"))
+        vacancies = [
+            Vacancy("Developer", "Москва", "https://example.com/dev", 80000, "Fullstack"),
+            Vacancy("Designer", "Санкт-Петербург", "https://example.com/design", 70000, "UI/UX Designer"),
+            Vacancy("Manager", "Москва", "https://example.com/manager", None, "Project Manager"),
+        ]
+        self.saver.add_vacancies(vacancies)
+        self.json_saver.add_vacancies(vacancies)
+
+    def test_legacy_database_is_migrated(self):
+        """В базу прежней схемы добавляются новые колонки, старые зарплаты считаются рублевыми"""
+        path = os.path.join(self.tmp_dir.name, "legacy.db")
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE vacancies (id INTEGER PRIMARY KEY, title TEXT NOT NULL, city TEXT, "
+                         "link TEXT NOT NULL UNIQUE, salary INTEGER, description TEXT)")
+            conn.execute("INSERT INTO vacancies (title, city, link, salary, description) "
+                         "VALUES ('Developer', 'Москва', 'https://example.com/dev', 80000, 'Fullstack')")
+        conn.close()
+        with SQLiteSaver(path) as saver:
+            saver.add_vacancy(Vacancy("Go dev", "Берлин", "https://example.com/go", 5000, "Go", None, "EUR", True))
+            self.assertEqual([(v["salary_rub"], v["gross"]) for v in saver.get_vacancies()],
+                             [(80000, None), (500000, True)])
+
+    def test_sqlite_saver(self):
+        """Тест SQLiteSaver"""
+        vacancy = Vacancy("Tester", "Казань", "https://example.com/qa", 90000, "QA")
+        self.saver.add_vacancy(vacancy)
+        self.assertIn("Tester", [v['title'] for v in self.saver.get_vacancies()])
+        self.saver.delete_vacancy(vacancy)
+        self.assertNotIn("Tester", [v['title'] for v in self.saver.get_vacancies()])
+
+    def test_criteria_match_json_saver(self):
+        """Отбор через SQL совпадает с отбором JSONSaver"""
+        for criteria in [None, {"city": "Москва"}, {"salary": (75000.0, 100000.0)},
+                         {"city": "Москва", "salary": (0, 10**6)}, {"salary": None},
+                         {"region": "Москва"}, {"city": "Тверь'); DROP TABLE vacancies; --"}]:
+            self.assertEqual(self.saver.get_vacancies(criteria), self.json_saver.get_vacancies(criteria))
+
+    def test_link_is_unique(self):
+        """Повторное добавление ссылки обновляет запись"""
+        self.saver.add_vacancy(Vacancy("Senior Developer", "Москва", "https://example.com/dev", 150000, "Fullstack"))
+        self.assertEqual([v['title'] for v in self.saver.get_vacancies({"link": "https://example.com/dev"})],
+                         ["Senior Developer"])
+        self.assertEqual(len(self.saver.get_vacancies()), 3)
+
+    def test_indexes_are_used(self):
+        """Запросы по городу и зарплате идут по индексам, база работает в режиме WAL"""
+        conn = self.saver._conn
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        for criteria, index in [({"city": "Москва"}, "idx_vacancies_city"),
+                                ({"salary": (1, 2)}, "idx_vacancies_salary")]:
+            where, params = self.saver._build_where(criteria)
+            plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM vacancies {where}",
+                                                             params))
+            self.assertIn(index, plan)
+
+    def test_concurrent_connections(self):
+        """Второе подключение к той же базе видит изменения первого"""
+        with SQLiteSaver(self.saver.file_path) as reader:
+            self.saver.add_vacancy(Vacancy("Tester", "Казань", "https://example.com/qa", 90000, "QA"))
+            self.assertEqual(len(reader.get_vacancies({"city": "Казань"})), 1)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,147 @@
+import sys
+sys.path.insert(0, '../src')
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from requests_mock import mock
+from src.api import HeadHunterAPI, RateLimiter
+from src.storage import CSVSaver, IndexedSaver, JSONSaver
+from src.sync import PUBLISHED_FORMAT, IncrementalSync
+
+URL = "https://api.hh.ru/vacancies"
+
+
+def published(days_ago):
+    moment = datetime.now(timezone(timedelta(hours=3))) - timedelta(days=days_ago)
+    return moment.replace(microsecond=0).strftime(PUBLISHED_FORMAT)
+
+
+def make_item(i, days_ago, title=None, **extra):
+    return dict({'name': title or f'Vacancy {i}', 'url': f'https://example.com/{i}', 'salary': None,
+                 'snippet': {'requirement': ''}, 'area': {'name': 'Москва'}, 'published_at': published(days_ago)},
+                **extra)
+
+
+def windowed_search(items, limit):
+    """Выдача как у hh.ru: фильтр date_from/date_to, от новых к старым, не больше limit вакансий на запрос"""
+    def published_at(item):
+        return datetime.strptime(item['published_at'], PUBLISHED_FORMAT)
+
+    def callback(request, context):
+        bounds = {key: datetime.strptime(request.qs[key][0], PUBLISHED_FORMAT)
+                  for key in ('date_from', 'date_to') if key in request.qs}
+        matching = [item for item in items if bounds.get('date_from', published_at(item)) <= published_at(item)
+                    <= bounds.get('date_to', published_at(item))]
+        matching.sort(key=published_at, reverse=True)
+        return {'items': matching[:limit], 'found': len(matching), 'pages': 1}
+    return callback
+
+
+class TestIncrementalSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.api = HeadHunterAPI(backoff_factor=0, rate_limiter=RateLimiter(1000))
+        self.addCleanup(self.api.close)
+        self.saver = JSONSaver(os.path.join(self.tmp_dir.name, "vacancies.json"))
+
+    def make_sync(self):
+        return IncrementalSync(self.api, self.saver, os.path.join(self.tmp_dir.name, "sync_state.json"))
+
+    def test_second_run_fetches_only_newer(self):
+        """Повторный запуск передает date_from и добавляет только новое"""
+        first = [make_item(1, 3), make_item(2, 2)]
+        with mock() as m:
+            m.get(URL, json={'items': first, 'found': 2, 'pages': 1})
+            stats = self.make_sync().run("Python")
+            self.assertNotIn('date_from', m.last_request.qs)
+        self.assertEqual(stats["added"], 2)
+
+        second = [make_item(2, 2), make_item(3, 1)]
+        with mock() as m:
+            m.get(URL, json={'items': second, 'found': 2, 'pages': 1})
+            sync = self.make_sync()
+            stats = sync.run("Python")
+            self.assertEqual(m.last_request.qs['date_from'], [published(2).lower()])
+        self.assertEqual((stats["added"], stats["unchanged"]), (1, 1))
+        self.assertEqual(sync.high_water_mark("python"), published(1))
+        self.assertEqual(len(self.saver.get_vacancies()), 3)
+
+    def test_changed_vacancy_is_upserted(self):
+        """Измененная вакансия заменяет сохраненную, а не дублирует ее"""
+        with mock() as m:
+            m.get(URL, [{'json': {'items': [make_item(1, 3)]}},
+                        {'json': {'items': [make_item(1, 1, title="Senior Python")]}}])
+            sync = self.make_sync()
+            sync.run("Python")
+            stats = sync.run("Python")
+        self.assertEqual(stats["updated"], 1)
+        self.assertEqual([v["title"] for v in self.saver.get_vacancies()], ["Senior Python"])
+
+    def test_expired_and_archived_are_dropped(self):
+        """Устаревшие и архивные вакансии удаляются из хранилища"""
+        with mock() as m:
+            m.get(URL, [{'json': {'items': [make_item(1, 40), make_item(2, 5), make_item(3, 4)]}},
+                        {'json': {'items': [make_item(3, 4, archived=True)]}}])
+            sync = self.make_sync()
+            self.assertEqual(sync.run("Python")["expired"], 1)
+            self.assertEqual(sync.run("Python")["expired"], 1)
+        self.assertEqual([v["link"] for v in self.saver.get_vacancies()], ["https://example.com/2"])
+
+    def test_expired_vacancy_is_deleted_alone_from_csv(self):
+        """Из CSV удаляется только устаревшая вакансия, а не все вакансии с тем же названием"""
+        saver = CSVSaver(os.path.join(self.tmp_dir.name, "vacancies.csv"))
+        items = [make_item(i, days_ago, title="Python dev") for i, days_ago in ((1, 5), (2, 4), (3, 3), (4, 2))]
+        with mock() as m:
+            m.get(URL, [{'json': {'items': items}},
+                        {'json': {'items': [make_item(2, 4, "Python dev", archived=True)]}}])
+            sync = IncrementalSync(self.api, saver, os.path.join(self.tmp_dir.name, "sync_state.json"))
+            sync.run("Python")
+            self.assertEqual(sync.run("Python")["expired"], 1)
+        links = sorted(v["link"] for v in CSVSaver(saver.file_path).get_vacancies())
+        self.assertEqual(links, ["https://example.com/1", "https://example.com/3", "https://example.com/4"])
+
+    def test_saver_is_flushed_before_state(self):
+        """Отметка синхронизации сохраняется только вместе с вакансиями на диске"""
+        saver = IndexedSaver(self.saver)
+        with mock() as m:
+            m.get(URL, json={'items': [make_item(1, 3), make_item(2, 2)]})
+            sync = IncrementalSync(self.api, saver, os.path.join(self.tmp_dir.name, "sync_state.json"))
+            sync.run("Python")
+        self.assertTrue(os.path.exists(sync.file_path))
+        self.assertEqual(len(JSONSaver(self.saver.file_path).get_vacancies()), 2)
+
+    def test_truncated_result_is_fetched_by_windows(self):
+        """Если новых вакансий больше, чем hh.ru отдает на запрос, более старые дозапрашиваются окнами"""
+        self.api.MAX_RESULTS = 3
+        items = [make_item(0, 10)]
+        with mock() as m:
+            m.get(URL, json=windowed_search(items, 3))
+            sync = self.make_sync()
+            sync.run("Python")
+            items.extend(make_item(i, 10 - i) for i in range(1, 8))
+            stats = sync.run("Python")
+            self.assertEqual(m.last_request.qs['date_from'], [published(10).lower()])
+        self.assertEqual(stats["added"], 7)
+        self.assertEqual(sync.high_water_mark("Python"), published(3))
+        self.assertEqual(len(self.saver.get_vacancies()), 8)
+
+    def test_reset_and_clear(self):
+        """После сброса состояния и очистки хранилища выдача загружается целиком"""
+        saver = IndexedSaver(self.saver)
+        with mock() as m:
+            m.get(URL, json={'items': [make_item(1, 3)]})
+            sync = IncrementalSync(self.api, saver, os.path.join(self.tmp_dir.name, "sync_state.json"))
+            sync.run("Python")
+            saver.clear()
+            sync.reset()
+            self.assertEqual(len(saver), 0)
+            self.assertEqual(sync.run("Python")["added"], 1)
+            self.assertNotIn('date_from', m.last_request.qs)
+        saver.flush()
+        self.assertEqual(len(self.saver.get_vacancies()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()